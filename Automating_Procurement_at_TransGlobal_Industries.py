@@ -19,28 +19,41 @@
 
 # ## Importing Necessary Libraries 
 
+# The prompts, chains, caches and scoring logic live in the procurement package. Streamlit
+# re-executes this script on every widget interaction, so the LLM client, the chains and
+# the response cache are built once per process by the cached resource factories below,
+# and LangChain and the Gemini client are only imported the first time they are built.
+# Run `python -m procurement.profiling` for an import-time report of the cold start.
+
 # In[2]:
 
 
 import os
+import time
+import uuid
+import asyncio
+import functools
 import streamlit as st
-import langchain
-from langchain_google_genai import ChatGoogleGenerativeAI
-import google.generativeai as genai
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-import pandas as pd
-from io import StringIO
-
-
-# ## Checking Installed Package Versions in Python 
-
-# In[4]:
-
 
-print(f"streamlit version: {st.__version__}")
-print(f"langchain version: {langchain.__version__}")
-print(f"pandas version: {pd.__version__}")
+from procurement.bid_scoring import rank_bids
+from procurement.bids import build_bid_vendor_index, filter_bids, parse_bids
+from procurement.cache import cache_bypassed_by_default, create_llm_cache, run_chain
+from procurement.emails import combine_emails, generate_vendor_emails, split_emails
+from procurement.fused_steps import run_fused_steps
+from procurement.jobs import JOB_POLL_SECONDS, JobLimitError, JobQueue
+from procurement.inputs import TABLE_FILE_TYPES, decode_text, fingerprint, read_vendor_history
+from procurement.map_reduce import TECH_REQ_CHUNK_CHARS, TECH_REQ_MAX_CONCURRENCY, arun_tech_req_map_reduce
+from procurement.pipeline import PIPELINE_DAG, output_fingerprints, run_pipeline, stale_steps, step_fingerprint
+from procurement.prior_runs import create_prior_run_index
+from procurement.rate_limit import shared_rate_limiter
+from procurement.retrieval import VendorRetrievalIndex, retrieve_vendor_history
+from procurement.scoring import (
+    VENDOR_HISTORY_COLUMNS_ERROR, build_vendor_score_index, parse_vendor_names, shortlist_vendors
+)
+from procurement.session_memory import SessionArtifacts, SessionRegistry
+from procurement.telemetry import load_records, log_state, summarize, track
+from procurement.vendor_names import VendorNameIndex
+from procurement.vendor_store import create_vendor_store
 
 
 # ## 1. Initial Setup & Configurations
@@ -50,7 +63,7 @@ print(f"pandas version: {pd.__version__}")
 
 # Load API Key
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
+if not GOOGLE_API_KEY and not os.getenv("PROCUREMENT_FAKE_LLM"):
     st.error("Google API Key is missing! Set the GEMINI_API_KEY environment variable.")
     st.stop()
 
@@ -58,249 +71,267 @@ if not GOOGLE_API_KEY:
 # In[229]:
 
 
-# Initialize LLM with a low temperature (0.1)
-llm = ChatGoogleGenerativeAI(
-    model="gemini-3-flash-preview",
-    google_api_key=GOOGLE_API_KEY,
-    temperature=0.1
-)
+# Initialize LLM with a low temperature (0.1), once per server process
+@st.cache_resource
+def get_llms(api_key):
+    # Each chain gets the model tier, latency budget and output limit of procurement/routing.py
+    from procurement.routing import create_routed_llms
+
+    return create_routed_llms(api_key)
 
 
 # ## 2. Defining Prompt Templates and Chains for Each Step
 
-# #### Step 1: Business to Technical Requirements Conversion
+# The prompt templates are in procurement/prompts.py; one LLMChain per step is built once
+# per process and shared by every session and rerun.
 
 # In[232]:
 
 
-tech_req_prompt = PromptTemplate(
-    input_variables=["business_req"],
-    template="""
-    
-Context: TransGlobal Industries is automating its procurement proces using AI Agents.
-Role: You are a technical requirements analyst.
-Task: Convert the following Business Requirements into a detailed Technical Requirements Document.
-Action: Generate a structured Technical Requirements Document. Provide the output in plain text, without any Markdown formatting.
-
-Business Requirement:
-{business_req}
-
-    The technical requirements document should include:
-    
-    1. A header with project title and date
-    2. Numbered sections for different requirement categories
-    3. For each requirement, include:
-       * The specific technical requirement
-    
-    Each requirement should be specific, measurable, achievable, relevant, and time-bound (SMART).
-    
-    Ensure all functional and non-functional requirements are covered, including:
-    - System architecture
-    - Performance specifications
-    - Integration requirements
-    - Security requirements
-    - User interface specifications
-    - Data management requirements
-    - Any relevant standards or compliance needs
-    Ensure that you don't pick up LLM, streamlit, Langchain or any other component required to build the agent. The agent should be strictly based on the business required document.
-"""
-)
-tech_req_chain = LLMChain(llm=llm, prompt=tech_req_prompt)
+@st.cache_resource
+def get_chains(api_key):
+    from procurement.chains import build_chains
 
+    return build_chains(get_llms(api_key))
 
-# #### Step 2: Vendor Shortlisting (LLM is used to get names of Vendors)
 
-# In[234]:
+chains = get_chains(GOOGLE_API_KEY)
+tech_req_chain = chains["tech_req"]
+vendor_shortlist_chain = chains["vendor_shortlist"]
+tender_doc_chain = chains["tender_doc"]
+bid_evaluation_chain = chains["bid_evaluation"]
+bid_justification_chain = chains["bid_justification"]
+extract_bids_chain = chains["extract_bids"]
+negotiation_strategy_chain = chains["negotiation_strategy"]
+risk_assessment_chain = chains["risk_assessment"]
+contract_doc_chain = chains["contract_doc"]
 
 
-vendor_shortlist_prompt = PromptTemplate(
-    input_variables=["tech_req", "vendor_history"],
-    template="""
-Context: TransGlobal Industries is automating its procurement process.
-Role: You are a vendor identification specialist.
-Task: Based on the Technical Requirements and Vendor History, identify suitable vendors.
-Action: Return a comma-separated list of vendors that might be suitable (e.g., Vendor A, Vendor B). Only list the vendor names, nothing else. Provide the output in plain text, without any Markdown formatting. 
+# #### LLM Response Cache
 
-Technical Requirements:
-{tech_req}
+# In[230]:
 
-Vendor History:
-{vendor_history}
-"""
-)
-vendor_shortlist_chain = LLMChain(llm=llm, prompt=vendor_shortlist_prompt)
 
+# One cache per server process, shared by every session and rerun
+@st.cache_resource
+def get_llm_cache():
+    return create_llm_cache()
 
-# #### Step 3: Tender Document & RFP Preparation
 
-# In[236]:
+llm_cache = get_llm_cache()
 
+# Set from the sidebar; None when the cache is bypassed and every chain call goes to Gemini
+response_cache = None if cache_bypassed_by_default() else llm_cache
 
-tender_doc_prompt = PromptTemplate(
-    input_variables=["tech_req", "business_req"],
-    template="""
-Context: TransGlobal Industries is automating its procurement process.
-Role: You are a procurement document specialist.
-Task: Prepare a comprehensive Tender Document and Request for Proposal (RFP).
-Action: Format the document to encapsulate the provided technical and business requirements.Provide the output in plain text, without any Markdown formatting.
 
-Technical Requirements:
-{tech_req}
+# The vendor performance store keeps running per-vendor sums and counts of every ingested
+# history file, so Step 2 scores vendors by key lookup instead of re-aggregating the history
+@st.cache_resource
+def get_vendor_store():
+    return create_vendor_store()
 
-Business Requirements:
-{business_req}
-"""
-)
-tender_doc_chain = LLMChain(llm=llm, prompt=tender_doc_prompt)
 
+vendor_store = get_vendor_store()
 
-# #### Step 4: Tender Email Generation for Shortlisted Vendors
 
-# In[238]:
+# Earlier Business Requirements with the documents generated from them, searched for
+# near-duplicates of the current tender
+@st.cache_resource
+def get_prior_run_index():
+    return create_prior_run_index()
 
 
-tender_email_prompt = PromptTemplate(
-    input_variables=["shortlisted_vendors", "tender_doc"],
-    template="""
-Context: TransGlobal Industries procurement process.
-Role: You are a communications specialist.
-Task: Generate a professional email to send the tender document to the shortlisted vendors.
-Action: Provide the output in plain text, without any Markdown formatting.
-The email should:
-    1. Have a clear, professional subject line
-    2. Introduce the company (TransGlobal Industries) and the opportunity briefly
-    3. Mention that they've been shortlisted based on their capabilities
-    4. Explain that the tender document is attached
-    5. Specify a deadline for submission (3 weeks from now)
-    6. Provide contact information for questions
-    7. End with a professional closing
-    
-    Keep the email concise but professional. Do not include the actual tender document text in the email.
-    Format as a complete email with Subject line, Greeting, Body, and Signature.
+prior_runs = get_prior_run_index()
 
-    The emails should be completely separate for each 2 selected vendor.
 
-Shortlisted Vendors:
-{shortlisted_vendors}
+# Last activity of every session; the documents of idle sessions are offloaded to disk
+@st.cache_resource
+def get_session_registry():
+    return SessionRegistry()
 
-Tender Document:
-{tender_doc}
-"""
-)
-tender_email_chain = LLMChain(llm=llm, prompt=tender_email_prompt)
 
+session_registry = get_session_registry()
 
-# #### Step 5: Bid Evaluation
 
-# In[240]:
+# #### Streaming Step Outputs
 
+# In streaming mode the step buttons write the tokens into the page as the model
+# generates them instead of showing a spinner until the whole document is ready.
 
-bid_evaluation_prompt = PromptTemplate(
-    input_variables=["bids_data"],
-    template="""
-Context: TransGlobal Industries procurement process.
-Role: You are a bid evaluation expert.
-Task: Evaluate the provided bids based on price, quality, delivery, and technological capability.
-Action: Identify and list the top two bids with scoring and brief justification. Provide the output in plain text, without any Markdown formatting.
+# In[231]:
 
-Bids Data:
-{bids_data}
-"""
-)
-bid_evaluation_chain = LLMChain(llm=llm, prompt=bid_evaluation_prompt)
 
+# Set from the sidebar
+stream_outputs = False
 
-# #### Step 6: Negotiation Strategy and BATNA Analysis
 
-# In[242]:
+def generate_output(chain, inputs):
+    """Run the chain of a step button, streaming its output into the page when streaming mode is on."""
+    if not stream_outputs:
+        return run_chain(chain, inputs, response_cache)
+    from procurement.streaming import stream_chain
 
+    placeholder = st.empty()
+    response = stream_chain(chain, inputs, placeholder, response_cache)
+    # The step displays the finished document in its own text area
+    placeholder.empty()
+    return response
 
-negotiation_strategy_prompt = PromptTemplate(
-    input_variables=["top_two_bids"],
-    template="""
-Context: TransGlobal Industries procurement process.
-Role: You are a negotiation strategist.
-Task: Develop a negotiation strategy and identify the Best Alternative to a Negotiated Agreement (BATNA).
-Action: Provide clear strategies and recommendations based on the top two bids. Provide the output in plain text, without any Markdown formatting.
 
-Top Two Bids:
-{top_two_bids}
-"""
-)
-negotiation_strategy_chain = LLMChain(llm=llm, prompt=negotiation_strategy_prompt)
+# #### Background Step Execution
 
+# LLM steps run in a worker pool shared by every session, so a long generation does not
+# hold the script thread; the pool bounds the steps running per user and in total.
 
-# #### Step 7: Risk Assessment Report Generation
+# In[233]:
 
-# In[244]:
 
+@st.cache_resource
+def get_job_queue():
+    return JobQueue()
 
-risk_assessment_prompt = PromptTemplate(
-    input_variables=["negotiation_strategy", "bid_data"],
-    template="""
-Context: TransGlobal Industries procurement process.
-Role: You are a risk assessment specialist.
-Task: Generate a risk assessment report for the preferred vendor.
-Action: Include analysis on delivery, quality, compliance, performance, and communication risks. Provide the output in plain text, without any Markdown formatting.
 
-Negotiation Strategy:
-{negotiation_strategy}
+job_queue = get_job_queue()
 
-Bid Data:
-{bid_data}
-"""
-)
-risk_assessment_chain = LLMChain(llm=llm, prompt=risk_assessment_prompt)
+# Set from the sidebar; streaming into the page is only possible when steps run inline
+run_in_background = True
 
+# Speculative prefetch: once a step's inputs are ready, the next steps start in the
+# background and their outputs wait for the click. Off by default; every session may
+# prefetch at most PREFETCH_MAX_STEPS steps, whether their results are used or not.
+PREFETCH_MAX_STEPS = int(os.getenv("PROCUREMENT_PREFETCH_MAX_STEPS", "8"))
 
-# #### Step 8: Contract Document Generation
 
-# In[246]:
+# #### Cached Inputs and Vendor Indexes (used by Steps 2 and 5)
 
+# The parsed inputs and indexes are built once per uploaded file and shared by every session and rerun.
 
-contract_doc_prompt = PromptTemplate(
-    input_variables=["risk_assessment"],
-    template="""
-Context: TransGlobal Industries procurement process.
-Role: You are a contract drafting expert.
-Task: Draft a comprehensive contract document.
-Action: Include clauses on risk mitigation, performance guarantees, and dispute resolution based on the risk assessment report. Provide the output in plain text, without any Markdown formatting.
+# In[247]:
 
-Risk Assessment Report:
-{risk_assessment}
-"""
-)
-contract_doc_chain = LLMChain(llm=llm, prompt=contract_doc_prompt)
 
+# One index per history file for all sessions, instead of a copy in each session's state
+@st.cache_resource(max_entries=16)
+def get_vendor_score_index(_df, fingerprint):
+    """Return the score index of the uploaded history, rebuilding it only when the file changes."""
+    with track("vendor_score_index_build", rows=len(_df)):
+        return build_vendor_score_index(_df)
+
+
+@st.cache_resource(max_entries=16)
+def get_vendor_retrieval_index(_df, fingerprint):
+    """Return the retrieval index of the uploaded history, rebuilding it only when the file changes."""
+    with track("vendor_retrieval_index_build", rows=len(_df)):
+        return VendorRetrievalIndex(_df)
+
+
+@st.cache_resource(max_entries=16)
+def get_vendor_name_index(_df, fingerprint):
+    """Return the vendor name index of the uploaded history, rebuilding it only when the file changes."""
+    with track("vendor_name_index_build", rows=len(_df)):
+        return VendorNameIndex(_df['Vendor_name'].dropna().unique())
+
+
+@st.cache_resource(max_entries=16)
+def get_bid_vendor_index(_df, fingerprint):
+    """Return the index of the bid vendor names, built once per bids file."""
+    with track("bid_vendor_index_build", rows=len(_df)):
+        return build_bid_vendor_index(_df)
+
+
+@st.cache_resource(max_entries=16)
+def get_table_bytes(_df, fingerprint):
+    """Memory used by a parsed upload, measured once per file."""
+    return int(_df.memory_usage(deep=True).sum())
+
+
+# Parsed uploads are shared by every session and keyed by the content hash of the file,
+# so reruns skip decoding and parsing. Parameters starting with an underscore are not
+# hashed by Streamlit.
+@st.cache_resource(max_entries=16)
+def load_vendor_history(fingerprint, file_name, _data):
+    with track("parse_vendor_history", bytes=len(_data)):
+        return read_vendor_history(_data, file_name)
+
+
+@st.cache_resource(max_entries=16)
+def load_bids(fingerprint, file_name, _data):
+    with track("parse_bids", bytes=len(_data)):
+        return parse_bids(_data, file_name)
+
+
+@st.cache_data(max_entries=16)
+def load_text(fingerprint, _data):
+    return decode_text(_data)
+
+
+# ## 3. Running All Steps
+
+# The executor in procurement/pipeline.py runs independent steps concurrently.
+
+# In[249]:
 
-# ## 3. Initializing Session State
+
+def show_vendor_emails(tender_emails, key_prefix=""):
+    """Show each vendor's tender email with its own download button."""
+    for vendor, email in tender_emails.items():
+        file_vendor = "_".join(vendor.split())
+        st.text_area(f"Tender Email - {vendor}:", value=email, height=200, key=f"{key_prefix}tender_email_{vendor}")
+        st.download_button(
+            f"Download Tender Email for {vendor}", email,
+            file_name=f"Tender_Email_{file_vendor}.txt", key=f"{key_prefix}tender_email_download_{vendor}"
+        )
+
+
+# Outputs shown by the "Run All" mode: session state key, label and download file name
+STEP_OUTPUTS = [
+    ("tech_req_doc", "Technical Requirements Document:", "Technical_Requirements.txt"),
+    ("shortlisted_vendors", "Shortlisted Vendors:", "Vendor_Shortlist.txt"),
+    ("tender_doc", "Tender Document & RFP:", "Tender_Document.txt"),
+    ("tender_email", "Tender Email:", "Tender_Email.txt"),
+    ("bid_evaluation", "Bid Evaluation Report:", "Bid_Evaluation.txt"),
+    ("negotiation_strategy", "Negotiation Strategy & BATNA:", "Negotiation_Strategy.txt"),
+    ("risk_assessment", "Risk Assessment Report:", "Risk_Assessment.txt"),
+    ("contract_doc", "Contract Document:", "Contract_Document.txt"),
+]
+
+
+# ## 4. Initializing Session State
 
 # In[248]:
 
 
-if "tech_req_doc" not in st.session_state:
-    st.session_state.tech_req_doc = ""
-if "shortlisted_vendors" not in st.session_state:
-    st.session_state.shortlisted_vendors = ""
-if "tender_doc" not in st.session_state:
-    st.session_state.tender_doc = ""
-if "tender_email" not in st.session_state:
-    st.session_state.tender_email = ""
-if "bid_evaluation" not in st.session_state:
-    st.session_state.bid_evaluation = ""
-if "negotiation_strategy" not in st.session_state:
-    st.session_state.negotiation_strategy = ""
-if "risk_assessment" not in st.session_state:
-    st.session_state.risk_assessment = ""
-if "contract_doc" not in st.session_state:
-    st.session_state.contract_doc = ""
-if "top_two_bids" not in st.session_state:
-    st.session_state.top_two_bids = ""
+# The documents generated by the steps, stored compressed (see procurement/session_memory.py)
+if "artifacts" not in st.session_state:
+    st.session_state.artifacts = SessionArtifacts()
+    for key in [*PIPELINE_DAG, "unresolved_vendors"]:
+        st.session_state.artifacts[key] = ""
+artifacts = st.session_state.artifacts
+# Pasted Business Requirements and Bids, moved out of their text areas and stored compressed
+if "pasted_inputs" not in st.session_state:
+    st.session_state.pasted_inputs = SessionArtifacts()
+pasted_inputs = st.session_state.pasted_inputs
 if "vendor_history_df" not in st.session_state:
     st.session_state.vendor_history_df = None
-
-
-# ## 4. Building the Streamlit UI
+if "vendor_history_fingerprint" not in st.session_state:
+    st.session_state.vendor_history_fingerprint = ""
+if "step_fingerprints" not in st.session_state:
+    st.session_state.step_fingerprints = {}
+# Identifies the session to the per-user job limit; step name -> its latest background job
+if "user_id" not in st.session_state:
+    st.session_state.user_id = uuid.uuid4().hex
+if "jobs" not in st.session_state:
+    st.session_state.jobs = {}
+# Step name -> its speculative job; number of steps this session has prefetched
+if "prefetch" not in st.session_state:
+    st.session_state.prefetch = {}
+if "prefetch_spent" not in st.session_state:
+    st.session_state.prefetch_spent = 0
+
+# Every rerun marks the session as active; the documents and pasted inputs of idle sessions are offloaded to disk
+session_registry.touch(st.session_state.user_id, artifacts=artifacts, pasted_inputs=pasted_inputs)
+
+
+# ## 5. Building the Streamlit UI
 
 # In[250]:
 
@@ -331,8 +362,96 @@ steps = [
 for step in steps:
     st.sidebar.write(step)
 
+# LLM response cache controls
+st.sidebar.subheader("LLM Response Cache")
+llm_cache_bypass = st.sidebar.checkbox("Bypass cache (always call Gemini)", value=response_cache is None)
+response_cache = None if llm_cache_bypass else llm_cache
+cache_stats = llm_cache.stats()
+st.sidebar.write(
+    f"Hits: {cache_stats['hits']} | Misses: {cache_stats['misses']} | "
+    f"Entries: {cache_stats['entries']} ({cache_stats['bytes'] / 1024:.0f} KB)"
+)
+if st.sidebar.button("Clear Cache"):
+    llm_cache.clear()
+
+# Vendor performance store used for the Step 2 scores instead of the uploaded history
+st.sidebar.subheader("Vendor Performance Store")
+vendor_store_stats = vendor_store.stats()
+st.sidebar.write(
+    f"Vendors: {vendor_store_stats['vendors']} | Records: {vendor_store_stats['records']} | "
+    f"Files ingested: {vendor_store_stats['sources']}"
+)
+use_vendor_store = st.sidebar.checkbox(
+    "Score vendors from the store", value=vendor_store_stats["vendors"] > 0,
+    help="Rank the shortlisted vendors on every record ingested so far instead of on the uploaded history only."
+)
+if st.sidebar.button("Clear Store"):
+    vendor_store.clear()
+
+# Earlier tenders offered for reuse when the Business Requirements are similar
+st.sidebar.subheader("Earlier Tenders")
+st.sidebar.write(f"Tenders indexed: {prior_runs.stats()['runs']}")
+if st.sidebar.button("Clear Earlier Tenders"):
+    prior_runs.clear()
+
+# Background execution of the steps in the shared worker pool
+st.sidebar.subheader("Step Execution")
+run_in_background = st.sidebar.checkbox("Run steps in the background", value=run_in_background)
+job_stats = job_queue.stats()
+st.sidebar.write(
+    f"Running: {job_stats['running']} | Queued: {job_stats['queued']} | Workers: {job_stats['workers']}"
+)
+prefetch_next_steps = st.sidebar.checkbox(
+    "Prefetch the next steps", value=False,
+    help="Start the next steps in the background as soon as their inputs are ready, so their outputs "
+         "are ready when you click. Uses extra Gemini calls."
+)
+if prefetch_next_steps:
+    st.sidebar.write(f"Steps prefetched: {st.session_state.prefetch_spent} of {PREFETCH_MAX_STEPS}")
+fuse_closing_steps = st.sidebar.checkbox(
+    "Generate Steps 6-8 in one call", value=False,
+    help="One LLM call writes the Negotiation Strategy, Risk Assessment and Contract Document, "
+         "saving two round-trips and the tokens of re-sending each document to the next step."
+)
+# Gemini calls share one rate limiter, whose concurrency limit shrinks on 429s and grows back
+rate_stats = shared_rate_limiter().stats()
+st.sidebar.write(
+    f"Gemini calls: {rate_stats['calls']} | 429s: {rate_stats['throttled']} | Retries: {rate_stats['retries']} | "
+    f"Concurrency limit: {rate_stats['concurrency_limit']}"
+)
+
+# Streaming mode for the step buttons
+st.sidebar.subheader("Output Display")
+stream_outputs = st.sidebar.checkbox(
+    "Stream outputs as they are generated", value=stream_outputs, disabled=run_in_background,
+    help="Available when the steps do not run in the background."
+) and not run_in_background
+
+
+# Latency, token and cost percentiles of every step across runs
+@st.cache_data(max_entries=1)
+def summarize_telemetry(telemetry_log_state):
+    """Summarize the telemetry log; recomputed only when log_state() shows new records."""
+    return summarize(load_records())
 
-# ## 5. File Uploads & Inputs
+
+with st.sidebar.expander("Telemetry"):
+    telemetry_summary = summarize_telemetry(log_state())
+    if telemetry_summary:
+        st.dataframe(telemetry_summary, hide_index=True)
+    else:
+        st.write("No steps recorded yet.")
+
+# Cold start report of the heavy imports, measured in fresh interpreters
+with st.sidebar.expander("Startup Report"):
+    if st.button("Measure Import Times"):
+        from procurement.profiling import import_time_report
+
+        for module, seconds in import_time_report():
+            st.write(f"{module}: " + ("not installed" if seconds is None else f"{seconds * 1000:.0f} ms"))
+
+
+# ## 6. File Uploads & Inputs
 
 # In[252]:
 
@@ -345,13 +464,78 @@ st.header("Input Section - Follow the sequence for uploading the files")
 # In[254]:
 
 
+def store_pasted_text(widget_key, name):
+    # The pasted text is kept compressed and cleared from its text area, so the session
+    # does not also hold it uncompressed in the widget state
+    text = st.session_state[widget_key]
+    if text.strip():
+        st.session_state.pasted_inputs[name] = text
+        st.session_state[widget_key] = ""
+
+
 st.subheader("Upload Business Requirements Document")
 business_req_file = st.file_uploader("Upload Business Requirements File", type=["txt"])
 business_req_text = ""
 if business_req_file:
-    business_req_text = business_req_file.read().decode("utf-8", errors="ignore")
+    business_req_data = business_req_file.getvalue()
+    business_req_text = load_text(fingerprint(business_req_data), business_req_data)
 else:
-    business_req_text = st.text_area("Or paste the Business Requirements here:")
+    st.text_area(
+        "Or paste the Business Requirements here:", key="business_req_text",
+        on_change=store_pasted_text, args=("business_req_text", "business_req")
+    )
+    business_req_text = pasted_inputs.get("business_req", "")
+    if business_req_text:
+        st.caption(
+            f"Using the pasted Business Requirements ({len(business_req_text):,} characters). "
+            "Paste new text to replace them."
+        )
+
+# Map-reduce mode splits a very large document into sections whose technical requirements
+# are generated in parallel and then merged
+tech_req_map_reduce = st.checkbox(
+    "Map-reduce mode for large documents (generate sections in parallel, then merge)",
+    value=len(business_req_text) > TECH_REQ_CHUNK_CHARS
+)
+tech_req_max_concurrency = TECH_REQ_MAX_CONCURRENCY
+if tech_req_map_reduce:
+    tech_req_max_concurrency = st.number_input(
+        "Maximum parallel LLM calls in map-reduce mode", min_value=1, max_value=16, value=TECH_REQ_MAX_CONCURRENCY
+    )
+
+
+# #### Similar Earlier Tender (Steps 1 and 3)
+
+# A yearly re-tender differs from the earlier one in a few details, which the response
+# cache misses. The most similar earlier Business Requirements, above the similarity
+# threshold, are offered with the documents generated from them: as a starting point that
+# needs no LLM call, or as the example the LLM adapts to the new requirements.
+
+# In[255]:
+
+
+@st.cache_data(max_entries=64)
+def find_similar_run(_business_req, business_req_fingerprint, prior_runs_version):
+    """Look up the earlier run most similar to the Business Requirements once per document and index change."""
+    return prior_runs.find_similar(_business_req)
+
+
+business_req_fingerprint = fingerprint(business_req_text.encode("utf-8"))
+similar_run = find_similar_run(business_req_text, business_req_fingerprint, prior_runs.version)
+use_similar_run_as_example = False
+start_from_similar_run = False
+if similar_run:
+    st.info(
+        f"An earlier tender has {similar_run['similarity']:.0%} similar Business Requirements "
+        f"(last generated {time.strftime('%Y-%m-%d', time.localtime(similar_run['updated_at']))})."
+    )
+    with st.expander("Earlier Business Requirements"):
+        st.text(similar_run["business_req"])
+    use_similar_run_as_example = st.checkbox(
+        "Use the earlier tender as the example when generating Steps 1 and 3", value=True
+    )
+    if similar_run["tech_req_doc"]:
+        start_from_similar_run = st.button("Start from the earlier Technical Requirements and Tender Document")
 
 
 # #### Vendor History Upload (Step 2)
@@ -359,25 +543,61 @@ else:
 # In[256]:
 
 
-st.subheader("Upload Vendor History File")
-vendor_history_file = st.file_uploader("Upload Vendor History File", key="vendor", type=["csv"])
-vendor_history_text = ""
-
-if vendor_history_file:
-    vendor_history_text = vendor_history_file.read().decode("utf-8", errors="ignore")
+def store_vendor_history(data, file_name):
+    """Parse the Vendor History into the session state; return the error message, or None."""
+    vendor_history_fingerprint = fingerprint(data)
 
     # Read the data using pandas
     try:
-        df = pd.read_csv(StringIO(vendor_history_text))
+        df = load_vendor_history(vendor_history_fingerprint, file_name, data)
 
         # Store DataFrame in session state
         st.session_state.vendor_history_df = df
+        st.session_state.vendor_history_fingerprint = vendor_history_fingerprint
 
     except Exception as e:
-        st.error(f"Error reading Vendor History file: {e}. Please ensure it is a valid TXT format.")
         st.session_state.vendor_history_df = None
+        return f"Error reading Vendor History file: {e}. Please ensure it is a valid CSV, Parquet or Arrow file."
+    return None
+
+
+def parse_pasted_vendor_history():
+    # The pasted text is dropped once parsed, so the session only keeps the compact table
+    if st.session_state.vendor_text.strip():
+        st.session_state.vendor_history_error = store_vendor_history(
+            st.session_state.vendor_text.encode("utf-8"), "vendor_history.csv"
+        )
+        st.session_state.vendor_text = ""
+
+
+st.subheader("Upload Vendor History File")
+vendor_history_file = st.file_uploader("Upload Vendor History File", key="vendor", type=TABLE_FILE_TYPES)
+
+if vendor_history_file:
+    vendor_history_error = store_vendor_history(vendor_history_file.getvalue(), vendor_history_file.name)
 else:
-    vendor_history_text = st.text_area("Or paste the Vendor History here:", key="vendor_text")
+    st.text_area("Or paste the Vendor History here:", key="vendor_text", on_change=parse_pasted_vendor_history)
+    vendor_history_error = st.session_state.pop("vendor_history_error", None)
+if vendor_history_error:
+    st.error(vendor_history_error)
+
+df = st.session_state.vendor_history_df
+if df is not None:
+    if not vendor_history_file:
+        st.caption(f"Using the Vendor History parsed in this session ({len(df)} rows).")
+
+    # New performance records are appended to the store; a file already ingested is skipped
+    if st.button("Add to Vendor Performance Store"):
+        try:
+            with track("vendor_store_ingest", rows=len(df)):
+                ingested = vendor_store.ingest(df, st.session_state.vendor_history_fingerprint)
+        except KeyError as e:
+            st.error(f"Error: The Vendor History is missing the column {e}.")
+        else:
+            if ingested:
+                st.success(f"Added {ingested} records to the Vendor Performance Store.")
+            else:
+                st.info("This file was already added to the Vendor Performance Store.")
 
 
 # #### Bids File Upload (Step 5)
@@ -386,15 +606,89 @@ else:
 
 
 st.subheader("Upload Bids File")
-bids_file = st.file_uploader("Upload Bids File", key="bids", type=["csv"])
-bids_text = ""
+bids_file = st.file_uploader("Upload Bids File", key="bids", type=TABLE_FILE_TYPES)
 if bids_file:
-    bids_text = bids_file.read().decode("utf-8", errors="ignore")
+    bids_data = bids_file.getvalue()
+    bids_file_name = bids_file.name
 else:
-    bids_text = st.text_area("Or paste the Bids data here:", key="bids_text")
-
+    st.text_area(
+        "Or paste the Bids data here:", key="bids_text", on_change=store_pasted_text, args=("bids_text", "bids")
+    )
+    bids_data = pasted_inputs.get("bids", "").encode("utf-8")
+    bids_file_name = "bids.csv"
+    if bids_data:
+        st.caption(f"Using the pasted Bids data ({len(bids_data):,} bytes). Paste new data to replace it.")
+use_llm_bid_extraction = st.checkbox(
+    "Bids are unstructured text - extract the shortlisted vendors' bids with the LLM",
+    key="llm_bid_extraction"
+)
 
-# ## 6. Processing and Output Generation
+bids_provided = bool(bids_data.strip())
+bids_fingerprint = fingerprint(bids_data)
+# The raw bids text is only needed by the LLM extraction fallback
+bids_text = load_text(bids_fingerprint, bids_data) if use_llm_bid_extraction else ""
+bids_df = None
+if bids_provided and not use_llm_bid_extraction:
+    bids_df = load_bids(bids_fingerprint, bids_file_name, bids_data)
+
+
+# #### Input Fingerprints
+
+# In[259]:
+
+
+# Fingerprints of the inputs each step's output is generated from; a step is stale once they change
+input_fingerprints = {
+    "business_req": business_req_fingerprint + (
+        f":example:{similar_run['fingerprint']}" if use_similar_run_as_example else ""
+    ),
+    "vendor_history": (
+        st.session_state.vendor_history_fingerprint if st.session_state.vendor_history_df is not None else ""
+    ) + (f":store:{vendor_store.version()}" if use_vendor_store else ""),
+    "bids": f"{bids_fingerprint}:{'llm' if use_llm_bid_extraction else 'table'}",
+    # Modes that change the outputs, so that a prefetched or earlier output of the other mode is not reused
+    "tech_req_mode": "map_reduce" if tech_req_map_reduce else "single",
+    "closing_steps": "fused" if fuse_closing_steps else "separate",
+}
+
+# The earlier tender's documents taken as the starting point count as generated from the current inputs
+similar_run_outputs = {}
+if start_from_similar_run:
+    similar_run_outputs = {key: similar_run[key] for key in ("tech_req_doc", "tender_doc") if similar_run[key]}
+    for key, value in similar_run_outputs.items():
+        artifacts[key] = value
+    reused_fingerprints = output_fingerprints(input_fingerprints, artifacts)
+    st.session_state.step_fingerprints.update({key: reused_fingerprints[key] for key in similar_run_outputs})
+
+stale_outputs = stale_steps(input_fingerprints, artifacts, st.session_state.step_fingerprints)
+
+# Memory held by this session: its compressed documents and its inputs, besides the parsed
+# tables it shares with the other sessions using the same files
+documents_bytes, documents_size = artifacts.memory_usage()
+session_input_bytes = pasted_inputs.memory_usage()[0] + sum(
+    upload.size for upload in (business_req_file, vendor_history_file, bids_file) if upload
+)
+shared_table_bytes = sum([
+    get_table_bytes(st.session_state.vendor_history_df, st.session_state.vendor_history_fingerprint)
+    if st.session_state.vendor_history_df is not None else 0,
+    get_table_bytes(bids_df, bids_fingerprint) if bids_df is not None else 0,
+])
+with st.sidebar.expander("Session Memory"):
+    st.write(f"Documents: {documents_bytes / 1024:.0f} KB ({documents_size / 1024:.0f} KB uncompressed)")
+    st.write(f"Inputs: {session_input_bytes / 1024:.0f} KB")
+    st.write(f"Parsed tables (shared): {shared_table_bytes / 1024:.0f} KB")
+    registry_stats = session_registry.stats()
+    st.write(
+        f"Server: {registry_stats['sessions']} sessions, {registry_stats['offloaded']} idle sessions offloaded "
+        f"to disk | Documents and pasted inputs in memory: {registry_stats['bytes'] / 1024:.0f} KB"
+    )
+
+
+# ## 7. Processing and Output Generation
+
+# Every step is a function returning a dict of outputs. In background mode the step
+# buttons submit it to the shared worker pool and return at once; the page polls the job
+# and applies its outputs when it finishes. Otherwise the step runs inline as before.
 
 # In[260]:
 
@@ -402,21 +696,226 @@ else:
 st.header("Output Section")
 
 
+
+def report(job, progress, message):
+    """Report the progress of a step running in the background; no-op when it runs inline."""
+    if job is not None:
+        job.report(progress, message)
+
+
+def apply_outputs(outputs, snapshot):
+    """Store the outputs of a finished step and record the fingerprints they were generated from.
+
+    snapshot holds the input fingerprints and the upstream outputs at submission time.
+    """
+    step_inputs, upstream_outputs = snapshot
+    for key, value in outputs.items():
+        artifacts[key] = value
+    fingerprints = output_fingerprints(step_inputs, {**upstream_outputs, **outputs})
+    st.session_state.step_fingerprints.update({key: fingerprints[key] for key in outputs if key in fingerprints})
+
+
+def show_outputs(outputs, key_prefix):
+    """Show the displayed outputs of a step with their download buttons."""
+    if outputs.get("unresolved_vendors"):
+        st.warning(
+            f"These vendors returned by the LLM match no vendor of the Vendor History and were left out "
+            f"of the shortlist: {outputs['unresolved_vendors']}"
+        )
+    for key, label, file_name in STEP_OUTPUTS:
+        if key not in outputs:
+            continue
+        if key == "tender_email":
+            show_vendor_emails(split_emails(outputs[key]), key_prefix=key_prefix)
+        else:
+            st.text_area(label, value=outputs[key], height=300, key=f"{key_prefix}{key}")
+            st.download_button(f"Download {file_name}", outputs[key], file_name=file_name, key=f"{key_prefix}download_{key}")
+
+
+# Step name -> output key whose fingerprint identifies the step's inputs, where they differ
+STEP_FINGERPRINT_KEYS = {"bid_evaluation": "top_two_bids"}
+
+
+def current_step_fingerprint(name):
+    """Fingerprint of the inputs step name would run on now."""
+    return step_fingerprint(STEP_FINGERPRINT_KEYS.get(name, name), input_fingerprints, artifacts)
+
+
+def adopt_prefetch(name):
+    """Use the speculative job of step name as its job when it ran on the current inputs.
+
+    Returns whether it was adopted; a prefetch made on other inputs is cancelled.
+    """
+    entry = st.session_state.prefetch.pop(name, None)
+    job = job_queue.get(entry["job_id"]) if entry else None
+    if job is None:
+        return False
+    if entry["fingerprint"] != current_step_fingerprint(name) or job.status in ("failed", "cancelled"):
+        job_queue.cancel(job.id)
+        return False
+    st.session_state.jobs[name] = {"job_id": job.id, "snapshot": entry["snapshot"], "applied": False}
+    return True
+
+
+def run_step(name, label, function, *args):
+    """Run a step function as a background job, or inline with a spinner when background mode is off.
+
+    function is called as function(job, generate, cache, *args), where generate(chain, inputs)
+    runs one chain and job is None inline, and returns a dict of outputs. A prefetched
+    result for the same inputs is used instead of running the step again.
+    """
+    if adopt_prefetch(name):
+        return
+    snapshot = (dict(input_fingerprints), artifacts.snapshot())
+    if run_in_background:
+        try:
+            job = job_queue.submit(
+                st.session_state.user_id, name, function,
+                functools.partial(run_chain, cache=response_cache), response_cache, *args
+            )
+        except JobLimitError as e:
+            st.error(str(e))
+            return
+        st.session_state.jobs[name] = {"job_id": job.id, "snapshot": snapshot, "applied": False}
+        return
+
+    st.session_state.jobs.pop(name, None)
+    with st.spinner(f"{label}..."):
+        try:
+            outputs = function(None, generate_output, response_cache, *args)
+        except ValueError as e:
+            st.error(str(e))
+            return
+    apply_outputs(outputs, snapshot)
+    show_outputs(outputs, f"{name}_")
+
+
+def show_job(name):
+    """Show the status of the step's background job, applying its outputs once when it has finished."""
+    entry = st.session_state.jobs.get(name)
+    job = job_queue.get(entry["job_id"]) if entry else None
+    if job is None:
+        return
+    if not job.done:
+        st.info(f"{job.message or job.status.capitalize()}... The page updates when the step finishes.")
+    elif job.error is not None:
+        st.error(str(job.error) if isinstance(job.error, ValueError) else f"{name} failed: {job.error!r}")
+    else:
+        if not entry["applied"]:
+            apply_outputs(job.result, entry["snapshot"])
+            # The snapshot holds a copy of the documents and is not needed any more
+            entry["applied"], entry["snapshot"] = True, None
+        show_outputs(job.result, f"{name}_")
+
+
+# #### Run All Steps
+
+# In[261]:
+
+
+# In store mode Step 2 runs from the store alone when no Vendor History was uploaded
+vendor_inputs_ready = st.session_state.vendor_history_df is not None or (
+    use_vendor_store and vendor_store_stats["vendors"] > 0
+)
+
+
+def vendor_step_inputs():
+    """Return the vendor indexes Step 2 runs on; raises KeyError when the history lacks a column."""
+    df, fingerprint = st.session_state.vendor_history_df, st.session_state.vendor_history_fingerprint
+    return {
+        "vendor_score_index": None if use_vendor_store else get_vendor_score_index(df, fingerprint),
+        "vendor_store": vendor_store if use_vendor_store else None,
+        "vendor_retrieval_index": get_vendor_retrieval_index(df, fingerprint) if df is not None else None,
+        "vendor_name_index": vendor_store.name_index() if use_vendor_store else get_vendor_name_index(df, fingerprint),
+    }
+
+
+def run_all_steps(job, generate, cache, inputs, reuse):
+    done = []
+
+    def on_step_done(key):
+        done.append(key)
+        report(job, len(done) / len(PIPELINE_DAG), f"{len(done)} of {len(PIPELINE_DAG)} steps finished")
+
+    with track("run_all"):
+        try:
+            outputs = asyncio.run(run_pipeline(chains, inputs, cache, reuse, on_step_done))
+        except KeyError as e:
+            raise ValueError(VENDOR_HISTORY_COLUMNS_ERROR.format(e) + " The Bids file also needs a vendor name column.") from e
+    prior_runs.record(inputs["business_req"], tech_req_doc=outputs["tech_req_doc"], tender_doc=outputs["tender_doc"])
+    return outputs
+
+
+with st.expander("Run All Steps"):
+    # Up-to-date outputs are reused; only the stale steps and everything downstream of them run
+    reusable_outputs = [key for key in st.session_state.step_fingerprints if key not in stale_outputs]
+    if reusable_outputs:
+        st.caption(f"Up to date and reused: {', '.join(reusable_outputs)}. Stale: {', '.join(stale_outputs) or 'none'}.")
+    recompute_all = st.checkbox("Recompute every step", key="recompute_all")
+    if st.button("Run Full Procurement Pipeline"):
+        if not use_llm_bid_extraction and bids_provided and bids_df is None:
+            st.error("The Bids data is not a valid CSV, Parquet or Arrow table. Fix the file or enable LLM bid extraction.")
+        elif business_req_text.strip() and vendor_inputs_ready and bids_provided:
+            try:
+                vendor_indexes = vendor_step_inputs()
+            except KeyError as e:
+                st.error(VENDOR_HISTORY_COLUMNS_ERROR.format(e))
+            else:
+                run_step("run_all", "Running all procurement steps", run_all_steps, {
+                    "business_req": business_req_text,
+                    "tech_req_map_reduce": tech_req_map_reduce,
+                    "tech_req_max_concurrency": tech_req_max_concurrency,
+                    "vendor_history_df": st.session_state.vendor_history_df,
+                    **vendor_indexes,
+                    "bids": bids_text,
+                    "bids_df": bids_df,
+                    "bid_vendor_index": get_bid_vendor_index(bids_df, bids_fingerprint) if bids_df is not None else None,
+                    "prior_run": similar_run if use_similar_run_as_example else None,
+                    "fused_closing_steps": fuse_closing_steps
+                }, {} if recompute_all else {key: artifacts[key] for key in reusable_outputs})
+        else:
+            st.error("Please provide the Business Requirements, Vendor History and Bids data.")
+    show_job("run_all")
+
+
 # #### Step 1: Technical Requirements Document
 
 # In[262]:
 
 
+def generate_tech_req(job, generate, cache, business_req, map_reduce, max_concurrency, example=None):
+    """Generate the Technical Requirements, adapting those of example, an earlier similar run, when given."""
+    with track("tech_req_doc"):
+        if map_reduce:
+            tech_req_doc = asyncio.run(arun_tech_req_map_reduce(
+                chains, business_req, cache, max_concurrency=max_concurrency
+            ))
+        elif example and example["tech_req_doc"]:
+            tech_req_doc = generate(chains["tech_req_example"], {
+                "example_business_req": example["business_req"],
+                "example_tech_req": example["tech_req_doc"],
+                "business_req": business_req
+            })
+        else:
+            tech_req_doc = generate(tech_req_chain, {"business_req": business_req})
+    prior_runs.record(business_req, tech_req_doc=tech_req_doc)
+    return {"tech_req_doc": tech_req_doc}
+
+
 with st.expander("Step 1: Technical Requirements Document"):
+    if similar_run_outputs:
+        st.success("Started from the Technical Requirements and Tender Document of the earlier tender.")
+        show_outputs(similar_run_outputs, "similar_run_")
     if st.button("Generate Technical Requirements"):
         if business_req_text.strip():
-            with st.spinner("Generating Technical Requirements..."):
-                tech_req_doc = tech_req_chain.run(business_req=business_req_text)
-                st.session_state.tech_req_doc = tech_req_doc
-                st.text_area("Technical Requirements Document:", value=tech_req_doc, height=300)
-                st.download_button("Download Technical Requirements", tech_req_doc, file_name="Technical_Requirements.txt")
+            run_step(
+                "tech_req_doc", "Generating Technical Requirements", generate_tech_req,
+                business_req_text, tech_req_map_reduce, tech_req_max_concurrency,
+                similar_run if use_similar_run_as_example else None
+            )
         else:
             st.error("Please provide the Business Requirements.")
+    show_job("tech_req_doc")
 
 
 # #### Step 2: Vendor Shortlisting
@@ -424,80 +923,94 @@ with st.expander("Step 1: Technical Requirements Document"):
 # In[264]:
 
 
+def shortlist_step(job, generate, cache, vendor_history_df, retrieval_index, name_index, score_index, tech_req_doc,
+                   store=None):
+    """Shortlist vendors, ranked on score_index, or on the vendor store when store is given.
+
+    With a store, vendor_history_df may be None: the store's per-vendor averages are sent instead.
+    """
+    with track("shortlisted_vendors"):
+        # 1. Get list of all unique vendors from LLM, sending only the history of the
+        #    vendors most relevant to the technical requirements
+        with track("vendor_retrieval"):
+            if vendor_history_df is None:
+                vendor_history = store.history_csv()
+            else:
+                vendor_history = retrieve_vendor_history(vendor_history_df, retrieval_index, tech_req_doc)
+        report(job, 0.1, "Asking the LLM for suitable vendors")
+        vendor_names = run_chain(vendor_shortlist_chain, {
+            "tech_req": tech_req_doc,
+            "vendor_history": vendor_history
+        }, cache)
+        # Splitting the comma-separated string into a list
+        vendor_names_list = parse_vendor_names(vendor_names)
+
+        # 2. Rank the vendors on their history and select the top two
+        try:
+            with track("vendor_scoring"):
+                # Resolve the LLM's spelling of the names to the vendors of the history
+                vendor_names_list, unresolved = name_index.resolve_all(vendor_names_list)
+                if store is not None:
+                    score_index = store.score_index(vendor_names_list)
+                top_two_vendors = shortlist_vendors(vendor_names_list, score_index)
+        except KeyError as e:
+            raise ValueError(VENDOR_HISTORY_COLUMNS_ERROR.format(e)) from e
+        return {"shortlisted_vendors": ", ".join(top_two_vendors), "unresolved_vendors": ", ".join(unresolved)}
+
+
 with st.expander("Step 2: Vendor Shortlisting"):
     if st.button("Shortlist Vendors"):
-        if st.session_state.tech_req_doc and st.session_state.vendor_history_df is not None:
-            with st.spinner("Shortlisting Vendors..."):
-                # 0.  Print column names for debugging
-                #st.write("Vendor History DataFrame Columns:", list(st.session_state.vendor_history_df.columns))
-
-                # 1. Get list of all unique vendors from LLM
-                vendor_names = vendor_shortlist_chain.run(
-                    tech_req=st.session_state.tech_req_doc,
-                    vendor_history=vendor_history_text
+        if artifacts["tech_req_doc"] and vendor_inputs_ready:
+            try:
+                vendor_indexes = vendor_step_inputs()
+            except KeyError as e:
+                st.error(VENDOR_HISTORY_COLUMNS_ERROR.format(e))
+            else:
+                run_step(
+                    "shortlisted_vendors", "Shortlisting Vendors", shortlist_step,
+                    st.session_state.vendor_history_df, vendor_indexes["vendor_retrieval_index"],
+                    vendor_indexes["vendor_name_index"], vendor_indexes["vendor_score_index"],
+                    artifacts["tech_req_doc"], vendor_indexes["vendor_store"]
                 )
-                # Splitting the comma-separated string into a list
-                vendor_names_list = [name.strip() for name in vendor_names.split(',')]
-
-                # 2. Calculate Composite Scores
-                vendor_scores = {}
-                df = st.session_state.vendor_history_df
-                for vendor in vendor_names_list:
-                    try:
-                        vendor_data = df[df['Vendor_name'] == vendor]
-
-                        if not vendor_data.empty:  # Check if the vendor data exists
-                            avg_delivery = vendor_data['Delivery_punctuality'].mean()
-                            avg_quality = vendor_data['Quality_of_goods'].mean()
-                            avg_contract = vendor_data['Contract_term_compliance'].mean()
-                            composite_score = (avg_delivery + avg_quality + avg_contract) / 3
-                            vendor_scores[vendor] = {
-                                "composite": composite_score,
-                                "contract": avg_contract,
-                                "quality": avg_quality,
-                                "delivery": avg_delivery
-                            }
-                    except KeyError as e:
-                        st.error(f"KeyError: {e}. Please ensure the Vendor History file has a column named 'Vendor_name', 'Delivery_punctuality', 'Quality_of_goods', and 'Contract_term_compliance'")
-                        break  # Stop processing to avoid further errors
-
-                # 3. Sort Vendors Based on Composite Score and Tie-Breaking
-                sorted_vendors = sorted(vendor_scores.items(),
-                                        key=lambda item: (item[1]['composite'],
-                                                           item[1]['contract'],
-                                                           item[1]['quality'],
-                                                           item[1]['delivery']),
-                                        reverse=True)
-
-                # 4. Select Top Two Vendors
-                top_two_vendors = [vendor[0] for vendor in sorted_vendors[:2]]
-                st.session_state.shortlisted_vendors = ", ".join(top_two_vendors)
-
-                st.text_area("Shortlisted Vendors:", value=st.session_state.shortlisted_vendors, height=200)
-                st.download_button("Download Vendor Shortlist", st.session_state.shortlisted_vendors, file_name="Vendor_Shortlist.txt")
-
         else:
             st.error("Ensure Technical Requirements and Vendor History are provided and in the correct format.")
+    show_job("shortlisted_vendors")
 
 
-# #### Step 3: Tender Document & RFP 
+# #### Step 3: Tender Document & RFP
 
 # In[266]:
 
 
+def generate_tender_doc(job, generate, cache, tech_req_doc, business_req, example=None):
+    """Generate the Tender Document, adapting that of example, an earlier similar run, when given."""
+    with track("tender_doc"):
+        if example and example["tender_doc"]:
+            tender_doc = generate(chains["tender_doc_example"], {
+                "example_tender_doc": example["tender_doc"],
+                "tech_req": tech_req_doc,
+                "business_req": business_req
+            })
+        else:
+            tender_doc = generate(tender_doc_chain, {
+                "tech_req": tech_req_doc,
+                "business_req": business_req
+            })
+    prior_runs.record(business_req, tender_doc=tender_doc)
+    return {"tender_doc": tender_doc}
+
+
 with st.expander("Step 3: Tender Document & RFP"):
     if st.button("Generate Tender Document"):
-        if st.session_state.tech_req_doc and business_req_text.strip():
-            with st.spinner("Generating Tender Document..."):
-                tender_doc = tender_doc_chain.run(
-                    tech_req=st.session_state.tech_req_doc,
-                    business_req=business_req_text
-                )
-                st.session_state.tender_doc = tender_doc
-                st.text_area("Tender Document & RFP:", value=tender_doc, height=300)
-                st.download_button("Download Tender Document", tender_doc, file_name="Tender_Document.txt")
+        if artifacts["tech_req_doc"] and business_req_text.strip():
+            run_step(
+                "tender_doc", "Generating Tender Document", generate_tender_doc,
+                artifacts["tech_req_doc"], business_req_text,
+                similar_run if use_similar_run_as_example else None
+            )
         else:
             st.error("Ensure Business Requirements and Technical Requirements are provided.")
+    show_job("tender_doc")
 
 
 # #### Step 4: Tender Email Generation
@@ -505,19 +1018,23 @@ with st.expander("Step 3: Tender Document & RFP"):
 # In[268]:
 
 
+def generate_tender_email(job, generate, cache, shortlisted_vendors, tender_doc, vendor_history_df):
+    with track("tender_email"):
+        # One LLM call writes the email, which is then personalized for each vendor
+        tender_emails = generate_vendor_emails(chains, shortlisted_vendors, tender_doc, vendor_history_df, cache)
+        return {"tender_email": combine_emails(tender_emails)}
+
+
 with st.expander("Step 4: Tender Email Generation"):
     if st.button("Generate Tender Email"):
-        if st.session_state.shortlisted_vendors and st.session_state.tender_doc:
-            with st.spinner("Generating Tender Email..."):
-                tender_email = tender_email_chain.run(
-                    shortlisted_vendors=st.session_state.shortlisted_vendors,
-                    tender_doc=st.session_state.tender_doc
-                )
-                st.session_state.tender_email = tender_email
-                st.text_area("Tender Email:", value=tender_email, height=200)
-                st.download_button("Download Tender Email", tender_email, file_name="Tender_Email.txt")
+        if artifacts["shortlisted_vendors"] and artifacts["tender_doc"]:
+            run_step(
+                "tender_email", "Generating Tender Email", generate_tender_email,
+                artifacts["shortlisted_vendors"], artifacts["tender_doc"], st.session_state.vendor_history_df
+            )
         else:
             st.error("Ensure Vendor Shortlist and Tender Document are generated.")
+    show_job("tender_email")
 
 
 # #### Step 5: Bid Evaluation
@@ -525,43 +1042,51 @@ with st.expander("Step 4: Tender Email Generation"):
 # In[270]:
 
 
-with st.expander("Step 5: Bid Evaluation"):
-    if st.button("Evaluate Bids"):
-        if bids_text.strip() and st.session_state.shortlisted_vendors:
-            with st.spinner("Filtering Bids for Top Vendors..."):
-                # Extract bids from shortlisted vendors using LLM
-                extract_bids_prompt = PromptTemplate(
-                    input_variables=["shortlisted_vendors", "bids_data"],
-                    template="""
-Context:TransGlobal Industries Automated procurement process.
-Role: You are a bid data extraction specialist.
-Task: Identify and extract the COMPLETE bid data ONLY for the following shortlisted vendors.
-Action: Return ONLY the complete bid data for these vendors. If a vendor has no bid in the "All Bids" data, skip it. Return each bid on a new line. If the vendor name can not be found in the all bids, skip it.
-
-Shortlisted Vendors: {shortlisted_vendors}
-
-All Bids:
-{bids_data}
-"""
-                )
-                extract_bids_chain = LLMChain(llm=llm, prompt=extract_bids_prompt)
+def evaluate_bids(job, generate, cache, shortlisted_vendors, bids, bids_df, bid_vendor_index=None):
+    """Filter the bids of the shortlisted vendors, with the LLM when bids_df is None, then evaluate them.
 
-                shortlisted_vendors_str = st.session_state.shortlisted_vendors  # Access shortlisted vendors from session state
-
-                filtered_bids = extract_bids_chain.run(
-                    shortlisted_vendors=shortlisted_vendors_str,
-                    bids_data=bids_text
-                )
+    Tabular bids are ranked locally by bid_scoring.py and the LLM only justifies the top
+    bids; bids without numeric criteria columns are still evaluated by the LLM.
+    """
+    with track("top_two_bids"):
+        if bids_df is None:
+            # Extract bids from shortlisted vendors using LLM
+            top_two_bids = run_chain(extract_bids_chain, {
+                "shortlisted_vendors": shortlisted_vendors,
+                "bids_data": bids
+            }, cache)
+        else:
+            try:
+                with track("bid_filtering"):
+                    top_two_bids = filter_bids(bids_df, shortlisted_vendors, bid_vendor_index)
+            except KeyError as e:
+                raise ValueError("The Bids file has no vendor name column. Please add a 'Vendor_name' column or enable LLM bid extraction.") from e
+
+    report(job, 0.5, "Evaluating Bids")
+    with track("bid_evaluation"):
+        ranking = rank_bids(top_two_bids) if bids_df is not None else None
+        if ranking is not None:
+            justification = generate(bid_justification_chain, {"ranked_bids": ranking})
+            bid_evaluation = f"{ranking}\n\nJustification:\n{justification.strip()}"
+        else:
+            bid_evaluation = generate(bid_evaluation_chain, {"bids_data": top_two_bids})
+    return {"top_two_bids": top_two_bids, "bid_evaluation": bid_evaluation}
 
-                st.session_state.top_two_bids = filtered_bids
 
-                with st.spinner("Evaluating Bids..."):
-                    bid_evaluation = bid_evaluation_chain.run(bids_data=st.session_state.top_two_bids)
-                    st.session_state.bid_evaluation = bid_evaluation
-                    st.text_area("Bid Evaluation Report:", value=bid_evaluation, height=300)
-                    st.download_button("Download Bid Evaluation", bid_evaluation, file_name="Bid_Evaluation.txt")
+with st.expander("Step 5: Bid Evaluation"):
+    if st.button("Evaluate Bids"):
+        if bids_provided and artifacts["shortlisted_vendors"]:
+            if not use_llm_bid_extraction and bids_df is None:
+                st.error("The Bids data is not a valid CSV, Parquet or Arrow table. Fix the file or enable LLM bid extraction.")
+            else:
+                run_step(
+                    "bid_evaluation", "Filtering and Evaluating Bids for Top Vendors", evaluate_bids,
+                    artifacts["shortlisted_vendors"], bids_text, bids_df,
+                    get_bid_vendor_index(bids_df, bids_fingerprint) if bids_df is not None else None
+                )
         else:
             st.error("Please provide the Bids data and ensure Vendor Shortlisting is complete.")
+    show_job("bid_evaluation")
 
 
 # #### Step 6: Negotiation Strategy & BATNA
@@ -569,18 +1094,26 @@ All Bids:
 # In[272]:
 
 
+def generate_negotiation_strategy(job, generate, cache, bid_evaluation, top_two_bids="", fused=False):
+    """Generate the negotiation strategy, or with fused the Steps 6-8 outputs in one call."""
+    with track("negotiation_strategy"):
+        if fused:
+            return run_fused_steps(chains, bid_evaluation, top_two_bids, generate)
+        return {"negotiation_strategy": generate(negotiation_strategy_chain, {"top_two_bids": bid_evaluation})}
+
+
 with st.expander("Step 6: Negotiation Strategy & BATNA"):
+    if fuse_closing_steps:
+        st.caption("Steps 6-8 are generated in one call: this step also writes the Risk Assessment and Contract Document.")
     if st.button("Generate Negotiation Strategy"):
-        if st.session_state.bid_evaluation:
-            with st.spinner("Generating Negotiation Strategy..."):
-                negotiation_strategy = negotiation_strategy_chain.run(
-                    top_two_bids=st.session_state.bid_evaluation
-                )
-                st.session_state.negotiation_strategy = negotiation_strategy
-                st.text_area("Negotiation Strategy & BATNA:", value=negotiation_strategy, height=300)
-                st.download_button("Download Negotiation Strategy", negotiation_strategy, file_name="Negotiation_Strategy.txt")
+        if artifacts["bid_evaluation"]:
+            run_step(
+                "negotiation_strategy", "Generating Negotiation Strategy", generate_negotiation_strategy,
+                artifacts["bid_evaluation"], artifacts["top_two_bids"], fuse_closing_steps
+            )
         else:
             st.error("Ensure Bid Evaluation is completed.")
+    show_job("negotiation_strategy")
 
 
 # #### Step 7: Risk Assessment Report
@@ -588,19 +1121,24 @@ with st.expander("Step 6: Negotiation Strategy & BATNA"):
 # In[274]:
 
 
+def generate_risk_assessment(job, generate, cache, negotiation_strategy, top_two_bids):
+    with track("risk_assessment"):
+        return {"risk_assessment": generate(risk_assessment_chain, {
+            "negotiation_strategy": negotiation_strategy,
+            "bid_data": top_two_bids
+        })}
+
+
 with st.expander("Step 7: Risk Assessment Report"):
     if st.button("Generate Risk Assessment"):
-        if st.session_state.negotiation_strategy and st.session_state.top_two_bids.strip():
-            with st.spinner("Generating Risk Assessment Report..."):
-                risk_assessment = risk_assessment_chain.run(
-                    negotiation_strategy=st.session_state.negotiation_strategy,
-                    bid_data=st.session_state.top_two_bids
-                )
-                st.session_state.risk_assessment = risk_assessment
-                st.text_area("Risk Assessment Report:", value=risk_assessment, height=300)
-                st.download_button("Download Risk Assessment", risk_assessment, file_name="Risk_Assessment.txt")
+        if artifacts["negotiation_strategy"] and artifacts["top_two_bids"].strip():
+            run_step(
+                "risk_assessment", "Generating Risk Assessment Report", generate_risk_assessment,
+                artifacts["negotiation_strategy"], artifacts["top_two_bids"]
+            )
         else:
             st.error("Ensure Negotiation Strategy and Bids data are provided.")
+    show_job("risk_assessment")
 
 
 # #### Step 8: Contract Document Generation
@@ -608,25 +1146,154 @@ with st.expander("Step 7: Risk Assessment Report"):
 # In[276]:
 
 
+def generate_contract_doc(job, generate, cache, risk_assessment):
+    with track("contract_doc"):
+        return {"contract_doc": generate(contract_doc_chain, {"risk_assessment": risk_assessment})}
+
+
 with st.expander("Step 8: Contract Document Generation"):
     if st.button("Generate Contract Document"):
-        if st.session_state.risk_assessment:
-            with st.spinner("Generating Contract Document..."):
-                contract_doc = contract_doc_chain.run(
-                    risk_assessment=st.session_state.risk_assessment
-                )
-                st.session_state.contract_doc = contract_doc
-                st.text_area("Contract Document:", value=contract_doc, height=300)
-                st.download_button("Download Contract Document", contract_doc, file_name="Contract_Document.txt")
+        if artifacts["risk_assessment"]:
+            run_step(
+                "contract_doc", "Generating Contract Document", generate_contract_doc,
+                artifacts["risk_assessment"]
+            )
         else:
             st.error("Ensure Risk Assessment is completed.")
+    show_job("contract_doc")
+
+
+# #### Speculative Prefetch
+
+# With "Prefetch the next steps" on, every step whose inputs are ready and up to date and
+# whose output is missing or stale is started in the background, on idle workers only,
+# and kept for the click. A prefetch whose inputs have changed since it started is cancelled.
+
+# In[277]:
+
+
+def prefetch_arguments():
+    """Return step name -> (step function, arguments) for the steps whose inputs are ready."""
+    state = st.session_state
+    candidates = {}
+    if artifacts["tech_req_doc"] and vendor_inputs_ready:
+        try:
+            vendor_indexes = vendor_step_inputs()
+            candidates["shortlisted_vendors"] = (shortlist_step, (
+                state.vendor_history_df,
+                vendor_indexes["vendor_retrieval_index"],
+                vendor_indexes["vendor_name_index"],
+                vendor_indexes["vendor_score_index"],
+                artifacts["tech_req_doc"],
+                vendor_indexes["vendor_store"],
+            ))
+        except KeyError:
+            pass
+    if artifacts["tech_req_doc"] and business_req_text.strip():
+        candidates["tender_doc"] = (generate_tender_doc, (
+            artifacts["tech_req_doc"], business_req_text, similar_run if use_similar_run_as_example else None
+        ))
+    if artifacts["shortlisted_vendors"] and artifacts["tender_doc"]:
+        candidates["tender_email"] = (generate_tender_email, (
+            artifacts["shortlisted_vendors"], artifacts["tender_doc"], state.vendor_history_df
+        ))
+    if bids_provided and artifacts["shortlisted_vendors"] and (use_llm_bid_extraction or bids_df is not None):
+        candidates["bid_evaluation"] = (evaluate_bids, (
+            artifacts["shortlisted_vendors"], bids_text, bids_df,
+            get_bid_vendor_index(bids_df, bids_fingerprint) if bids_df is not None else None
+        ))
+    if artifacts["bid_evaluation"]:
+        candidates["negotiation_strategy"] = (generate_negotiation_strategy, (
+            artifacts["bid_evaluation"], artifacts["top_two_bids"], fuse_closing_steps
+        ))
+    if artifacts["negotiation_strategy"] and artifacts["top_two_bids"].strip():
+        candidates["risk_assessment"] = (generate_risk_assessment, (
+            artifacts["negotiation_strategy"], artifacts["top_two_bids"]
+        ))
+    if artifacts["risk_assessment"]:
+        candidates["contract_doc"] = (generate_contract_doc, (artifacts["risk_assessment"],))
+    return candidates
+
+
+def job_active(name):
+    """Whether the session's job for step name is queued or running."""
+    entry = st.session_state.jobs.get(name)
+    job = job_queue.get(entry["job_id"]) if entry else None
+    return job is not None and not job.done
+
+
+def prefetch_steps():
+    """Cancel the prefetches made on outdated inputs and start the ones that are ready, within the budget."""
+    # A full run computes every step anyway
+    candidates = prefetch_arguments() if prefetch_next_steps and not job_active("run_all") else {}
+    # Steps whose upstream outputs are stale would be prefetched on outdated documents
+    stale = stale_steps(input_fingerprints, artifacts, st.session_state.step_fingerprints)
+    candidates = {
+        name: candidate for name, candidate in candidates.items()
+        if not any(key in stale for key in PIPELINE_DAG[STEP_FINGERPRINT_KEYS.get(name, name)][1])
+    }
+    for name, entry in list(st.session_state.prefetch.items()):
+        if name not in candidates or entry["fingerprint"] != current_step_fingerprint(name):
+            job_queue.cancel(entry["job_id"])
+            del st.session_state.prefetch[name]
+
+    for name, (function, arguments) in candidates.items():
+        fingerprint_now = current_step_fingerprint(name)
+        up_to_date = st.session_state.step_fingerprints.get(STEP_FINGERPRINT_KEYS.get(name, name)) == fingerprint_now
+        if name in st.session_state.prefetch or up_to_date or job_active(name):
+            continue
+        # Speculative work only takes idle workers and stops at the session's budget
+        if st.session_state.prefetch_spent >= PREFETCH_MAX_STEPS or job_queue.stats()["queued"]:
+            break
+        try:
+            job = job_queue.submit(
+                f"{st.session_state.user_id}:prefetch", f"prefetch {name}", function,
+                functools.partial(run_chain, cache=response_cache), response_cache, *arguments
+            )
+        except JobLimitError:
+            break
+        st.session_state.prefetch[name] = {
+            "job_id": job.id,
+            "fingerprint": fingerprint_now,
+            "snapshot": (dict(input_fingerprints), artifacts.snapshot()),
+        }
+        st.session_state.prefetch_spent += 1
+
+
+prefetch_steps()
+
 
+# #### Background Job Status
 
-# ## 7. Adding a Fixed Footer
+# While this session has steps running in the background, a fragment polls them and
+# reruns the page as soon as one finishes so its outputs are shown.
 
 # In[278]:
 
 
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def watch_jobs(job_ids):
+    jobs = [job_queue.get(job_id) for job_id in job_ids]
+    if any(job is None or job.done for job in jobs):
+        st.rerun()
+    for job in jobs:
+        st.progress(job.progress, text=f"{job.name}: {job.message or job.status}")
+
+
+active_job_ids = [
+    entry["job_id"] for entry in st.session_state.jobs.values()
+    if (job := job_queue.get(entry["job_id"])) is not None and not job.done
+]
+if active_job_ids:
+    st.subheader("Running Steps")
+    watch_jobs(active_job_ids)
+
+
+# ## 8. Adding a Fixed Footer
+
+# In[279]:
+
+
 st.markdown("""
     <style>
         .fixed-footer {
@@ -0,0 +1,6 @@
+"""Offline performance benchmarks of the procurement pipeline.
+
+The benchmarks run the pipeline against procurement.fake_llm.SimulatedChatModel and
+synthetic vendor history and bids files, so they need neither a Gemini API key nor
+network access. Run them with `python -m benchmarks.run`.
+"""
@@ -0,0 +1,116 @@
+"""Fused Steps 6-8 benchmark against the three-call path.
+
+    python -m benchmarks.fused
+    python -m benchmarks.fused --first-token-latency 1.0 --latency-per-token 0.01 --repeat 5
+
+A SimulatedChatModel answers the negotiation strategy, risk assessment and contract
+document prompts with documents of realistic length, and the fused prompt with the three
+of them under their marker lines. The same bid evaluation goes through the three chained
+calls and through the fused call; the wall time, LLM calls and tokens of both paths are
+reported. The run fails when the fused response is not split into the three documents.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+from procurement.cache import arun_chain
+from procurement.chains import build_chains
+from procurement.fake_llm import SimulatedChatModel
+from procurement.fused_steps import FUSED_SECTIONS, arun_fused_steps
+from procurement.telemetry import track
+
+# Sentences of the simulated documents; about 20 tokens each
+SECTION_SENTENCES = {
+    "negotiation_strategy": (35, "Open with the price gap to the second bid and trade volume commitments for unit price."),
+    "risk_assessment": (45, "Delivery risk is moderate given the vendor's punctuality record and the agreed lead time."),
+    "contract_doc": (90, "The supplier shall meet the performance guarantees and remedy any defect within thirty days."),
+}
+
+
+def simulated_documents():
+    return {key: " ".join([sentence] * count) for key, (count, sentence) in SECTION_SENTENCES.items()}
+
+
+def simulated_inputs():
+    """Bid evaluation and selected bids of the size Step 5 produces."""
+    bid_evaluation = "Top 2 Bids\n\n" + "\n".join(
+        f"{rank}. Vendor {rank} - score 0.{9 - rank}00. " + "Strong price and delivery record with full compliance. " * 20
+        for rank in (1, 2)
+    )
+    top_two_bids = "Vendor_name,Price,Delivery_days,Quality_score\nVendor 1,98000,21,8.7\nVendor 2,101500,14,9.1\n"
+    return bid_evaluation, top_two_bids
+
+
+def create_llm(documents, first_token_latency, latency_per_token):
+    fused = "\n".join(f"===== {title} =====\n{documents[key]}" for key, title in FUSED_SECTIONS.items())
+    return SimulatedChatModel(
+        responses=[
+            ("===== CONTRACT DOCUMENT =====", fused),
+            ("negotiation strategist", documents["negotiation_strategy"]),
+            ("risk assessment specialist", documents["risk_assessment"]),
+            ("contract drafting expert", documents["contract_doc"]),
+        ],
+        first_token_latency=first_token_latency,
+        latency_per_token=latency_per_token,
+    )
+
+
+async def three_calls(chains, bid_evaluation, top_two_bids):
+    negotiation_strategy = await arun_chain(chains["negotiation_strategy"], {"top_two_bids": bid_evaluation})
+    risk_assessment = await arun_chain(chains["risk_assessment"], {
+        "negotiation_strategy": negotiation_strategy,
+        "bid_data": top_two_bids
+    })
+    contract_doc = await arun_chain(chains["contract_doc"], {"risk_assessment": risk_assessment})
+    return {"negotiation_strategy": negotiation_strategy, "risk_assessment": risk_assessment, "contract_doc": contract_doc}
+
+
+def measure(path, chains, bid_evaluation, top_two_bids, repeat):
+    """Run one path repeat times; return its median wall time, calls and tokens, and its last outputs."""
+    wall_times = []
+    for _ in range(repeat):
+        with track(f"benchmark_fused:{path.__name__}") as handler:
+            started_at = time.perf_counter()
+            outputs = asyncio.run(path(chains, bid_evaluation, top_two_bids))
+            wall_times.append(time.perf_counter() - started_at)
+    return {
+        "wall_time": round(statistics.median(wall_times), 3),
+        "llm_calls": handler.llm_calls,
+        "prompt_tokens": handler.prompt_tokens,
+        "completion_tokens": handler.completion_tokens,
+    }, outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the fused Steps 6-8 call against the three-call path.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--first-token-latency", type=float, default=0.5,
+                        help="simulated seconds before the first token of every LLM call")
+    parser.add_argument("--latency-per-token", type=float, default=0.002,
+                        help="simulated seconds per output token")
+    args = parser.parse_args(argv)
+
+    documents = simulated_documents()
+    chains = build_chains(create_llm(documents, args.first_token_latency, args.latency_per_token))
+    bid_evaluation, top_two_bids = simulated_inputs()
+
+    three_call_results, _ = measure(three_calls, chains, bid_evaluation, top_two_bids, args.repeat)
+    fused_results, fused_outputs = measure(arun_fused_steps, chains, bid_evaluation, top_two_bids, args.repeat)
+    split_ok = fused_outputs == documents and fused_results["llm_calls"] == 1
+    results = {
+        "three_calls": three_call_results,
+        "fused": fused_results,
+        "speedup": round(three_call_results["wall_time"] / fused_results["wall_time"], 2),
+        "prompt_tokens_saved": three_call_results["prompt_tokens"] - fused_results["prompt_tokens"],
+        "split_ok": split_ok,
+    }
+    print(json.dumps(results, indent=2))
+    return 0 if split_ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
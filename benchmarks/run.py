@@ -0,0 +1,176 @@
+"""Benchmark runner.
+
+    python -m benchmarks.run                      # 1k and 100k rows, compared with baseline.json
+    python -m benchmarks.run --sizes 1k 100k 10m
+    python -m benchmarks.run --update-baseline    # accept the current timings as the new baseline
+
+For every size the runner measures, as the median of --repeat runs:
+
+- end_to_end: parsing both files, building the vendor indexes and a full run_pipeline
+  with the simulated model and no response cache
+- vendor_scoring: Step 2 scoring, build_vendor_score_index plus shortlist_vendors
+- bid_filtering: Step 5 filter_bids on the parsed bids
+- bid_scoring: Step 5 rank_bids on the filtered bids
+
+Results are written to results/latest.json and appended to results/history.jsonl. The
+run exits with status 1 when a metric is slower than its baseline by more than
+--tolerance (relative) and --min-delta seconds.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, "results")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+# Keep the benchmark runs out of the app's telemetry log
+os.environ.setdefault("PROCUREMENT_TELEMETRY_PATH", os.path.join(RESULTS_DIR, "telemetry.jsonl"))
+
+from procurement.bid_scoring import rank_bids  # noqa: E402
+from procurement.bids import build_bid_vendor_index, filter_bids, parse_bids  # noqa: E402
+from procurement.chains import build_chains  # noqa: E402
+from procurement.fake_llm import SimulatedChatModel  # noqa: E402
+from procurement.inputs import read_vendor_history  # noqa: E402
+from procurement.pipeline import run_pipeline  # noqa: E402
+from procurement.retrieval import VendorRetrievalIndex  # noqa: E402
+from procurement.scoring import build_vendor_score_index, shortlist_vendors  # noqa: E402
+from procurement.vendor_names import VendorNameIndex  # noqa: E402
+
+from . import synthetic  # noqa: E402
+
+
+def create_benchmark_llm(first_token_latency, latency_per_token):
+    return SimulatedChatModel(
+        responses=[("vendor identification specialist", synthetic.shortlist_response())],
+        first_token_latency=first_token_latency,
+        latency_per_token=latency_per_token
+    )
+
+
+def _timed(function):
+    started_at = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started_at
+
+
+def run_end_to_end(chains, history_data, bids_data, business_req):
+    vendor_history_df = read_vendor_history(history_data, "vendor_history.csv")
+    bids_df = parse_bids(bids_data)
+    return asyncio.run(run_pipeline(chains, {
+        "business_req": business_req,
+        "tech_req_map_reduce": False,
+        "tech_req_max_concurrency": 1,
+        "vendor_history_df": vendor_history_df,
+        "vendor_score_index": build_vendor_score_index(vendor_history_df),
+        "vendor_retrieval_index": VendorRetrievalIndex(vendor_history_df),
+        "vendor_name_index": VendorNameIndex(vendor_history_df["Vendor_name"].dropna().unique()),
+        "bids": None,
+        "bids_df": bids_df,
+    }))
+
+
+def benchmark_size(size, chains, repeat):
+    """Return metric name -> median seconds for one input size."""
+    history_path, bids_path = synthetic.ensure_inputs(size)
+    with open(history_path, "rb") as history_file:
+        history_data = history_file.read()
+    with open(bids_path, "rb") as bids_file:
+        bids_data = bids_file.read()
+    business_req = synthetic.business_requirements()
+    vendor_history_df = read_vendor_history(history_data, "vendor_history.csv")
+    bids_df = parse_bids(bids_data)
+    # Built once per parsed bids file, as the app and the API do
+    bid_vendor_index = build_bid_vendor_index(bids_df)
+    vendor_names = [name.strip() for name in synthetic.shortlist_response().split(",")]
+
+    timings = {"end_to_end": [], "vendor_scoring": [], "bid_filtering": [], "bid_scoring": []}
+    for _ in range(repeat):
+        _, elapsed = _timed(lambda: run_end_to_end(chains, history_data, bids_data, business_req))
+        timings["end_to_end"].append(elapsed)
+        shortlist, elapsed = _timed(
+            lambda: shortlist_vendors(vendor_names, build_vendor_score_index(vendor_history_df))
+        )
+        timings["vendor_scoring"].append(elapsed)
+        filtered_bids, elapsed = _timed(lambda: filter_bids(bids_df, ", ".join(shortlist), bid_vendor_index))
+        timings["bid_filtering"].append(elapsed)
+        _, elapsed = _timed(lambda: rank_bids(filtered_bids))
+        timings["bid_scoring"].append(elapsed)
+    return {metric: round(statistics.median(values), 4) for metric, values in timings.items()}
+
+
+def find_regressions(results, baseline, tolerance, min_delta):
+    """Return one message per metric slower than its baseline beyond the thresholds."""
+    regressions = []
+    for size, metrics in results.items():
+        for metric, seconds in metrics.items():
+            reference = baseline.get(size, {}).get(metric)
+            if reference is None:
+                continue
+            if seconds > reference * (1 + tolerance) and seconds - reference > min_delta:
+                regressions.append(f"{size} {metric}: {seconds:.3f}s vs baseline {reference:.3f}s")
+    return regressions
+
+
+def _write_results(run):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    with open(os.path.join(RESULTS_DIR, "latest.json"), "w", encoding="utf-8") as latest_file:
+        json.dump(run, latest_file, indent=2)
+    with open(os.path.join(RESULTS_DIR, "history.jsonl"), "a", encoding="utf-8") as history_file:
+        history_file.write(json.dumps(run) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks of the procurement pipeline.")
+    parser.add_argument("--sizes", nargs="+", choices=list(synthetic.SIZES), default=["1k", "100k"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--first-token-latency", type=float, default=0.05,
+                        help="simulated seconds before the first token of every LLM call")
+    parser.add_argument("--latency-per-token", type=float, default=0.0005,
+                        help="simulated seconds per output token")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown against the baseline")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="slowdowns below this many seconds are ignored as noise")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    chains = build_chains(create_benchmark_llm(args.first_token_latency, args.latency_per_token))
+    results = {}
+    for size in args.sizes:
+        results[size] = benchmark_size(size, chains, args.repeat)
+        print(size, json.dumps(results[size]))
+
+    _write_results({
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "settings": {key: value for key, value in vars(args).items() if key != "update_baseline"},
+        "results": results,
+    })
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    regressions = find_regressions(results, baseline, args.tolerance, args.min_delta)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Synthetic procurement inputs for the benchmarks.
+
+Vendor history and bids CSVs are generated from a fixed seed, in chunks so the 10M-row
+files are written without holding them in memory, and kept in DATA_DIR between runs.
+"""
+
+import os
+
+# Row counts of the generated files by size label
+SIZES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "10m": 10_000_000,
+}
+
+DATA_DIR = os.getenv("PROCUREMENT_BENCHMARK_DATA_DIR", os.path.join(os.path.dirname(__file__), "data"))
+
+# Rows generated and written at a time
+CHUNK_ROWS = 1_000_000
+
+# Every vendor has about this many history rows, up to MAX_VENDORS vendors
+ROWS_PER_VENDOR = 10
+MAX_VENDORS = 50_000
+
+CAPABILITIES = [
+    "cloud hosting", "network security", "data warehousing", "erp integration", "field logistics",
+    "industrial sensors", "fleet telematics", "payment processing", "identity management", "call centre",
+    "office hardware", "mobile applications", "machine learning", "backup and recovery", "compliance audit",
+]
+
+SEED = 20240101
+
+
+def vendor_name(number):
+    return f"Vendor {number:05d}"
+
+
+def vendor_count(rows):
+    return max(5, min(MAX_VENDORS, rows // ROWS_PER_VENDOR))
+
+
+def shortlist_response(count=5):
+    """Comma-separated vendor names the simulated model returns for the vendor shortlist prompt."""
+    return ", ".join(vendor_name(number) for number in range(count))
+
+
+def _write_chunks(path, rows, make_chunk):
+    import numpy as np
+
+    rng = np.random.default_rng(SEED)
+    with open(path + ".tmp", "w", encoding="utf-8", newline="") as csv_file:
+        for start in range(0, rows, CHUNK_ROWS):
+            chunk = make_chunk(rng, min(CHUNK_ROWS, rows - start))
+            chunk.to_csv(csv_file, index=False, header=start == 0)
+    os.replace(path + ".tmp", path)
+
+
+def _vendor_history_chunk(rng, rows, vendors):
+    import numpy as np
+    import pandas as pd
+
+    numbers = rng.integers(0, vendors, rows)
+    return pd.DataFrame({
+        "Vendor_name": [vendor_name(number) for number in numbers],
+        "Capability": np.asarray(CAPABILITIES)[(numbers + rng.integers(0, 2, rows)) % len(CAPABILITIES)],
+        "Delivery_punctuality": rng.uniform(1, 10, rows).round(1),
+        "Quality_of_goods": rng.uniform(1, 10, rows).round(1),
+        "Contract_term_compliance": rng.uniform(1, 10, rows).round(1),
+    })
+
+
+def _bids_chunk(rng, rows, vendors):
+    import pandas as pd
+
+    numbers = rng.integers(0, vendors, rows)
+    return pd.DataFrame({
+        "Vendor_name": [vendor_name(number) for number in numbers],
+        "Bid_price": rng.uniform(50_000, 500_000, rows).round(2),
+        "Delivery_days": rng.integers(14, 180, rows),
+        "Warranty_years": rng.integers(1, 6, rows),
+        "Technical_score": rng.uniform(1, 10, rows).round(1),
+    })
+
+
+def ensure_inputs(size):
+    """Generate the vendor history and bids CSVs of a size label if missing; return their paths."""
+    rows = SIZES[size]
+    vendors = vendor_count(rows)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    history_path = os.path.join(DATA_DIR, f"vendor_history_{size}.csv")
+    bids_path = os.path.join(DATA_DIR, f"bids_{size}.csv")
+    if not os.path.exists(history_path):
+        _write_chunks(history_path, rows, lambda rng, count: _vendor_history_chunk(rng, count, vendors))
+    if not os.path.exists(bids_path):
+        _write_chunks(bids_path, rows, lambda rng, count: _bids_chunk(rng, count, vendors))
+    return history_path, bids_path
+
+
+def business_requirements(sections=12):
+    """Return a Business Requirements document with numbered sections."""
+    parts = ["TransGlobal Industries - Business Requirements\n"]
+    for number in range(1, sections + 1):
+        capability = CAPABILITIES[number % len(CAPABILITIES)]
+        parts.append(
+            f"{number}. {capability.title()}\n"
+            f"The supplier shall provide {capability} services for all regional offices, "
+            f"with guaranteed availability, documented service levels and quarterly reporting.\n"
+        )
+    return "\n".join(parts)
@@ -0,0 +1,70 @@
+"""Rate limiter benchmark against a simulated quota-enforcing Gemini endpoint.
+
+    python -m benchmarks.throttling
+    python -m benchmarks.throttling --calls 200 --threads 32 --quota 30 --window 5
+
+SimulatedChatModel stands in for the server: it answers with latency and returns 429
+once more than --quota requests arrive within --window seconds. The same burst of calls
+is sent once straight to the model and once through the shared RateLimiter; the run
+fails when any call through the limiter still fails.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from procurement.fake_llm import SimulatedChatModel
+from procurement.rate_limit import RateLimiter, rate_limited
+
+
+def burst(llm, calls, threads):
+    """Send calls prompts from threads threads; return the successes, failures and wall time."""
+    def call(number):
+        try:
+            llm.invoke(f"Request {number}")
+            return True
+        except Exception:
+            return False
+
+    started_at = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        outcomes = list(executor.map(call, range(calls)))
+    return {
+        "succeeded": sum(outcomes),
+        "failed": len(outcomes) - sum(outcomes),
+        "wall_time": round(time.perf_counter() - started_at, 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the LLM rate limiter against a throttling simulated model.")
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--quota", type=int, default=20, help="requests the simulated server accepts per window")
+    parser.add_argument("--window", type=float, default=2.0, help="quota window in seconds")
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per call")
+    parser.add_argument("--rpm", type=float, default=None,
+                        help="requests per minute of the limiter; by default 20%% above the server quota so throttling occurs")
+    args = parser.parse_args(argv)
+
+    def server():
+        return SimulatedChatModel(
+            quota_requests=args.quota, quota_window=args.window, first_token_latency=args.latency
+        )
+
+    limiter = RateLimiter(
+        requests_per_minute=args.rpm or args.quota * 60 / args.window * 1.2,
+        max_concurrency=args.threads, max_retries=8, backoff_base=args.window / 8, backoff_cap=args.window
+    )
+    results = {
+        "direct": burst(server(), args.calls, args.threads),
+        "rate_limited": {**burst(rate_limited(server(), limiter), args.calls, args.threads), **limiter.stats()},
+    }
+    print(json.dumps(results, indent=2))
+    return 1 if results["rate_limited"]["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,31 @@
+"""Procurement automation pipeline for TransGlobal Industries.
+
+The Streamlit app and other entry points build on these modules:
+
+- prompts: prompt templates of the eight procurement steps
+- llm / chains: Gemini client and LLMChain factories
+- routing: per-prompt model tiers with latency budgets and fallback to the fast tier
+- fake_llm: simulated chat model for offline runs and benchmarks
+- rate_limit: shared request/token rate limiter, adaptive concurrency and retries
+- cache: persistent LLM response cache
+- context: token budgets fitting the documents passed between the steps
+- inputs: parsing of the uploaded CSV, Parquet and Arrow files into compact DataFrames
+- scoring, retrieval, bids: local vendor scoring, vendor retrieval and bid filtering
+- vendor_store: persistent running per-vendor performance sums for Step 2 scoring
+- vendor_names: normalization and trigram index resolving LLM vendor names to the history
+- prior_runs: hashed n-gram similarity index of earlier tenders, reused for near-duplicate requirements
+- bid_scoring: weighted multi-criteria bid ranking with a Pareto filter
+- emails: per-vendor tender emails from one LLM call
+- streaming: token streaming into a UI placeholder
+- map_reduce: chunked Step 1 for very large Business Requirements documents
+- pipeline: concurrent executor for a full procurement run
+- jobs: background worker pool running the steps outside the Streamlit script thread
+- session_memory: compressed per-session documents and offload of idle sessions to disk
+- fused_steps: single-call mode writing the Steps 6-8 documents, split at their section markers
+- api: headless FastAPI service exposing each step and the full pipeline as JSON endpoints
+- telemetry: per-step latency, token and cost records
+- profiling: import-time report for measuring cold start
+
+Importing the package is cheap: LangChain, the Gemini client and pandas are only
+imported when a factory or helper that needs them is called.
+"""
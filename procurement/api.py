@@ -0,0 +1,372 @@
+"""Headless HTTP API running the procurement steps without the Streamlit UI.
+
+    uvicorn procurement.api:app --host 0.0.0.0 --port 8000
+    python -m procurement.api          # same, on PROCUREMENT_API_HOST / PROCUREMENT_API_PORT
+
+Every step has an endpoint taking the outputs of the steps it depends on, and
+POST /pipeline runs all of them with the concurrent executor of pipeline.py. The
+endpoints share the prompts, chains, response cache and rate limiter of the app and call
+the LLM through the async chain APIs, so one process serves many requests at a time on
+a single event loop. The blocking work of a request runs in worker threads: parsing the
+uploads and building their vendor indexes (cached by content hash), the local parts of
+the steps (see pipeline.py), the response cache and the earlier-run lookup. Every
+response is JSON.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from collections import OrderedDict
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from pydantic import BaseModel
+
+from .bids import build_bid_vendor_index, parse_bids
+from .cache import cache_bypassed_by_default, create_llm_cache
+from .emails import split_emails
+from .fused_steps import FUSED_SECTIONS
+from .inputs import decode_text, fingerprint, read_vendor_history
+from .map_reduce import TECH_REQ_MAX_CONCURRENCY
+from .pipeline import PIPELINE_DAG, run_pipeline
+from .prior_runs import create_prior_run_index
+from .rate_limit import shared_rate_limiter
+from .retrieval import VendorRetrievalIndex
+from .scoring import VENDOR_HISTORY_COLUMNS_ERROR, build_vendor_score_index
+from .telemetry import track
+from .vendor_names import VendorNameIndex
+from .vendor_store import create_vendor_store
+
+# Parsed uploads, with their vendor indexes, kept in memory by content hash
+PARSED_UPLOADS_MAX_ENTRIES = 16
+
+INVALID_TABLE_ERROR = "The {} file is not a valid CSV, Parquet or Arrow table."
+
+
+@functools.lru_cache(maxsize=None)
+def get_chains():
+    """Build the chains once per process on the routed Gemini clients of GOOGLE_API_KEY."""
+    from .chains import build_chains
+    from .routing import create_routed_llms
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key and not os.getenv("PROCUREMENT_FAKE_LLM"):
+        raise HTTPException(503, "Google API Key is missing! Set the GOOGLE_API_KEY environment variable.")
+    return build_chains(create_routed_llms(api_key))
+
+
+@functools.lru_cache(maxsize=None)
+def get_llm_cache():
+    return create_llm_cache()
+
+
+@functools.lru_cache(maxsize=None)
+def get_vendor_store():
+    return create_vendor_store()
+
+
+@functools.lru_cache(maxsize=None)
+def get_prior_run_index():
+    return create_prior_run_index()
+
+
+async def find_similar_run(business_req, use_similar_run):
+    """Return the earlier run most similar to business_req when use_similar_run is set, else None."""
+    if not use_similar_run:
+        return None
+    return await asyncio.to_thread(get_prior_run_index().find_similar, business_req)
+
+
+def similar_run_summary(similar_run):
+    """Describe the earlier run used as the example in a response."""
+    if similar_run is None:
+        return None
+    return {"fingerprint": similar_run["fingerprint"], "similarity": similar_run["similarity"]}
+
+
+_parsed_uploads = OrderedDict()
+_parsed_uploads_lock = threading.Lock()
+
+
+def _cached_parse(kind, data, parse):
+    """Return parse(data), reusing the result for an upload with the same content."""
+    key = (kind, fingerprint(data))
+    with _parsed_uploads_lock:
+        if key in _parsed_uploads:
+            _parsed_uploads.move_to_end(key)
+            return _parsed_uploads[key]
+    value = parse(data)
+    with _parsed_uploads_lock:
+        _parsed_uploads[key] = value
+        while len(_parsed_uploads) > PARSED_UPLOADS_MAX_ENTRIES:
+            _parsed_uploads.popitem(last=False)
+    return value
+
+
+def _vendor_history_inputs(data, file_name):
+    """Parse the vendor history and build the indexes Steps 2 and 4 use."""
+    df = read_vendor_history(data, file_name)
+    return {
+        "vendor_history_df": df,
+        "vendor_score_index": build_vendor_score_index(df),
+        "vendor_retrieval_index": VendorRetrievalIndex(df),
+        "vendor_name_index": VendorNameIndex(df['Vendor_name'].dropna().unique()),
+    }
+
+
+async def load_vendor_history(upload, use_vendor_store=False):
+    """Return the pipeline inputs of an uploaded vendor history file.
+
+    With use_vendor_store the upload is optional: Step 2 then runs from the store alone.
+    """
+    if upload is None:
+        if not use_vendor_store:
+            raise HTTPException(422, "Upload the Vendor History or set use_vendor_store.")
+        return {"vendor_history_df": None, "vendor_store": get_vendor_store()}
+    data = await upload.read()
+    file_name = upload.filename or "vendor_history.csv"
+    try:
+        with track("parse_vendor_history", bytes=len(data)):
+            inputs = await asyncio.to_thread(
+                _cached_parse, f"vendor_history:{file_name}", data,
+                functools.partial(_vendor_history_inputs, file_name=file_name)
+            )
+    except KeyError as e:
+        raise HTTPException(422, VENDOR_HISTORY_COLUMNS_ERROR.format(e)) from e
+    except Exception as e:
+        raise HTTPException(422, INVALID_TABLE_ERROR.format("Vendor History")) from e
+    return {**inputs, "vendor_store": get_vendor_store() if use_vendor_store else None}
+
+
+def _bids_inputs(data, file_name):
+    """Parse the bids and build the index of their vendor names Step 5 matches the shortlist against."""
+    bids_df = parse_bids(data, file_name)
+    return {"bids_df": bids_df, "bid_vendor_index": None if bids_df is None else build_bid_vendor_index(bids_df)}
+
+
+async def load_bids(upload, use_llm_bid_extraction=False):
+    """Return the pipeline inputs of an uploaded bids file: its text for the LLM extraction, or the parsed table."""
+    data = await upload.read()
+    if use_llm_bid_extraction:
+        return {"bids": decode_text(data), "bids_df": None}
+    file_name = upload.filename or "bids.csv"
+    with track("parse_bids", bytes=len(data)):
+        inputs = await asyncio.to_thread(
+            _cached_parse, f"bids:{file_name}", data, functools.partial(_bids_inputs, file_name=file_name)
+        )
+    if inputs["bids_df"] is None:
+        raise HTTPException(422, INVALID_TABLE_ERROR.format("Bids") + " Upload a table or set use_llm_bid_extraction.")
+    return {"bids": "", **inputs}
+
+
+async def run_steps(keys, outputs, inputs, bypass_cache=False):
+    """Run the PIPELINE_DAG steps keys in order on the given upstream outputs; return the outputs."""
+    chains = get_chains()
+    cache = None if bypass_cache or cache_bypassed_by_default() else get_llm_cache()
+    outputs = dict(outputs)
+    for key in keys:
+        step, _ = PIPELINE_DAG[key]
+        try:
+            with track(key):
+                outputs[key] = await step(chains, outputs, inputs, cache)
+        except KeyError as e:
+            raise HTTPException(422, f"Missing column {e} in the uploaded data.") from e
+    return outputs
+
+
+class TechReqRequest(BaseModel):
+    business_req: str
+    map_reduce: bool = False
+    use_similar_run: bool = False
+
+
+class TenderDocRequest(BaseModel):
+    tech_req_doc: str
+    business_req: str
+    use_similar_run: bool = False
+
+
+class NegotiationStrategyRequest(BaseModel):
+    bid_evaluation: str
+    # With fused, one call also writes the risk assessment and contract document from the selected bids
+    top_two_bids: str = ""
+    fused: bool = False
+
+
+class RiskAssessmentRequest(BaseModel):
+    negotiation_strategy: str
+    top_two_bids: str
+
+
+class ContractDocRequest(BaseModel):
+    risk_assessment: str
+
+
+app = FastAPI(
+    title="TransGlobal Industries Procurement API",
+    description="The eight procurement steps of the Streamlit app as JSON endpoints.",
+)
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "rate_limiter": shared_rate_limiter().stats(),
+        "llm_cache": await asyncio.to_thread(get_llm_cache().stats),
+    }
+
+
+@app.post("/steps/tech-req")
+async def tech_req(request: TechReqRequest, bypass_cache: bool = False):
+    """Step 1: Business Requirements -> Technical Requirements Document.
+
+    With use_similar_run, the most similar earlier tender is the example the LLM adapts.
+    """
+    similar_run = await find_similar_run(request.business_req, request.use_similar_run)
+    outputs = await run_steps(["tech_req_doc"], {}, {
+        "business_req": request.business_req,
+        "tech_req_map_reduce": request.map_reduce,
+        "tech_req_max_concurrency": TECH_REQ_MAX_CONCURRENCY,
+        "prior_run": similar_run,
+    }, bypass_cache)
+    await asyncio.to_thread(get_prior_run_index().record, request.business_req, tech_req_doc=outputs["tech_req_doc"])
+    return {"tech_req_doc": outputs["tech_req_doc"], "similar_run": similar_run_summary(similar_run)}
+
+
+@app.post("/steps/vendor-shortlist")
+async def vendor_shortlist(
+    tech_req_doc: str = Form(...),
+    vendor_history: UploadFile | None = File(None),
+    use_vendor_store: bool = Form(False),
+    bypass_cache: bool = False,
+):
+    """Step 2: shortlist the vendors of the uploaded history, or of the store with use_vendor_store."""
+    inputs = await load_vendor_history(vendor_history, use_vendor_store)
+    outputs = await run_steps(["shortlisted_vendors"], {"tech_req_doc": tech_req_doc}, inputs, bypass_cache)
+    return {
+        "shortlisted_vendors": outputs["shortlisted_vendors"],
+        "unresolved_vendors": outputs.get("unresolved_vendors", ""),
+    }
+
+
+@app.post("/steps/tender-doc")
+async def tender_doc(request: TenderDocRequest, bypass_cache: bool = False):
+    """Step 3: Tender Document & RFP, adapted from the most similar earlier tender with use_similar_run."""
+    similar_run = await find_similar_run(request.business_req, request.use_similar_run)
+    outputs = await run_steps(
+        ["tender_doc"], {"tech_req_doc": request.tech_req_doc},
+        {"business_req": request.business_req, "prior_run": similar_run}, bypass_cache
+    )
+    await asyncio.to_thread(get_prior_run_index().record, request.business_req, tender_doc=outputs["tender_doc"])
+    return {"tender_doc": outputs["tender_doc"], "similar_run": similar_run_summary(similar_run)}
+
+
+@app.post("/steps/tender-email")
+async def tender_email(
+    shortlisted_vendors: str = Form(...),
+    tender_doc: str = Form(...),
+    vendor_history: UploadFile | None = File(None),
+    bypass_cache: bool = False,
+):
+    """Step 4: one tender email per shortlisted vendor, addressed from the vendor history when given."""
+    inputs = await load_vendor_history(vendor_history) if vendor_history else {"vendor_history_df": None}
+    outputs = await run_steps(
+        ["tender_email"], {"shortlisted_vendors": shortlisted_vendors, "tender_doc": tender_doc}, inputs, bypass_cache
+    )
+    return {"tender_email": outputs["tender_email"], "emails": split_emails(outputs["tender_email"])}
+
+
+@app.post("/steps/bid-evaluation")
+async def bid_evaluation(
+    shortlisted_vendors: str = Form(...),
+    bids: UploadFile = File(...),
+    use_llm_bid_extraction: bool = Form(False),
+    bypass_cache: bool = False,
+):
+    """Step 5: select the bids of the shortlisted vendors and evaluate them."""
+    inputs = await load_bids(bids, use_llm_bid_extraction)
+    outputs = await run_steps(
+        ["top_two_bids", "bid_evaluation"], {"shortlisted_vendors": shortlisted_vendors}, inputs, bypass_cache
+    )
+    return {"top_two_bids": outputs["top_two_bids"], "bid_evaluation": outputs["bid_evaluation"]}
+
+
+@app.post("/steps/negotiation-strategy")
+async def negotiation_strategy(request: NegotiationStrategyRequest, bypass_cache: bool = False):
+    """Step 6: Negotiation Strategy & BATNA from the bid evaluation; with fused, Steps 6-8 in one call."""
+    outputs = await run_steps(
+        ["negotiation_strategy"], {"bid_evaluation": request.bid_evaluation, "top_two_bids": request.top_two_bids},
+        {"fused_closing_steps": request.fused}, bypass_cache
+    )
+    return {key: outputs[key] for key in FUSED_SECTIONS if key in outputs}
+
+
+@app.post("/steps/risk-assessment")
+async def risk_assessment(request: RiskAssessmentRequest, bypass_cache: bool = False):
+    """Step 7: Risk Assessment from the negotiation strategy and the selected bids."""
+    outputs = await run_steps(["risk_assessment"], {
+        "negotiation_strategy": request.negotiation_strategy,
+        "top_two_bids": request.top_two_bids,
+    }, {}, bypass_cache)
+    return {"risk_assessment": outputs["risk_assessment"]}
+
+
+@app.post("/steps/contract-doc")
+async def contract_doc(request: ContractDocRequest, bypass_cache: bool = False):
+    """Step 8: Contract Document from the risk assessment."""
+    outputs = await run_steps(["contract_doc"], {"risk_assessment": request.risk_assessment}, {}, bypass_cache)
+    return {"contract_doc": outputs["contract_doc"]}
+
+
+@app.post("/pipeline")
+async def pipeline(
+    business_req: str = Form(...),
+    vendor_history: UploadFile | None = File(None),
+    bids: UploadFile = File(...),
+    use_llm_bid_extraction: bool = Form(False),
+    use_vendor_store: bool = Form(False),
+    tech_req_map_reduce: bool = Form(False),
+    use_similar_run: bool = Form(False),
+    fused_closing_steps: bool = Form(False),
+    bypass_cache: bool = False,
+):
+    """Run all eight steps; independent steps run concurrently. Returns every step output."""
+    similar_run = await find_similar_run(business_req, use_similar_run)
+    vendor_inputs, bid_inputs = await asyncio.gather(
+        load_vendor_history(vendor_history, use_vendor_store),
+        load_bids(bids, use_llm_bid_extraction),
+    )
+    cache = None if bypass_cache or cache_bypassed_by_default() else get_llm_cache()
+    try:
+        with track("run_all"):
+            outputs = await run_pipeline(get_chains(), {
+                "business_req": business_req,
+                "tech_req_map_reduce": tech_req_map_reduce,
+                "tech_req_max_concurrency": TECH_REQ_MAX_CONCURRENCY,
+                **vendor_inputs,
+                **bid_inputs,
+                "prior_run": similar_run,
+                "fused_closing_steps": fused_closing_steps,
+            }, cache)
+    except KeyError as e:
+        raise HTTPException(422, f"Missing column {e} in the uploaded data.") from e
+    await asyncio.to_thread(
+        get_prior_run_index().record, business_req,
+        tech_req_doc=outputs["tech_req_doc"], tender_doc=outputs["tender_doc"]
+    )
+    return {**outputs, "emails": split_emails(outputs["tender_email"]), "similar_run": similar_run_summary(similar_run)}
+
+
+def main():
+    import uvicorn
+
+    uvicorn.run(
+        app,
+        host=os.getenv("PROCUREMENT_API_HOST", "127.0.0.1"),
+        port=int(os.getenv("PROCUREMENT_API_PORT", "8000")),
+    )
+
+
+if __name__ == "__main__":
+    main()
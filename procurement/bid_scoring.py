@@ -0,0 +1,178 @@
+"""Local multi-criteria bid scoring for Step 5.
+
+The bids of the shortlisted vendors are scored on the parsed table instead of by the
+LLM: every criterion column is normalized to 0-1 (price as lowest price / price, the
+others min-max, inverted where lower is better), the normalized criteria are combined
+with fixed weights, and bids dominated on every criterion by another bid are flagged
+as off the Pareto front. The ranking is reproducible and takes milliseconds for
+thousands of bids; the LLM is only asked to justify the top-K bids.
+
+The report keeps the shape of the former LLM evaluation (top bids with scores and a
+justification) so negotiation_strategy_chain consumes it unchanged.
+"""
+
+import asyncio
+from io import StringIO
+
+from .bids import find_vendor_column
+from .cache import arun_chain
+
+# Criterion -> column name keywords; the first numeric column matching a keyword is used
+BID_CRITERIA = {
+    "price": ["price", "cost", "amount", "bid_value", "quote"],
+    "quality": ["quality"],
+    "delivery": ["delivery", "lead_time", "lead time"],
+    "technology": ["tech", "capabilit"],
+}
+
+# Weight of each criterion in the bid score; criteria without a column are left out
+BID_SCORE_WEIGHTS = {
+    "price": 0.40,
+    "quality": 0.25,
+    "delivery": 0.20,
+    "technology": 0.15,
+}
+
+# Delivery columns measuring time (lower is better) rather than a rating
+LOWER_IS_BETTER_KEYWORDS = ["day", "week", "time", "lead", "duration"]
+
+# Bids whose ranking the LLM justifies
+BID_JUSTIFICATION_TOP_K = 2
+
+# Rows compared against all bids at a time by the Pareto filter, bounding its memory
+PARETO_CHUNK_ROWS = 256
+
+
+def _vendor_column(bids_df):
+    try:
+        return find_vendor_column(bids_df)
+    except KeyError:
+        return None
+
+
+def _score_column(criterion):
+    return f"{criterion} (normalized)"
+
+
+def find_criteria_columns(bids_df):
+    """Return criterion -> (column, higher_is_better) for the numeric columns of the bids."""
+    import pandas as pd
+
+    used = {_vendor_column(bids_df)}
+    columns = {}
+    for criterion, keywords in BID_CRITERIA.items():
+        for column in bids_df.columns:
+            name = str(column).lower()
+            if column in used or not any(keyword in name for keyword in keywords):
+                continue
+            if pd.to_numeric(bids_df[column], errors="coerce").notna().any():
+                higher_is_better = criterion != "price" and not (
+                    criterion == "delivery" and any(keyword in name for keyword in LOWER_IS_BETTER_KEYWORDS)
+                )
+                columns[criterion] = (column, higher_is_better)
+                used.add(column)
+                break
+    return columns
+
+
+def _normalize(values, criterion, higher_is_better):
+    """Scale a criterion column to 0-1, 1 being the best bid; missing values score 0."""
+    low, high = values.min(), values.max()
+    if criterion == "price" and low > 0:
+        normalized = low / values
+    elif high > low:
+        normalized = (values - low) / (high - low)
+        if not higher_is_better:
+            normalized = 1 - normalized
+    else:
+        normalized = values * 0 + 1.0
+    return normalized.fillna(0.0)
+
+
+def pareto_front(values, chunk_rows=PARETO_CHUNK_ROWS):
+    """Return a boolean mask of the rows of values (n x k, higher is better) no other row dominates."""
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    optimal = np.ones(len(values), dtype=bool)
+    for start in range(0, len(values), chunk_rows):
+        block = values[start:start + chunk_rows, None, :]
+        dominated = ((values[None, :, :] >= block).all(axis=2) & (values[None, :, :] > block).any(axis=2)).any(axis=1)
+        optimal[start:start + chunk_rows] = ~dominated
+    return optimal
+
+
+def score_bids(bids_df, weights=BID_SCORE_WEIGHTS):
+    """Score and rank the bids, best first.
+
+    Returns a copy of bids_df with one '<criterion> (normalized)' column per criterion
+    found, the weighted 'score' and the 'pareto_optimal' flag, sorted by Pareto front and
+    then score, or None when no criterion column was found. The criteria used are listed
+    in the attrs['criteria'] of the result.
+    """
+    import pandas as pd
+
+    columns = find_criteria_columns(bids_df)
+    if not columns:
+        return None
+    ranked = bids_df.reset_index(drop=True)
+    normalized = pd.DataFrame({
+        _score_column(criterion): _normalize(pd.to_numeric(ranked[column], errors="coerce"), criterion, higher_is_better)
+        for criterion, (column, higher_is_better) in columns.items()
+    })
+    total_weight = sum(weights[criterion] for criterion in columns)
+    ranked = pd.concat([ranked, normalized], axis=1)
+    ranked["score"] = sum(
+        normalized[_score_column(criterion)] * weights[criterion] for criterion in columns
+    ) / total_weight
+    ranked["pareto_optimal"] = pareto_front(normalized.to_numpy())
+    # Stable sort keeps the file order of tied bids
+    ranked = ranked.sort_values(["pareto_optimal", "score"], ascending=False, kind="mergesort")
+    ranked.attrs["criteria"] = list(columns)
+    return ranked
+
+
+def format_bid_ranking(ranked, original_columns, top_k=BID_JUSTIFICATION_TOP_K):
+    """Describe the top_k ranked bids, with their data and criterion scores, as plain text."""
+    criteria = ranked.attrs["criteria"]
+    vendor_column = _vendor_column(ranked)
+    weights = ", ".join(f"{criterion} {BID_SCORE_WEIGHTS[criterion]:.0%}" for criterion in criteria)
+    lines = [
+        f"Top {min(top_k, len(ranked))} Bids (weighted score of {weights}; "
+        f"{len(ranked)} bids scored, {int(ranked['pareto_optimal'].sum())} on the Pareto front)",
+        "",
+    ]
+    for rank, (_, bid) in enumerate(ranked.head(top_k).iterrows(), start=1):
+        vendor = bid[vendor_column] if vendor_column is not None else f"Bid {rank}"
+        pareto = "Pareto-optimal" if bid["pareto_optimal"] else "dominated by another bid"
+        lines.append(f"{rank}. {vendor} - score {bid['score']:.3f} ({pareto})")
+        lines.append("   " + "; ".join(f"{column}: {bid[column]}" for column in original_columns))
+        lines.append("   Criterion scores: " + ", ".join(
+            f"{criterion} {bid[_score_column(criterion)]:.2f}" for criterion in criteria
+        ))
+    return "\n".join(lines)
+
+
+def rank_bids(bids_csv, top_k=BID_JUSTIFICATION_TOP_K):
+    """Parse the filtered bids CSV and return the ranking text, or None when it cannot be scored locally."""
+    import pandas as pd
+
+    try:
+        bids_df = pd.read_csv(StringIO(bids_csv))
+    except Exception:
+        return None
+    if bids_df.empty:
+        return None
+    ranked = score_bids(bids_df)
+    if ranked is None:
+        return None
+    return format_bid_ranking(ranked, list(bids_df.columns), top_k)
+
+
+async def aevaluate_bids(chains, bids_csv, cache=None, top_k=BID_JUSTIFICATION_TOP_K):
+    """Rank the bids locally and have the LLM justify the top_k; None when the bids cannot be scored locally."""
+    ranking = await asyncio.to_thread(rank_bids, bids_csv, top_k)
+    if ranking is None:
+        return None
+    justification = await arun_chain(chains["bid_justification"], {"ranked_bids": ranking}, cache)
+    return f"{ranking}\n\nJustification:\n{justification.strip()}"
@@ -0,0 +1,61 @@
+"""Local filtering of the bids data for Step 5.
+
+The bids CSV is parsed once per file and the rows of the shortlisted vendors are
+selected locally, so bid evaluation does not wait for an LLM extraction call and bid
+files are not limited by the model context.
+"""
+
+from .inputs import compact_dataframe, read_table
+from .scoring import parse_vendor_names
+from .vendor_names import VendorNameIndex
+
+
+def find_vendor_column(bids_df):
+    """Return the column holding the vendor name: 'Vendor_name' or else the first column mentioning 'vendor'."""
+    if 'Vendor_name' in bids_df.columns:
+        return 'Vendor_name'
+    for column in bids_df.columns:
+        if "vendor" in str(column).lower():
+            return column
+    raise KeyError("Vendor_name")
+
+
+def parse_bids(data, file_name="bids.csv"):
+    """Parse the bids file (CSV, Parquet or Arrow) into a DataFrame, or return None when it is not a valid table."""
+    try:
+        return compact_dataframe(read_table(data, file_name))
+    except Exception:
+        return None
+
+
+def build_bid_vendor_index(bids_df):
+    """Return the VendorNameIndex of the bid vendors, or None when the bids have no vendor column.
+
+    Build it once per parsed bids file and pass it to filter_bids.
+    """
+    try:
+        vendor_column = find_vendor_column(bids_df)
+    except KeyError:
+        return None
+    return VendorNameIndex(bids_df[vendor_column].dropna().unique())
+
+
+def filter_bids(bids_df, shortlisted_vendors, bid_vendor_index=None):
+    """Return the bids of the shortlisted vendors as CSV text.
+
+    Vendor names are matched exactly first; names without an exact match are resolved
+    against the bid vendors with bid_vendor_index (normalized, then fuzzy matching), which
+    is built here when not given. Raises KeyError when the bids have no vendor column.
+    """
+    vendor_column = find_vendor_column(bids_df)
+    vendor_names = [name for name in parse_vendor_names(shortlisted_vendors) if name]
+    matched = bids_df[vendor_column].isin(vendor_names)
+
+    exact_matches = set(bids_df.loc[matched, vendor_column])
+    unmatched = [name for name in vendor_names if name not in exact_matches]
+    if unmatched:
+        if bid_vendor_index is None:
+            bid_vendor_index = build_bid_vendor_index(bids_df)
+        resolved, _ = bid_vendor_index.resolve_all(unmatched)
+        matched |= bids_df[vendor_column].astype(str).isin(resolved)
+    return bids_df[matched].to_csv(index=False)
@@ -0,0 +1,195 @@
+"""Persistent content-addressed cache of LLM chain responses.
+
+With temperature=0.1 the chain outputs are close to deterministic, so each response is
+stored on disk under a hash of the prompt template, the input variables, the model name
+and the temperature. A rerun with unchanged inputs is then answered from SQLite without
+calling Gemini. Entries expire after a TTL and the least recently used entries are
+evicted once the cache exceeds its entry or size limit.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .context import fit_inputs
+from .telemetry import add_tokens_saved
+
+# Collects a flag when the response of the chain call in progress must not be cached
+_uncacheable = contextvars.ContextVar("procurement_uncacheable_response", default=None)
+
+
+class LLMResponseCache:
+    """Content-addressed SQLite cache of chain responses with TTL and LRU eviction."""
+
+    def __init__(self, path, max_entries=1000, max_bytes=50 * 1024 * 1024, ttl_seconds=7 * 24 * 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(chain, inputs):
+        """Hash everything that determines the response of a chain call."""
+        payload = {
+            "template": chain.prompt.template,
+            "inputs": inputs,
+            "model": getattr(chain.llm, "model", None),
+            "temperature": getattr(chain.llm, "temperature", None),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, len(response.encode("utf-8")), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        entries, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if entries <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            if entries <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            evicted.append((key,))
+            entries -= 1
+            total_bytes -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", evicted)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": total_bytes}
+
+
+def create_llm_cache():
+    """Create the response cache configured through the LLM_CACHE_* environment variables."""
+    return LLMResponseCache(
+        os.getenv("LLM_CACHE_PATH", ".llm_cache.sqlite3"),
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+        max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", "50")) * 1024 * 1024),
+        ttl_seconds=float(os.getenv("LLM_CACHE_TTL_HOURS", "168")) * 3600
+    )
+
+
+def cache_bypassed_by_default():
+    """Whether the LLM_CACHE_BYPASS environment variable asks for every call to go to Gemini."""
+    return os.getenv("LLM_CACHE_BYPASS", "").lower() in ("1", "true", "yes")
+
+
+def mark_response_uncacheable():
+    """Keep the response of the chain call in progress out of the cache.
+
+    Called by routing.RoutedChatModel when a fallback model answered: the cache key names
+    the model the chain was routed to, which did not write the response.
+    """
+    flags = _uncacheable.get()
+    if flags is not None:
+        flags.append(True)
+
+
+@contextlib.contextmanager
+def collect_uncacheable_flags():
+    """Collect the mark_response_uncacheable calls made in the with block into the list it yields."""
+    flags = []
+    token = _uncacheable.set(flags)
+    try:
+        yield flags
+    finally:
+        _uncacheable.reset(token)
+
+
+def fit_chain_inputs(chain, inputs):
+    """Fit the inputs of a chain to the context budgets of its prompt, reporting the tokens saved and rows omitted."""
+    inputs, saved, rows_omitted = fit_inputs((chain.metadata or {}).get("prompt"), inputs)
+    if saved or rows_omitted:
+        add_tokens_saved(saved, rows_omitted)
+    return inputs
+
+
+def run_chain(chain, inputs, cache=None):
+    """Run an LLMChain, answering from cache when the same call was made before.
+
+    The inputs are fitted to the prompt's context budgets first. Pass cache=None to bypass
+    the cache and always call the model. A response written by a fallback model is not
+    cached.
+    """
+    inputs = fit_chain_inputs(chain, inputs)
+    if cache is None:
+        return chain.run(**inputs)
+    key = cache.make_key(chain, inputs)
+    response = cache.get(key)
+    if response is None:
+        with collect_uncacheable_flags() as flags:
+            response = chain.run(**inputs)
+        if not flags:
+            cache.put(key, response)
+    return response
+
+
+async def arun_chain(chain, inputs, cache=None):
+    """Async counterpart of run_chain used by the pipeline executor.
+
+    Fitting the inputs and the SQLite cache reads and writes run in worker threads, so a
+    long document or a busy cache does not hold up the event loop.
+    """
+    inputs = await asyncio.to_thread(fit_chain_inputs, chain, inputs)
+    if cache is None:
+        return await chain.arun(**inputs)
+    key = cache.make_key(chain, inputs)
+    response = await asyncio.to_thread(cache.get, key)
+    if response is None:
+        with collect_uncacheable_flags() as flags:
+            response = await chain.arun(**inputs)
+        if not flags:
+            await asyncio.to_thread(cache.put, key, response)
+    return response
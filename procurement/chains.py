@@ -0,0 +1,27 @@
+"""LLMChain factories for the procurement steps."""
+
+from .prompts import PROMPTS
+
+
+def build_prompt(name):
+    """Create the PromptTemplate registered under name in prompts.PROMPTS."""
+    from langchain.prompts import PromptTemplate
+
+    input_variables, template = PROMPTS[name]
+    return PromptTemplate(input_variables=input_variables, template=template)
+
+
+def build_chains(llm):
+    """Create one LLMChain per prompt, keyed by prompt name (e.g. "tech_req", "contract_doc").
+
+    llm is the chat model of every chain, or a dict mapping each prompt name to its chat
+    model (see routing.create_routed_llms). The prompt name is kept in the chain metadata,
+    where the context budgets look it up.
+    """
+    from langchain.chains import LLMChain
+
+    llms = llm if isinstance(llm, dict) else dict.fromkeys(PROMPTS, llm)
+    return {
+        name: LLMChain(llm=llms[name], prompt=build_prompt(name), metadata={"prompt": name})
+        for name in PROMPTS
+    }
@@ -0,0 +1,198 @@
+"""Token budgets for the documents passed between the steps.
+
+Later steps receive whole upstream documents, most of which their prompt does not need.
+Every budgeted prompt input is fitted to a token budget before the call: sections whose
+heading mentions what the prompt is about are kept whole first, the remaining sections
+are kept in document order while they fit, and the others are compacted to their
+heading and first line or dropped. Tables of bids are cut by whole rows instead, with a
+note of the rows omitted. Fitting is deterministic, so the response cache still
+hits for unchanged inputs, and the tokens saved are added to the step's telemetry.
+"""
+
+import math
+import re
+
+# Characters per token of the local estimator; about 4 for English prose with Gemini's tokenizer
+CHARS_PER_TOKEN = 4
+
+# Prompt name -> input variable -> token budget. Unlisted inputs are passed as they are.
+CONTEXT_BUDGETS = {
+    "vendor_shortlist": {"tech_req": 2000},
+    "tender_doc": {"tech_req": 6000, "business_req": 3000},
+    "tech_req_example": {"example_business_req": 2000, "example_tech_req": 4000},
+    "tender_doc_example": {"example_tender_doc": 4000, "tech_req": 6000, "business_req": 3000},
+    "tender_email": {"tender_summary": 500},
+    "bid_evaluation": {"bids_data": 6000},
+    "negotiation_strategy": {"top_two_bids": 3000},
+    "risk_assessment": {"negotiation_strategy": 2000, "bid_data": 2000},
+    "contract_doc": {"risk_assessment": 4000},
+    "negotiation_risk_contract": {"bid_evaluation": 3000, "bid_data": 2000},
+}
+
+# Prompt name -> input variable -> heading keywords of the sections the prompt needs most
+SECTION_PRIORITIES = {
+    "vendor_shortlist": {"tech_req": ["scope", "functional", "performance", "integration", "standard"]},
+    "tender_doc": {"business_req": ["scope", "objective", "timeline", "budget", "deliverable"]},
+    "tender_doc_example": {"business_req": ["scope", "objective", "timeline", "budget", "deliverable"]},
+    "negotiation_strategy": {"top_two_bids": ["top", "score", "recommend", "price"]},
+    "risk_assessment": {"negotiation_strategy": ["batna", "risk", "leverage", "recommend", "preferred"]},
+    "contract_doc": {"risk_assessment": ["mitigation", "risk", "compliance", "performance", "recommend"]},
+    "negotiation_risk_contract": {"bid_evaluation": ["top", "score", "recommend", "price"]},
+}
+
+# Lines kept of a compacted section: its heading and the start of its first line of text
+COMPACT_LINE_CHARS = 200
+
+OMISSION_NOTE = "[{count} section(s) shortened to fit the context budget]"
+
+# Input variables holding CSV tables of bids. They are cut by whole rows instead of being split
+# into sections, as an all-caps row such as "ACME 1,100" would read as a heading.
+TABULAR_INPUTS = {"bids_data", "bid_data"}
+
+ROWS_OMITTED_NOTE = "[{count} row(s) omitted to fit the context budget]"
+
+# A section starts at a numbered heading ("3.", "4.2 Scope", "IV."), a Markdown heading
+# or a short line in capitals
+SECTION_HEADING = re.compile(
+    r"^\s*(?:\d+(?:\.\d+)*[.)]?\s+\S|[IVXLC]+[.)]\s+\S|#{1,6}\s+\S|[A-Z][A-Z0-9 &/,()-]{2,80}$)"
+)
+
+
+def estimate_tokens(text):
+    """Estimate the number of tokens of text without calling the model's tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_sections(text):
+    """Split text into sections, each starting at a heading line."""
+    sections = []
+    current = []
+    for line in text.splitlines(keepends=True):
+        if current and SECTION_HEADING.match(line):
+            sections.append("".join(current))
+            current = []
+        current.append(line)
+    if current:
+        sections.append("".join(current))
+    return sections
+
+
+def compact_section(section):
+    """Reduce a section to its heading and the start of its first line of text."""
+    lines = [line.strip() for line in section.splitlines() if line.strip()]
+    return "\n".join(line[:COMPACT_LINE_CHARS] for line in lines[:2]) + "\n"
+
+
+def _truncate(text, budget):
+    """Cut text at the last line break that fits the budget."""
+    limit = budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind("\n", 0, limit)
+    return text[:cut if cut > 0 else limit]
+
+
+def fit_to_budget(text, budget, keywords=()):
+    """Return text reduced to about budget tokens, keeping whole the sections that matter most.
+
+    Sections whose heading contains one of keywords come first, then the first section
+    (the document title or header), then the others in document order. The first section
+    that does not fit whole keeps its leading lines, the other ones are compacted, and
+    compacted sections that still do not fit are dropped. A keyword section is only cut
+    once every other section has been dropped to make room for it.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+    sections = split_sections(text)
+    wanted = {
+        index for index, section in enumerate(sections)
+        if any(keyword in section.splitlines()[0].lower() for keyword in keywords)
+    }
+    priority = sorted(range(len(sections)), key=lambda index: (index not in wanted, index != 0, index))
+    note_tokens = estimate_tokens(OMISSION_NOTE.format(count=len(sections))) + 1
+
+    # Start from every section compacted, dropping the least important ones until that fits
+    kept = {index: compact_section(sections[index]) for index in priority}
+    used = note_tokens + sum(estimate_tokens(part) for part in kept.values())
+    for index in reversed(priority):
+        if used <= budget or len(kept) == 1:
+            break
+        used -= estimate_tokens(kept.pop(index))
+
+    # Then restore whole sections in priority order while they fit, and the leading lines of
+    # the first one that does not, so a single long section keeps its first lines
+    for position, index in enumerate(priority):
+        if index not in kept:
+            continue
+        extra = estimate_tokens(sections[index]) - estimate_tokens(kept[index])
+        if index in wanted:
+            # A keyword section makes room by dropping the compacted lower-priority sections
+            for later in reversed(priority[position + 1:]):
+                if used + extra <= budget:
+                    break
+                if later in kept and later not in wanted:
+                    used -= estimate_tokens(kept.pop(later))
+        if used + extra <= budget:
+            kept[index] = sections[index]
+            used += extra
+            continue
+        leading = _truncate(sections[index], budget - used + estimate_tokens(kept[index]))
+        if len(leading) > len(kept[index]):
+            leading += "\n"
+            used += estimate_tokens(leading) - estimate_tokens(kept[index])
+            kept[index] = leading
+
+    shortened = sum(kept.get(index) != sections[index] for index in range(len(sections)))
+    fitted = "".join(kept[index] for index in sorted(kept))
+    if estimate_tokens(fitted) > budget - note_tokens:
+        fitted = _truncate(fitted, budget - note_tokens)
+    return fitted.rstrip("\n") + "\n\n" + OMISSION_NOTE.format(count=max(shortened, 1))
+
+
+def fit_table_to_budget(text, budget):
+    """Return the header and leading rows of a CSV table that fit about budget tokens.
+
+    The second value is the number of rows left out, which a note at the end of the table
+    also states. A header longer than the budget is cut like any text; a table without
+    rows is cut the same way, without a note.
+    """
+    if estimate_tokens(text) <= budget:
+        return text, 0
+    header, *rows = text.splitlines(keepends=True)
+    if not rows:
+        return _truncate(text, budget), 0
+    limit = max(budget - estimate_tokens(ROWS_OMITTED_NOTE.format(count=len(rows))) - 1, 0) * CHARS_PER_TOKEN
+    header = header[:limit]
+    length = len(header)
+    kept = 0
+    for row in rows:
+        if length + len(row) > limit:
+            break
+        length += len(row)
+        kept += 1
+    omitted = len(rows) - kept
+    fitted = "".join([header, *rows[:kept]]).rstrip("\n")
+    if not omitted:
+        return fitted, 0
+    return fitted + "\n\n" + ROWS_OMITTED_NOTE.format(count=omitted), omitted
+
+
+def fit_inputs(prompt_name, inputs):
+    """Fit the budgeted inputs of a prompt; return the fitted inputs, the tokens saved and the table rows omitted."""
+    budgets = CONTEXT_BUDGETS.get(prompt_name)
+    if not budgets:
+        return inputs, 0, 0
+    fitted = dict(inputs)
+    saved = 0
+    rows_omitted = 0
+    for variable, budget in budgets.items():
+        value = inputs.get(variable)
+        if not isinstance(value, str):
+            continue
+        if variable in TABULAR_INPUTS:
+            fitted[variable], omitted = fit_table_to_budget(value, budget)
+            rows_omitted += omitted
+        else:
+            fitted[variable] = fit_to_budget(value, budget, SECTION_PRIORITIES.get(prompt_name, {}).get(variable, ()))
+        saved += estimate_tokens(value) - estimate_tokens(fitted[variable])
+    return fitted, saved, rows_omitted
@@ -0,0 +1,114 @@
+"""Per-vendor tender emails for Step 4.
+
+The LLM writes one vendor-agnostic email from a compact summary of the tender document,
+and the email is personalized locally for each shortlisted vendor. N vendors therefore
+cost one small LLM call instead of one call whose output grows with the vendor count.
+"""
+
+import asyncio
+import re
+from datetime import date, timedelta
+
+from .cache import arun_chain, run_chain
+from .scoring import parse_vendor_names
+
+VENDOR_NAME = "[VENDOR_NAME]"
+VENDOR_CONTACT = "[VENDOR_CONTACT]"
+SUBMISSION_DEADLINE = "[SUBMISSION_DEADLINE]"
+
+# Vendors get three weeks to submit their bids
+SUBMISSION_WINDOW_DAYS = 21
+
+# Size of the tender summary sent to the email prompt
+TENDER_SUMMARY_CHARS = 1500
+
+# Separates the emails of the different vendors in the combined Step 4 output
+EMAIL_SEPARATOR = "===== Email to {vendor} ====="
+
+HEADING = re.compile(r"^\s*(?:\d+(?:\.\d+)*[.)]?\s+\S|[A-Z][A-Z0-9 &/,()-]{2,80}$)")
+
+
+def summarize_tender(tender_doc, max_chars=TENDER_SUMMARY_CHARS):
+    """Build a compact extractive summary of the tender: its title and section headings.
+
+    The first line after each heading is kept as a one-line description of the section.
+    """
+    lines = [line.strip() for line in tender_doc.splitlines() if line.strip()]
+    if not lines:
+        return ""
+    summary = [lines[0]]
+    for index, line in enumerate(lines[1:], start=1):
+        if HEADING.match(line):
+            summary.append(line)
+            if index + 1 < len(lines) and not HEADING.match(lines[index + 1]):
+                summary.append("  " + lines[index + 1][:200])
+    text = "\n".join(summary)
+    return text if len(text) <= max_chars else text[:max_chars].rsplit("\n", 1)[0]
+
+
+def submission_deadline(today=None):
+    """Return the submission deadline, SUBMISSION_WINDOW_DAYS from today, as text."""
+    deadline = (today or date.today()) + timedelta(days=SUBMISSION_WINDOW_DAYS)
+    return deadline.strftime("%d %B %Y")
+
+
+def find_vendor_contacts(vendor_history_df, vendor_names):
+    """Return vendor name -> contact person from a history column such as 'Contact_person'.
+
+    Columns holding e-mail addresses or phone numbers are not used for the greeting;
+    vendors without a contact in the history are left out.
+    """
+    if vendor_history_df is None or 'Vendor_name' not in vendor_history_df.columns:
+        return {}
+    contact_columns = [
+        column for column in vendor_history_df.columns
+        if "contact" in str(column).lower() and not re.search(r"mail|phone", str(column).lower())
+    ]
+    if not contact_columns:
+        return {}
+    rows = vendor_history_df[vendor_history_df['Vendor_name'].isin(vendor_names)]
+    contacts = rows.dropna(subset=[contact_columns[0]]).drop_duplicates('Vendor_name')
+    return {str(vendor): str(contact) for vendor, contact in zip(contacts['Vendor_name'], contacts[contact_columns[0]])}
+
+
+def personalize_email(template, vendor_name, contact=None, deadline=None):
+    """Fill in the placeholders of the email template for one vendor."""
+    return (
+        template.replace(VENDOR_NAME, vendor_name)
+        .replace(VENDOR_CONTACT, contact or f"{vendor_name} Team")
+        .replace(SUBMISSION_DEADLINE, deadline or submission_deadline())
+    )
+
+
+def render_vendor_emails(template, vendor_names, contacts=None, deadline=None):
+    """Return vendor name -> personalized email, in shortlist order."""
+    contacts = contacts or {}
+    deadline = deadline or submission_deadline()
+    return {vendor: personalize_email(template, vendor, contacts.get(vendor), deadline) for vendor in vendor_names}
+
+
+def combine_emails(emails):
+    """Join the per-vendor emails into the single text kept as the Step 4 output."""
+    return "\n\n".join(f"{EMAIL_SEPARATOR.format(vendor=vendor)}\n{email.strip()}" for vendor, email in emails.items())
+
+
+def split_emails(combined):
+    """Inverse of combine_emails: return vendor name -> email."""
+    pattern = re.escape(EMAIL_SEPARATOR).replace(re.escape("{vendor}"), "(.+?)")
+    parts = re.split(f"^{pattern}$", combined, flags=re.M)
+    return {vendor: email.strip() for vendor, email in zip(parts[1::2], parts[2::2])}
+
+
+def generate_vendor_emails(chains, shortlisted_vendors, tender_doc, vendor_history_df=None, cache=None):
+    """Write the email template with one LLM call and return vendor name -> personalized email."""
+    template = run_chain(chains["tender_email"], {"tender_summary": summarize_tender(tender_doc)}, cache)
+    vendor_names = [name for name in parse_vendor_names(shortlisted_vendors) if name]
+    return render_vendor_emails(template, vendor_names, find_vendor_contacts(vendor_history_df, vendor_names))
+
+
+async def agenerate_vendor_emails(chains, shortlisted_vendors, tender_doc, vendor_history_df=None, cache=None):
+    """Async counterpart of generate_vendor_emails used by the pipeline executor."""
+    template = await arun_chain(chains["tender_email"], {"tender_summary": summarize_tender(tender_doc)}, cache)
+    vendor_names = [name for name in parse_vendor_names(shortlisted_vendors) if name]
+    contacts = await asyncio.to_thread(find_vendor_contacts, vendor_history_df, vendor_names)
+    return render_vendor_emails(template, vendor_names, contacts)
@@ -0,0 +1,139 @@
+"""Deterministic simulated chat model for offline runs and benchmarks.
+
+SimulatedChatModel stands in for ChatGoogleGenerativeAI: it answers every prompt with a
+canned response, sleeps for a configurable first-token latency plus a latency per output
+token, streams word by word and reports token usage, so the pipeline, caching, streaming
+and telemetry can be exercised without calling Gemini. It can also enforce a request quota
+of its own and answer 429 like the Gemini API once the quota is used up, to exercise the
+rate limiter. Set PROCUREMENT_FAKE_LLM=1 to make llm.create_llm return one.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+DEFAULT_RESPONSE = " ".join(
+    ["Section {0}: the supplier shall meet the stated requirement within the agreed timeline.".format(number)
+     for number in range(1, 21)]
+)
+
+# Answer of the fused Steps 6-8 prompt, with the marker lines fused_steps.py splits on
+FUSED_RESPONSE = "\n".join(
+    f"===== {title} =====\n{DEFAULT_RESPONSE}" for title in ("NEGOTIATION STRATEGY", "RISK ASSESSMENT", "CONTRACT DOCUMENT")
+)
+
+# (marker, response) pairs of create_fake_llm
+DEFAULT_RESPONSES = [("===== CONTRACT DOCUMENT =====", FUSED_RESPONSE)]
+
+
+def _token_count(text):
+    # Roughly four characters per token for English text
+    return max(1, len(text) // 4)
+
+
+class SimulatedRateLimitError(Exception):
+    """429 answer of a SimulatedChatModel whose request quota is used up."""
+
+    code = 429
+
+    def __init__(self, retry_after):
+        super().__init__(f"429 Resource exhausted: quota exceeded, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class SimulatedChatModel(BaseChatModel):
+    """Chat model returning canned responses with simulated latency.
+
+    responses is a list of (marker, text) pairs: the first pair whose marker occurs in the
+    prompt provides the response, otherwise default_response is used. With quota_requests
+    set, more than quota_requests calls within quota_window seconds raise
+    SimulatedRateLimitError.
+    """
+
+    responses: list = []
+    default_response: str = DEFAULT_RESPONSE
+    first_token_latency: float = 0.0
+    latency_per_token: float = 0.0
+    model: str = "simulated"
+    temperature: float = 0.0
+    quota_requests: int = 0
+    quota_window: float = 60.0
+
+    _requests = PrivateAttr(default_factory=deque)
+    _quota_lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self):
+        return "simulated-chat"
+
+    @property
+    def _identifying_params(self):
+        return {"model": self.model, "temperature": self.temperature}
+
+    def _check_quota(self):
+        if not self.quota_requests:
+            return
+        with self._quota_lock:
+            now = time.monotonic()
+            while self._requests and now - self._requests[0] >= self.quota_window:
+                self._requests.popleft()
+            if len(self._requests) >= self.quota_requests:
+                raise SimulatedRateLimitError(self.quota_window - (now - self._requests[0]))
+            self._requests.append(now)
+
+    def _respond(self, messages):
+        self._check_quota()
+        prompt = "\n".join(str(message.content) for message in messages)
+        for marker, text in self.responses:
+            if marker in prompt:
+                return prompt, text
+        return prompt, self.default_response
+
+    def _latency(self, text):
+        return self.first_token_latency + self.latency_per_token * _token_count(text)
+
+    def _result(self, prompt, text):
+        usage = {
+            "input_tokens": _token_count(prompt),
+            "output_tokens": _token_count(text),
+            "total_tokens": _token_count(prompt) + _token_count(text),
+        }
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text, usage_metadata=usage))])
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt, text = self._respond(messages)
+        time.sleep(self._latency(text))
+        return self._result(prompt, text)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        prompt, text = self._respond(messages)
+        await asyncio.sleep(self._latency(text))
+        return self._result(prompt, text)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        _, text = self._respond(messages)
+        time.sleep(self.first_token_latency)
+        words = text.split(" ")
+        for index, word in enumerate(words):
+            token = word if index == len(words) - 1 else word + " "
+            time.sleep(self.latency_per_token * _token_count(token))
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+def create_fake_llm(responses=None):
+    """Create a SimulatedChatModel configured through the PROCUREMENT_FAKE_LLM_* environment variables."""
+    return SimulatedChatModel(
+        responses=responses or DEFAULT_RESPONSES,
+        first_token_latency=float(os.getenv("PROCUREMENT_FAKE_LLM_FIRST_TOKEN_LATENCY", "0.2")),
+        latency_per_token=float(os.getenv("PROCUREMENT_FAKE_LLM_LATENCY_PER_TOKEN", "0.002"))
+    )
@@ -0,0 +1,90 @@
+"""Fused single-call mode for Steps 6-8.
+
+The negotiation strategy, the risk assessment and the contract document form a strict
+chain: each call waits for the previous one and re-sends its output as context. In fused
+mode one call writes the three documents, each after its own marker line, and the
+response is split back into the three step outputs. When a section is missing from the
+response, it and the sections after it are generated by their own chains as before.
+
+Run `python -m benchmarks.fused` to compare the latency and tokens of both paths.
+"""
+
+import re
+
+from .cache import arun_chain
+
+# Output key -> section title of the marker line "===== <title> =====" in the fused
+# prompt (prompts.NEGOTIATION_RISK_CONTRACT_TEMPLATE), in document order
+FUSED_SECTIONS = {
+    "negotiation_strategy": "NEGOTIATION STRATEGY",
+    "risk_assessment": "RISK ASSESSMENT",
+    "contract_doc": "CONTRACT DOCUMENT",
+}
+
+# A marker line, tolerating Markdown emphasis and a different number of '=' around the title
+MARKER_LINE = re.compile(
+    r"^[\s*#_]*=+\s*(" + "|".join(re.escape(title) for title in FUSED_SECTIONS.values()) + r")\s*=+[\s*_]*$",
+    re.M | re.I,
+)
+
+
+def split_fused_output(text):
+    """Return output key -> section of a fused response, for the leading sections found in order.
+
+    A section is kept when it and every section before it have their marker, in order, and
+    some text, so a section is never kept without the one it is based on. A section must
+    also end at the next section's marker or at the end of the response: after a repeated
+    or out-of-order marker it may be cut short, so it and the sections after it are dropped.
+    """
+    titles = list(FUSED_SECTIONS.values())
+    parts = MARKER_LINE.split(text)
+    markers = [title.upper() for title in parts[1::2]]
+    bodies = [body.strip() for body in parts[2::2]]
+    sections = {}
+    for index, key in enumerate(FUSED_SECTIONS):
+        if index >= len(markers) or markers[index] != titles[index] or not bodies[index]:
+            break
+        if index + 1 < len(markers) and titles[index + 1:index + 2] != [markers[index + 1]]:
+            break
+        sections[key] = bodies[index]
+    return sections
+
+
+def _fused_inputs(bid_evaluation, top_two_bids):
+    return {"bid_evaluation": bid_evaluation, "bid_data": top_two_bids}
+
+
+def _step_inputs(key, outputs, bid_evaluation, top_two_bids):
+    """Inputs of the chain of one step on the sections generated before it."""
+    if key == "negotiation_strategy":
+        return {"top_two_bids": bid_evaluation}
+    if key == "risk_assessment":
+        return {"negotiation_strategy": outputs["negotiation_strategy"], "bid_data": top_two_bids}
+    return {"risk_assessment": outputs["risk_assessment"]}
+
+
+def run_fused_steps(chains, bid_evaluation, top_two_bids, generate):
+    """Generate the Steps 6-8 outputs with one call and return output key -> document.
+
+    generate(chain, inputs) runs a chain and returns its text, e.g. cache.run_chain.
+    """
+    outputs = split_fused_output(
+        generate(chains["negotiation_risk_contract"], _fused_inputs(bid_evaluation, top_two_bids))
+    )
+    for key in FUSED_SECTIONS:
+        if key not in outputs:
+            outputs[key] = generate(chains[key], _step_inputs(key, outputs, bid_evaluation, top_two_bids))
+    return outputs
+
+
+async def arun_fused_steps(chains, bid_evaluation, top_two_bids, cache=None):
+    """Async counterpart of run_fused_steps used by the pipeline executor."""
+    outputs = split_fused_output(
+        await arun_chain(chains["negotiation_risk_contract"], _fused_inputs(bid_evaluation, top_two_bids), cache)
+    )
+    for key in FUSED_SECTIONS:
+        if key not in outputs:
+            outputs[key] = await arun_chain(
+                chains[key], _step_inputs(key, outputs, bid_evaluation, top_two_bids), cache
+            )
+    return outputs
@@ -0,0 +1,93 @@
+"""Parsing of the uploaded input files.
+
+Uploads are identified by a hash of their bytes so callers can cache the parsed result
+and skip decoding and parsing on reruns. Besides CSV, the vendor history and the bids
+can be uploaded as Parquet or Arrow/Feather files; those are read by pyarrow straight from
+the uploaded bytes, without decoding text or writing them to disk. Parsed tables are
+compacted (downcast numbers, categorical text) as they stay in memory for the whole
+session.
+"""
+
+import hashlib
+import os
+from io import BytesIO
+
+# File extensions accepted for the vendor history and bids uploads
+TABLE_FILE_TYPES = ["csv", "parquet", "arrow", "feather"]
+
+# Explicit dtypes of the vendor history columns; vendor names repeat on every row, and
+# the ratings need no more than float32 precision
+VENDOR_HISTORY_DTYPES = {
+    "Vendor_name": "category",
+    "Delivery_punctuality": "float32",
+    "Quality_of_goods": "float32",
+    "Contract_term_compliance": "float32",
+}
+
+# Text columns with at most this share of distinct values are stored as categoricals
+CATEGORY_MAX_UNIQUE_RATIO = 0.5
+
+
+def fingerprint(data):
+    """Return the content hash identifying an uploaded file's bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def decode_text(data):
+    """Decode an uploaded text file, dropping bytes that are not valid UTF-8."""
+    return data.decode("utf-8", errors="ignore")
+
+
+def read_table(data, file_name, dtype=None):
+    """Parse an uploaded CSV, Parquet or Arrow/Feather file into a DataFrame.
+
+    dtype maps column names to dtypes; columns missing from the file are ignored.
+    """
+    import pandas as pd
+
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    if extension == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = pq.read_table(pa.BufferReader(data)).to_pandas()
+    elif extension in ("arrow", "feather"):
+        import pyarrow as pa
+
+        df = pa.ipc.open_file(pa.BufferReader(data)).read_all().to_pandas()
+    else:
+        return pd.read_csv(BytesIO(data), dtype=dtype, encoding_errors="ignore")
+
+    if dtype:
+        df = df.astype({column: column_type for column, column_type in dtype.items() if column in df.columns})
+    return df
+
+
+def _is_repetitive_text(values):
+    """Whether values is a text column with at most CATEGORY_MAX_UNIQUE_RATIO distinct values."""
+    import pandas as pd
+
+    if isinstance(values.dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(values):
+        return False
+    return len(values) > 0 and values.nunique() <= CATEGORY_MAX_UNIQUE_RATIO * len(values)
+
+
+def compact_dataframe(df):
+    """Shrink df in place: integers to their smallest dtype, repetitive text columns to categoricals.
+
+    Float columns are left as they are, as prices need float64 precision. Returns df.
+    """
+    import pandas as pd
+
+    for column in df.columns:
+        values = df[column]
+        if pd.api.types.is_integer_dtype(values):
+            df[column] = pd.to_numeric(values, downcast="integer")
+        elif _is_repetitive_text(values):
+            df[column] = values.astype("category")
+    return df
+
+
+def read_vendor_history(data, file_name):
+    """Parse the vendor history with explicit dtypes, categorical vendor names and compacted other columns."""
+    return compact_dataframe(read_table(data, file_name, VENDOR_HISTORY_DTYPES))
@@ -0,0 +1,137 @@
+"""Background worker pool running the procurement steps outside the Streamlit script thread.
+
+A button click submits a job and returns straight away; the UI polls the job's status
+and progress and applies its outputs once it has finished. One JobQueue is shared by
+every session of a server process: a fixed number of worker threads bounds the LLM work
+in flight across all users, at most JOB_MAX_QUEUED further jobs wait for a worker, and
+every user may have at most JOB_MAX_PER_USER jobs queued or running at a time.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Worker threads shared by all sessions, i.e. the global limit on steps running at once
+JOB_MAX_WORKERS = int(os.getenv("PROCUREMENT_JOB_WORKERS", "8"))
+
+# Jobs one user may have queued or running at the same time
+JOB_MAX_PER_USER = int(os.getenv("PROCUREMENT_JOB_MAX_PER_USER", "2"))
+
+# Jobs allowed to wait for a free worker before new submissions are refused
+JOB_MAX_QUEUED = int(os.getenv("PROCUREMENT_JOB_MAX_QUEUED", "32"))
+
+# Seconds between two status polls of the UI while a job is running
+JOB_POLL_SECONDS = 1.0
+
+# Finished jobs are forgotten after this many seconds
+JOB_RETENTION_SECONDS = 3600
+
+
+class JobLimitError(RuntimeError):
+    """Raised when a job is refused because of the per-user or global limit."""
+
+
+class Job:
+    """One submitted step with its status, progress and result."""
+
+    def __init__(self, user, name):
+        self.id = uuid.uuid4().hex
+        self.user = user
+        self.name = name
+        self.status = "queued"  # queued -> running -> done | failed | cancelled
+        self.cancelled = False
+        self.progress = 0.0
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.status in ("done", "failed", "cancelled")
+
+    def report(self, progress, message=""):
+        """Update the progress (0 to 1) and status message shown by the UI."""
+        self.progress = min(max(progress, 0.0), 1.0)
+        self.message = message
+
+
+class JobQueue:
+    """Thread pool with a job registry and per-user and global admission limits."""
+
+    def __init__(self, max_workers=JOB_MAX_WORKERS, max_jobs_per_user=JOB_MAX_PER_USER,
+                 max_queued=JOB_MAX_QUEUED):
+        self.max_workers = max_workers
+        self.max_jobs_per_user = max_jobs_per_user
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="procurement-job")
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, user, name, function, *args, **kwargs):
+        """Queue function(job, *args, **kwargs) and return its Job.
+
+        Raises JobLimitError when the user already has max_jobs_per_user active jobs or
+        when every worker is busy and max_queued jobs are already waiting.
+        """
+        with self._lock:
+            self._prune()
+            active = [job for job in self._jobs.values() if not job.done]
+            if sum(job.user == user for job in active) >= self.max_jobs_per_user:
+                raise JobLimitError(
+                    f"You already have {self.max_jobs_per_user} steps running. Wait for one to finish."
+                )
+            if len(active) >= self.max_workers + self.max_queued:
+                raise JobLimitError("The server is busy with other users' steps. Please try again shortly.")
+            job = Job(user, name)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, function, args, kwargs)
+        return job
+
+    def _run(self, job, function, args, kwargs):
+        if not job.cancelled:
+            job.status = "running"
+            job.started_at = time.time()
+            try:
+                job.result = function(job, *args, **kwargs)
+            except Exception as e:
+                job.error = e
+        job.finished_at = time.time()
+        job.progress = 1.0
+        if job.cancelled:
+            job.result = None
+            job.status = "cancelled"
+            return
+        # Set last: the UI applies the result as soon as the job is done
+        job.status = "done" if job.error is None else "failed"
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    def cancel(self, job_id):
+        """Cancel a job: a queued job never starts and the result of a running one is discarded."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None and not job.done:
+            job.cancelled = True
+
+    def get(self, job_id):
+        """Return the job with job_id, or None when it is unknown or was pruned."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        """Return the number of running and queued jobs and the worker count."""
+        with self._lock:
+            statuses = [job.status for job in self._jobs.values()]
+        return {
+            "running": statuses.count("running"),
+            "queued": statuses.count("queued"),
+            "workers": self.max_workers,
+        }
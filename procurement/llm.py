@@ -0,0 +1,36 @@
+"""Gemini chat model factory."""
+
+import functools
+import os
+
+MODEL_NAME = "gemini-3-flash-preview"
+
+# Low temperature keeps the generated documents close to deterministic
+TEMPERATURE = 0.1
+
+
+@functools.lru_cache(maxsize=None)
+def create_llm(api_key, model=MODEL_NAME, temperature=TEMPERATURE, max_output_tokens=None):
+    """Create a Gemini chat model; routing.create_routed_llms picks the model of each chain.
+
+    One client is created per API key, model, temperature and output token limit and
+    shared by the whole process, so its connection is reused. Calls go through the shared rate limiter of
+    rate_limit.py, which also owns the retry policy. With PROCUREMENT_FAKE_LLM=1 the
+    offline SimulatedChatModel of fake_llm.py is returned instead.
+    """
+    from .rate_limit import rate_limited
+
+    if os.getenv("PROCUREMENT_FAKE_LLM"):
+        from .fake_llm import create_fake_llm
+
+        return rate_limited(create_fake_llm())
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return rate_limited(ChatGoogleGenerativeAI(
+        model=model,
+        google_api_key=api_key,
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+        # A single attempt per call; retries are left to the rate limiter
+        max_retries=1
+    ))
@@ -0,0 +1,98 @@
+"""Map-reduce mode of Step 1 for very large Business Requirements documents.
+
+The document is split on section boundaries into parts that fit comfortably in one
+prompt. Partial technical requirements are generated for the parts concurrently, with
+a bounded number of calls in flight, and a reduce step merges them into the SMART
+structured Technical Requirements Document of the single-call prompt.
+"""
+
+import asyncio
+import os
+import re
+
+from .cache import arun_chain
+from .context import split_sections
+
+# Largest part, in characters, sent to the map prompt or merged by one reduce call
+TECH_REQ_CHUNK_CHARS = int(os.getenv("TECH_REQ_CHUNK_CHARS", "30000"))
+
+# Map and reduce calls allowed in flight at the same time
+TECH_REQ_MAX_CONCURRENCY = int(os.getenv("TECH_REQ_MAX_CONCURRENCY", "4"))
+
+
+def _split_oversized(section, max_chars):
+    """Split a section longer than max_chars on paragraph breaks, then hard-split what is still too long."""
+    pieces = []
+    for paragraph in re.split(r"(?<=\n)\s*\n", section):
+        while len(paragraph) > max_chars:
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        pieces.append(paragraph)
+    return _pack(pieces, max_chars)
+
+
+def _pack(pieces, max_chars):
+    """Join consecutive pieces into chunks of at most max_chars characters."""
+    chunks = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current += piece
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def chunk_document(text, max_chars=TECH_REQ_CHUNK_CHARS):
+    """Split text into chunks of at most max_chars characters, breaking on section boundaries where possible."""
+    pieces = []
+    for section in split_sections(text):
+        if len(section) > max_chars:
+            pieces.extend(_split_oversized(section, max_chars))
+        else:
+            pieces.append(section)
+    return _pack(pieces, max_chars)
+
+
+async def _reduce(chains, partials, cache, semaphore, max_chars):
+    """Merge the partial requirements, first in batches of max_chars when they do not fit one call."""
+    while True:
+        labelled = [f"Part {number}:\n{partial.strip()}\n\n" for number, partial in enumerate(partials, start=1)]
+        batches = _pack(labelled, max_chars)
+        if len(batches) == 1:
+            return await arun_chain(chains["tech_req_reduce"], {"partial_requirements": batches[0]}, cache)
+        if len(batches) == len(labelled):
+            # Every partial is too long to share a batch; merge them pairwise so each round halves the count
+            batches = ["".join(labelled[index:index + 2]) for index in range(0, len(labelled), 2)]
+
+        async def reduce_batch(batch):
+            async with semaphore:
+                return await arun_chain(chains["tech_req_reduce"], {"partial_requirements": batch}, cache)
+
+        partials = await asyncio.gather(*(reduce_batch(batch) for batch in batches))
+
+
+async def arun_tech_req_map_reduce(chains, business_req, cache=None, max_chars=TECH_REQ_CHUNK_CHARS,
+                                   max_concurrency=TECH_REQ_MAX_CONCURRENCY):
+    """Generate the Technical Requirements Document of business_req in map-reduce mode.
+
+    A document that fits in one chunk goes through the regular single-call tech_req chain.
+    """
+    chunks = chunk_document(business_req, max_chars)
+    if len(chunks) <= 1:
+        return await arun_chain(chains["tech_req"], {"business_req": business_req}, cache)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def map_chunk(part_number, chunk):
+        async with semaphore:
+            return await arun_chain(chains["tech_req_map"], {
+                "business_req_section": chunk,
+                "part_number": part_number,
+                "part_count": len(chunks)
+            }, cache)
+
+    partials = await asyncio.gather(*(map_chunk(number, chunk) for number, chunk in enumerate(chunks, start=1)))
+    return await _reduce(chains, partials, cache, semaphore, max_chars)
@@ -0,0 +1,241 @@
+"""Concurrent executor for a full procurement run.
+
+Every step lists the steps whose outputs it consumes. Steps whose dependencies are all
+finished run at the same time through the async chain APIs, so a full run only takes
+as long as its critical path (1 -> 2 -> 5 -> 6 -> 7 -> 8) instead of the sum of every
+LLM round-trip. Step 3 runs alongside Step 2 and Step 4 alongside Step 5. The local work
+of the steps (vendor retrieval and scoring, bid filtering and ranking, the response
+cache) runs in worker threads, so it does not hold up the other steps or requests
+sharing the event loop.
+
+Every output is tagged with a fingerprint of the inputs it was generated from: the
+uploaded data it reads and the outputs of the steps it depends on. When an input
+changes, only the steps whose fingerprint no longer matches, and the steps downstream
+of them, are stale; a new bids file for example leaves Steps 1-4 untouched.
+"""
+
+import asyncio
+import hashlib
+
+from .bid_scoring import aevaluate_bids
+from .bids import filter_bids
+from .cache import arun_chain
+from .emails import agenerate_vendor_emails, combine_emails
+from .fused_steps import arun_fused_steps
+from .map_reduce import arun_tech_req_map_reduce
+from .retrieval import retrieve_vendor_history
+from .scoring import parse_vendor_names, shortlist_vendors
+from .telemetry import track
+
+
+async def _run_tech_req(chains, outputs, inputs, cache):
+    if inputs.get("tech_req_map_reduce"):
+        return await arun_tech_req_map_reduce(
+            chains, inputs["business_req"], cache, max_concurrency=inputs["tech_req_max_concurrency"]
+        )
+    example = inputs.get("prior_run")
+    if example and example.get("tech_req_doc"):
+        return await arun_chain(chains["tech_req_example"], {
+            "example_business_req": example["business_req"],
+            "example_tech_req": example["tech_req_doc"],
+            "business_req": inputs["business_req"]
+        }, cache)
+    return await arun_chain(chains["tech_req"], {"business_req": inputs["business_req"]}, cache)
+
+
+def _score_vendors(vendor_names, inputs):
+    """Resolve the vendor names returned by the LLM and shortlist them; return the shortlist and the unresolved names."""
+    store = inputs.get("vendor_store")
+    # In store mode the names resolve against the stored vendors, which are the ones it can score
+    name_index = store.name_index() if store is not None else inputs["vendor_name_index"]
+    vendor_names_list, unresolved = name_index.resolve_all(parse_vendor_names(vendor_names))
+    if store is not None:
+        score_index = store.score_index(vendor_names_list)
+    else:
+        score_index = inputs["vendor_score_index"]
+    return ", ".join(shortlist_vendors(vendor_names_list, score_index)), unresolved
+
+
+async def _run_vendor_shortlist(chains, outputs, inputs, cache):
+    with track("vendor_retrieval"):
+        if inputs.get("vendor_history_df") is None:
+            vendor_history = await asyncio.to_thread(inputs["vendor_store"].history_csv)
+        else:
+            vendor_history = await asyncio.to_thread(
+                retrieve_vendor_history, inputs["vendor_history_df"], inputs["vendor_retrieval_index"],
+                outputs["tech_req_doc"]
+            )
+    vendor_names = await arun_chain(chains["vendor_shortlist"], {
+        "tech_req": outputs["tech_req_doc"],
+        "vendor_history": vendor_history
+    }, cache)
+    with track("vendor_scoring"):
+        shortlist, unresolved = await asyncio.to_thread(_score_vendors, vendor_names, inputs)
+        # Reported alongside the shortlist instead of being dropped silently
+        outputs["unresolved_vendors"] = ", ".join(unresolved)
+        return shortlist
+
+
+async def _run_tender_doc(chains, outputs, inputs, cache):
+    example = inputs.get("prior_run")
+    if example and example.get("tender_doc"):
+        return await arun_chain(chains["tender_doc_example"], {
+            "example_tender_doc": example["tender_doc"],
+            "tech_req": outputs["tech_req_doc"],
+            "business_req": inputs["business_req"]
+        }, cache)
+    return await arun_chain(chains["tender_doc"], {
+        "tech_req": outputs["tech_req_doc"],
+        "business_req": inputs["business_req"]
+    }, cache)
+
+
+async def _run_tender_email(chains, outputs, inputs, cache):
+    emails = await agenerate_vendor_emails(
+        chains, outputs["shortlisted_vendors"], outputs["tender_doc"], inputs["vendor_history_df"], cache
+    )
+    return combine_emails(emails)
+
+
+async def _run_bid_extraction(chains, outputs, inputs, cache):
+    if inputs["bids_df"] is not None:
+        with track("bid_filtering"):
+            return await asyncio.to_thread(
+                filter_bids, inputs["bids_df"], outputs["shortlisted_vendors"], inputs.get("bid_vendor_index")
+            )
+    return await arun_chain(chains["extract_bids"], {
+        "shortlisted_vendors": outputs["shortlisted_vendors"],
+        "bids_data": inputs["bids"]
+    }, cache)
+
+
+async def _run_bid_evaluation(chains, outputs, inputs, cache):
+    if inputs["bids_df"] is not None:
+        # Tabular bids are ranked locally; the LLM only justifies the top bids
+        evaluation = await aevaluate_bids(chains, outputs["top_two_bids"], cache)
+        if evaluation is not None:
+            return evaluation
+    return await arun_chain(chains["bid_evaluation"], {"bids_data": outputs["top_two_bids"]}, cache)
+
+
+async def _run_negotiation_strategy(chains, outputs, inputs, cache):
+    if inputs.get("fused_closing_steps"):
+        # One call writes Steps 6-8; the later steps find their outputs already set and skip
+        fused = await arun_fused_steps(chains, outputs["bid_evaluation"], outputs["top_two_bids"], cache)
+        outputs["risk_assessment"] = fused["risk_assessment"]
+        outputs["contract_doc"] = fused["contract_doc"]
+        return fused["negotiation_strategy"]
+    return await arun_chain(chains["negotiation_strategy"], {"top_two_bids": outputs["bid_evaluation"]}, cache)
+
+
+async def _run_risk_assessment(chains, outputs, inputs, cache):
+    return await arun_chain(chains["risk_assessment"], {
+        "negotiation_strategy": outputs["negotiation_strategy"],
+        "bid_data": outputs["top_two_bids"]
+    }, cache)
+
+
+async def _run_contract_doc(chains, outputs, inputs, cache):
+    return await arun_chain(chains["contract_doc"], {"risk_assessment": outputs["risk_assessment"]}, cache)
+
+
+# Output key -> (step coroutine, output keys it depends on), in topological order.
+# The output keys match the session state fields of the Streamlit app.
+PIPELINE_DAG = {
+    "tech_req_doc": (_run_tech_req, []),
+    "shortlisted_vendors": (_run_vendor_shortlist, ["tech_req_doc"]),
+    "tender_doc": (_run_tender_doc, ["tech_req_doc"]),
+    "tender_email": (_run_tender_email, ["shortlisted_vendors", "tender_doc"]),
+    "top_two_bids": (_run_bid_extraction, ["shortlisted_vendors"]),
+    "bid_evaluation": (_run_bid_evaluation, ["top_two_bids"]),
+    "negotiation_strategy": (_run_negotiation_strategy, ["bid_evaluation"]),
+    "risk_assessment": (_run_risk_assessment, ["negotiation_strategy", "top_two_bids"]),
+    "contract_doc": (_run_contract_doc, ["risk_assessment"]),
+}
+
+
+# Output key -> uploaded inputs the step reads directly, and the modes that change how it
+# is generated, by the names used in the input fingerprints
+PIPELINE_INPUTS = {
+    "tech_req_doc": ["business_req", "tech_req_mode"],
+    "shortlisted_vendors": ["vendor_history"],
+    "tender_doc": ["business_req"],
+    "tender_email": ["vendor_history"],
+    "top_two_bids": ["bids"],
+    "bid_evaluation": [],
+    "negotiation_strategy": ["closing_steps"],
+    "risk_assessment": ["closing_steps"],
+    "contract_doc": ["closing_steps"],
+}
+
+
+def step_fingerprint(key, input_fingerprints, outputs):
+    """Return the fingerprint of everything the output of step key is generated from.
+
+    input_fingerprints maps the PIPELINE_INPUTS names to the fingerprints of the uploaded
+    data and of the generation modes (tech_req_mode: map-reduce or single call for Step 1;
+    closing_steps: fused or separate Steps 6-8); outputs holds the current outputs of the upstream steps.
+    """
+    digest = hashlib.sha256(key.encode("utf-8"))
+    for name in PIPELINE_INPUTS[key]:
+        digest.update(f"\n{name}={input_fingerprints.get(name, '')}".encode("utf-8"))
+    for dependency in PIPELINE_DAG[key][1]:
+        upstream = hashlib.sha256(str(outputs.get(dependency) or "").encode("utf-8")).hexdigest()
+        digest.update(f"\n{dependency}={upstream}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def output_fingerprints(input_fingerprints, outputs):
+    """Return output key -> step fingerprint for every step in outputs."""
+    return {key: step_fingerprint(key, input_fingerprints, outputs) for key in PIPELINE_DAG if key in outputs}
+
+
+def stale_steps(input_fingerprints, outputs, recorded):
+    """Return the output keys that need recomputing, in topological order.
+
+    recorded maps output keys to the fingerprints recorded when they were generated. A
+    step is stale when it was never generated, when its recorded fingerprint differs from
+    the current one or when one of its dependencies is stale.
+    """
+    stale = []
+    for key, (_, dependencies) in PIPELINE_DAG.items():
+        if (recorded.get(key) != step_fingerprint(key, input_fingerprints, outputs)
+                or any(dependency in stale for dependency in dependencies)):
+            stale.append(key)
+    return stale
+
+
+async def run_pipeline(chains, inputs, cache=None, reuse=None, on_step_done=None):
+    """Run every step of PIPELINE_DAG, starting each one as soon as its dependencies finish.
+
+    chains is the dict returned by chains.build_chains. inputs holds the uploaded data:
+    business_req, vendor_history_df with its vendor_score_index, vendor_retrieval_index
+    and vendor_name_index, optionally a vendor_store whose vendor names and scores are used
+    instead of vendor_name_index and vendor_score_index (vendor_history_df may then be None),
+    and bids with its parsed bids_df (None to extract the bids with
+    the LLM) and optionally its bids.build_bid_vendor_index. Set tech_req_map_reduce and tech_req_max_concurrency to run Step 1 in
+    map-reduce mode, and prior_run to a run returned by prior_runs.PriorRunIndex.find_similar
+    to generate Steps 1 and 3 with its documents as the example. Set fused_closing_steps
+    to generate Steps 6-8 with one call (see fused_steps.py). reuse maps output keys to up-to-date outputs, which are kept instead
+    of recomputed. on_step_done, if given, is called with the output key of every step as
+    it finishes. Returns a dict mapping each output key to its output, plus
+    unresolved_vendors listing the vendor names returned by the LLM that match no vendor
+    of the history when Step 2 ran. Every recomputed step is recorded in the telemetry log
+    under its output key.
+    """
+    outputs = dict(reuse or {})
+    tasks = {}
+
+    async def run_step(key):
+        step, dependencies = PIPELINE_DAG[key]
+        await asyncio.gather(*(tasks[dependency] for dependency in dependencies))
+        if key not in outputs:
+            with track(key):
+                outputs[key] = await step(chains, outputs, inputs, cache)
+        if on_step_done:
+            on_step_done(key)
+
+    for key in PIPELINE_DAG:
+        tasks[key] = asyncio.ensure_future(run_step(key))
+    await asyncio.gather(*tasks.values())
+    return outputs
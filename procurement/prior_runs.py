@@ -0,0 +1,216 @@
+"""Similarity index of earlier runs, for reusing them on near-duplicate tenders.
+
+Many tenders repeat an earlier one with small changes (a yearly re-tender of the same
+equipment), which the exact-match response cache misses. Every Business Requirements
+document is stored with the Technical Requirements and Tender Document generated from it
+and a hashed word n-gram vector: word unigrams and bigrams, weighted 1 + log(count) and
+hashed into a fixed number of dimensions, so no vocabulary or embedding service is
+needed. A new document is compared with every stored one by cosine similarity, as sparse
+dot products over its nonzero n-grams in one vectorized pass, and the closest run above
+SIMILAR_RUN_THRESHOLD is offered as a starting point or as an example for the generation
+of Steps 1 and 3.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+from .inputs import fingerprint
+
+# Dimensions the n-grams are hashed into; collisions are rare below a few thousand distinct n-grams per document
+HASHED_VECTOR_DIMS = 2 ** 20
+
+# Word n-gram lengths of the vectors
+NGRAM_RANGE = (1, 2)
+
+# Minimum cosine similarity of an earlier run offered for reuse
+SIMILAR_RUN_THRESHOLD = float(os.getenv("SIMILAR_RUN_THRESHOLD", "0.8"))
+
+# Runs kept; the oldest are dropped beyond this
+PRIOR_RUNS_MAX_ENTRIES = 2000
+
+# Outputs of a run stored with its Business Requirements
+PRIOR_RUN_OUTPUTS = ["tech_req_doc", "tender_doc"]
+
+# Vectors of recently looked up or recorded documents kept by fingerprint, so a document
+# is vectorized once for its lookup and the records of its steps
+VECTOR_CACHE_ENTRIES = 16
+
+
+def hashed_ngram_vector(text, dims=HASHED_VECTOR_DIMS):
+    """Return the L2-normalized hashed n-gram vector of text as (sorted indices, values) arrays."""
+    import numpy as np
+
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    grams = [
+        " ".join(words[start:start + n])
+        for n in range(NGRAM_RANGE[0], NGRAM_RANGE[1] + 1) for start in range(len(words) - n + 1)
+    ]
+    hashes = np.fromiter((zlib.crc32(gram.encode("utf-8")) for gram in grams), dtype=np.uint32, count=len(grams))
+    indices, counts = np.unique((hashes % dims).astype(np.int32), return_counts=True)
+    values = (1.0 + np.log(counts)).astype(np.float32)
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+class PriorRunIndex:
+    """SQLite store of earlier runs with an in-memory matrix of their hashed n-gram vectors."""
+
+    def __init__(self, path, max_entries=PRIOR_RUNS_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # Incremented on every change, so callers can memoize lookups
+        self.version = 0
+        self._lock = threading.Lock()
+        self._vectors = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS prior_runs (fingerprint TEXT PRIMARY KEY, business_req TEXT NOT NULL, "
+            + ", ".join(f"{output} TEXT" for output in PRIOR_RUN_OUTPUTS)
+            + ", vector_indices BLOB NOT NULL, vector_values BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        """Rebuild the vector matrix, in CSR form, from the stored runs."""
+        import numpy as np
+
+        rows = self._conn.execute(
+            "SELECT fingerprint, vector_indices, vector_values FROM prior_runs ORDER BY updated_at"
+        ).fetchall()
+        self._fingerprints = [row[0] for row in rows]
+        self._positions = {key: position for position, key in enumerate(self._fingerprints)}
+        indices = [np.frombuffer(row[1], dtype=np.int32) for row in rows]
+        self._indptr = np.cumsum([0] + [len(row) for row in indices])
+        self._indices = np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32)
+        self._values = np.concatenate([np.frombuffer(row[2], dtype=np.float32) for row in rows]) \
+            if rows else np.zeros(0, dtype=np.float32)
+
+    def _append(self, key, indices, values):
+        """Add the vector of a new run as the last row of the matrix."""
+        import numpy as np
+
+        self._positions[key] = len(self._fingerprints)
+        self._fingerprints.append(key)
+        self._indptr = np.append(self._indptr, self._indptr[-1] + len(indices))
+        self._indices = np.concatenate([self._indices, indices])
+        self._values = np.concatenate([self._values, values])
+
+    def _drop(self, keys):
+        """Remove the rows of the runs keys from the matrix."""
+        import numpy as np
+
+        keep = np.array([key not in keys for key in self._fingerprints], dtype=bool)
+        lengths = np.diff(self._indptr)
+        entries = np.repeat(keep, lengths)
+        self._indices = self._indices[entries]
+        self._values = self._values[entries]
+        self._indptr = np.cumsum(np.concatenate([[0], lengths[keep]]))
+        self._fingerprints = [key for key in self._fingerprints if key not in keys]
+        self._positions = {key: position for position, key in enumerate(self._fingerprints)}
+
+    def _vector(self, key, business_req):
+        """Return the hashed n-gram vector of business_req, whose fingerprint is key."""
+        with self._lock:
+            if key in self._vectors:
+                self._vectors.move_to_end(key)
+                return self._vectors[key]
+        vector = hashed_ngram_vector(business_req)
+        with self._lock:
+            self._vectors[key] = vector
+            while len(self._vectors) > VECTOR_CACHE_ENTRIES:
+                self._vectors.popitem(last=False)
+        return vector
+
+    def record(self, business_req, **outputs):
+        """Store the outputs (tech_req_doc, tender_doc) generated from business_req.
+
+        Outputs not given keep their stored value, so Steps 1 and 3 can record separately.
+        """
+        if not business_req.strip():
+            return
+        outputs = {key: value for key, value in outputs.items() if key in PRIOR_RUN_OUTPUTS and value}
+        key = fingerprint(business_req.encode("utf-8"))
+        indices, values = self._vector(key, business_req)
+        columns = ", ".join(outputs)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO prior_runs (fingerprint, business_req, vector_indices, vector_values, updated_at"
+                f"{', ' + columns if outputs else ''}) VALUES (?, ?, ?, ?, ?{', ?' * len(outputs)}) "
+                "ON CONFLICT (fingerprint) DO UPDATE SET updated_at = excluded.updated_at"
+                + "".join(f", {output} = excluded.{output}" for output in outputs),
+                (key, business_req, indices.tobytes(), values.tobytes(), time.time(), *outputs.values())
+            )
+            evicted = [row[0] for row in self._conn.execute(
+                "SELECT fingerprint FROM prior_runs ORDER BY updated_at DESC LIMIT -1 OFFSET ?", (self.max_entries,)
+            )]
+            self._conn.executemany("DELETE FROM prior_runs WHERE fingerprint = ?", [(key,) for key in evicted])
+            self._conn.commit()
+            # The matrix is updated in place; a re-recorded run keeps its row, as its vector is unchanged
+            if key not in self._positions:
+                self._append(key, indices, values)
+            if evicted:
+                self._drop(set(evicted))
+            self.version += 1
+
+    def find_similar(self, business_req, threshold=SIMILAR_RUN_THRESHOLD):
+        """Return the earlier run most similar to business_req, or None when none reaches threshold.
+
+        The run is a dict with fingerprint, business_req, the PRIOR_RUN_OUTPUTS (None when
+        not generated), updated_at and similarity. A run of the same document is skipped,
+        as the response cache already answers it.
+        """
+        import numpy as np
+
+        if not business_req.strip():
+            return None
+        key = fingerprint(business_req.encode("utf-8"))
+        indices, values = self._vector(key, business_req)
+        if not len(indices):
+            return None
+        with self._lock:
+            if not self._fingerprints:
+                return None
+            # Sparse dot products: every stored entry is matched against the sorted query indices
+            positions = np.minimum(np.searchsorted(indices, self._indices), len(indices) - 1)
+            products = np.where(indices[positions] == self._indices, self._values * values[positions], 0.0)
+            # Sum of the products of each run; a zero-length run sums to 0
+            sums = np.add.reduceat(np.append(products, 0.0), self._indptr[:-1])
+            similarities = np.where(np.diff(self._indptr) > 0, sums, 0.0)
+            for position in np.argsort(similarities)[::-1]:
+                if similarities[position] < threshold:
+                    return None
+                if self._fingerprints[position] != key:
+                    break
+            else:
+                return None
+            row = self._conn.execute(
+                f"SELECT fingerprint, business_req, {', '.join(PRIOR_RUN_OUTPUTS)}, updated_at "
+                "FROM prior_runs WHERE fingerprint = ?", (self._fingerprints[position],)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            **dict(zip(["fingerprint", "business_req", *PRIOR_RUN_OUTPUTS, "updated_at"], row)),
+            "similarity": float(similarities[position]),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM prior_runs")
+            self._conn.commit()
+            self._load()
+            self.version += 1
+
+    def stats(self):
+        with self._lock:
+            return {"runs": len(self._fingerprints), "entries": int(self._indptr[-1])}
+
+
+def create_prior_run_index():
+    """Create the prior run index at the PRIOR_RUNS_PATH environment variable."""
+    return PriorRunIndex(os.getenv("PRIOR_RUNS_PATH", ".prior_runs.sqlite3"))
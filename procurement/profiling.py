@@ -0,0 +1,58 @@
+"""Import-time report for measuring the cold start of the app.
+
+Each module is imported in a fresh interpreter with ``python -X importtime`` so the
+numbers are cold-start costs, independent of what the current process already imported.
+
+Usage: python -m procurement.profiling [module ...]
+"""
+
+import subprocess
+import sys
+
+# Modules whose import dominates the cold start of the Streamlit app
+STARTUP_MODULES = [
+    "streamlit",
+    "pandas",
+    "langchain.chains",
+    "langchain_google_genai",
+    "procurement",
+    "procurement.pipeline",
+]
+
+
+def measure_import_time(module, python=sys.executable):
+    """Return the cumulative cold import time of module in seconds."""
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+    # Lines look like "import time:       self [us] |   cumulative | imported package"
+    for line in reversed(result.stderr.splitlines()):
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise ImportError(f"No import time reported for {module}")
+
+
+def import_time_report(modules=STARTUP_MODULES):
+    """Return (module, seconds or None when the module cannot be imported) for each module."""
+    report = []
+    for module in modules:
+        try:
+            report.append((module, measure_import_time(module)))
+        except ImportError:
+            report.append((module, None))
+    return report
+
+
+def main(argv=None):
+    modules = (argv if argv is not None else sys.argv[1:]) or STARTUP_MODULES
+    for module, seconds in import_time_report(modules):
+        timing = "not installed" if seconds is None else f"{seconds * 1000:8.1f} ms"
+        print(f"{module:<30} {timing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Prompt templates of the eight procurement steps.
+
+The templates are plain strings so importing this module does not import LangChain;
+chains.py turns them into PromptTemplate objects.
+"""
+
+# Step 1: Business to Technical Requirements Conversion
+TECH_REQ_TEMPLATE = """
+    
+Context: TransGlobal Industries is automating its procurement proces using AI Agents.
+Role: You are a technical requirements analyst.
+Task: Convert the following Business Requirements into a detailed Technical Requirements Document.
+Action: Generate a structured Technical Requirements Document. Provide the output in plain text, without any Markdown formatting.
+
+Business Requirement:
+{business_req}
+
+    The technical requirements document should include:
+    
+    1. A header with project title and date
+    2. Numbered sections for different requirement categories
+    3. For each requirement, include:
+       * The specific technical requirement
+    
+    Each requirement should be specific, measurable, achievable, relevant, and time-bound (SMART).
+    
+    Ensure all functional and non-functional requirements are covered, including:
+    - System architecture
+    - Performance specifications
+    - Integration requirements
+    - Security requirements
+    - User interface specifications
+    - Data management requirements
+    - Any relevant standards or compliance needs
+    Ensure that you don't pick up LLM, streamlit, Langchain or any other component required to build the agent. The agent should be strictly based on the business required document.
+"""
+
+# Step 2: Vendor Shortlisting (LLM is used to get names of Vendors)
+VENDOR_SHORTLIST_TEMPLATE = """
+Context: TransGlobal Industries is automating its procurement process.
+Role: You are a vendor identification specialist.
+Task: Based on the Technical Requirements and Vendor History, identify suitable vendors.
+Action: Return a comma-separated list of vendors that might be suitable (e.g., Vendor A, Vendor B). Only list the vendor names, nothing else. Provide the output in plain text, without any Markdown formatting. 
+
+Technical Requirements:
+{tech_req}
+
+Vendor History:
+{vendor_history}
+"""
+
+# Step 3: Tender Document & RFP Preparation
+TENDER_DOC_TEMPLATE = """
+Context: TransGlobal Industries is automating its procurement process.
+Role: You are a procurement document specialist.
+Task: Prepare a comprehensive Tender Document and Request for Proposal (RFP).
+Action: Format the document to encapsulate the provided technical and business requirements.Provide the output in plain text, without any Markdown formatting.
+
+Technical Requirements:
+{tech_req}
+
+Business Requirements:
+{business_req}
+"""
+
+# Step 4: Tender Email Generation for Shortlisted Vendors
+# One vendor-agnostic email is generated; emails.py fills in the placeholders per vendor.
+TENDER_EMAIL_TEMPLATE = """
+Context: TransGlobal Industries procurement process.
+Role: You are a communications specialist.
+Task: Generate a professional email template to send the tender document to a shortlisted vendor.
+Action: Provide the output in plain text, without any Markdown formatting.
+The email should:
+    1. Have a clear, professional subject line
+    2. Introduce the company (TransGlobal Industries) and the opportunity briefly
+    3. Mention that they've been shortlisted based on their capabilities
+    4. Explain that the tender document is attached
+    5. Specify the deadline for submission
+    6. Provide contact information for questions
+    7. End with a professional closing
+    
+    Keep the email concise but professional. Do not include the actual tender document text in the email.
+    Format as a complete email with Subject line, Greeting, Body, and Signature.
+
+    Write the placeholder [VENDOR_NAME] wherever the vendor's company name belongs, [VENDOR_CONTACT] for the person addressed in the greeting, and [SUBMISSION_DEADLINE] for the submission deadline. Do not invent names or dates for them.
+
+Tender Summary:
+{tender_summary}
+"""
+
+# Step 5: Bid Evaluation
+BID_EVALUATION_TEMPLATE = """
+Context: TransGlobal Industries procurement process.
+Role: You are a bid evaluation expert.
+Task: Evaluate the provided bids based on price, quality, delivery, and technological capability.
+Action: Identify and list the top two bids with scoring and brief justification. Provide the output in plain text, without any Markdown formatting.
+
+Bids Data:
+{bids_data}
+"""
+
+# Step 5: Justification of the top bids ranked by the local multi-criteria scoring (bid_scoring.py)
+BID_JUSTIFICATION_TEMPLATE = """
+Context: TransGlobal Industries procurement process.
+Role: You are a bid evaluation expert.
+Task: The bids below were ranked by a weighted score on price, quality, delivery, and technological capability. Justify the ranking.
+Action: For each bid, in the given order, explain in two or three sentences the strengths and weaknesses behind its score. Do not change the ranking or the scores. Provide the output in plain text, without any Markdown formatting.
+
+Ranked Bids:
+{ranked_bids}
+"""
+
+# Step 5: Extracts the bids of the shortlisted vendors from unstructured bids data
+EXTRACT_BIDS_TEMPLATE = """
+Context:TransGlobal Industries Automated procurement process.
+Role: You are a bid data extraction specialist.
+Task: Identify and extract the COMPLETE bid data ONLY for the following shortlisted vendors.
+Action: Return ONLY the complete bid data for these vendors. If a vendor has no bid in the "All Bids" data, skip it. Return each bid on a new line. If the vendor name can not be found in the all bids, skip it.
+
+Shortlisted Vendors: {shortlisted_vendors}
+
+All Bids:
+{bids_data}
+"""
+
+# Step 6: Negotiation Strategy and BATNA Analysis
+NEGOTIATION_STRATEGY_TEMPLATE = """
+Context: TransGlobal Industries procurement process.
+Role: You are a negotiation strategist.
+Task: Develop a negotiation strategy and identify the Best Alternative to a Negotiated Agreement (BATNA).
+Action: Provide clear strategies and recommendations based on the top two bids. Provide the output in plain text, without any Markdown formatting.
+
+Top Two Bids:
+{top_two_bids}
+"""
+
+# Step 7: Risk Assessment Report Generation
+RISK_ASSESSMENT_TEMPLATE = """
+Context: TransGlobal Industries procurement process.
+Role: You are a risk assessment specialist.
+Task: Generate a risk assessment report for the preferred vendor.
+Action: Include analysis on delivery, quality, compliance, performance, and communication risks. Provide the output in plain text, without any Markdown formatting.
+
+Negotiation Strategy:
+{negotiation_strategy}
+
+Bid Data:
+{bid_data}
+"""
+
+# Step 8: Contract Document Generation
+CONTRACT_DOC_TEMPLATE = """
+Context: TransGlobal Industries procurement process.
+Role: You are a contract drafting expert.
+Task: Draft a comprehensive contract document.
+Action: Include clauses on risk mitigation, performance guarantees, and dispute resolution based on the risk assessment report. Provide the output in plain text, without any Markdown formatting.
+
+Risk Assessment Report:
+{risk_assessment}
+"""
+
+# Step 1 (map-reduce mode): Partial Technical Requirements for one section of a large Business Requirements document
+TECH_REQ_MAP_TEMPLATE = """
+Context: TransGlobal Industries is automating its procurement process using AI Agents. A large Business Requirements document has been split into parts.
+Role: You are a technical requirements analyst.
+Task: Convert the following part of the Business Requirements into technical requirements.
+Action: List every technical requirement this part implies, grouped under requirement categories (system architecture, performance, integration, security, user interface, data management, standards and compliance). Make each requirement specific, measurable, achievable, relevant, and time-bound (SMART). Only cover what this part states; do not add a header or introduction. Provide the output in plain text, without any Markdown formatting.
+Ensure that you don't pick up LLM, streamlit, Langchain or any other component required to build the agent. The requirements should be strictly based on the business requirements.
+
+Business Requirements (part {part_number} of {part_count}):
+{business_req_section}
+"""
+
+# Step 1 (map-reduce mode): Merging the partial Technical Requirements into one document
+TECH_REQ_REDUCE_TEMPLATE = """
+Context: TransGlobal Industries is automating its procurement process using AI Agents.
+Role: You are a technical requirements analyst.
+Task: Merge the following partial technical requirements, each derived from one part of the same Business Requirements document, into a single detailed Technical Requirements Document.
+Action: Remove duplicates, resolve overlaps and keep every distinct requirement. Provide the output in plain text, without any Markdown formatting.
+
+Partial Technical Requirements:
+{partial_requirements}
+
+    The technical requirements document should include:
+    
+    1. A header with project title and date
+    2. Numbered sections for different requirement categories
+    3. For each requirement, include:
+       * The specific technical requirement
+    
+    Each requirement should be specific, measurable, achievable, relevant, and time-bound (SMART).
+    
+    Ensure all functional and non-functional requirements are covered, including:
+    - System architecture
+    - Performance specifications
+    - Integration requirements
+    - Security requirements
+    - User interface specifications
+    - Data management requirements
+    - Any relevant standards or compliance needs
+"""
+
+# Steps 6-8 in one call (fused mode); fused_steps.py splits the response on the marker lines
+NEGOTIATION_RISK_CONTRACT_TEMPLATE = """
+Context: TransGlobal Industries procurement process.
+Role: You are a negotiation strategist, risk assessment specialist and contract drafting expert.
+Task: Write three documents in order, each based on the one before it:
+    1. A negotiation strategy identifying the Best Alternative to a Negotiated Agreement (BATNA), with clear strategies and recommendations based on the top two bids.
+    2. A risk assessment report for the preferred vendor, with analysis on delivery, quality, compliance, performance, and communication risks.
+    3. A comprehensive contract document with clauses on risk mitigation, performance guarantees, and dispute resolution based on the risk assessment.
+Action: Start each document with its marker line, written exactly as below on a line of its own, and write nothing before the first marker:
+===== NEGOTIATION STRATEGY =====
+===== RISK ASSESSMENT =====
+===== CONTRACT DOCUMENT =====
+Provide the output in plain text, without any Markdown formatting.
+
+Top Two Bids:
+{bid_evaluation}
+
+Bid Data:
+{bid_data}
+"""
+
+# Step 1 with an earlier, similar tender as the example
+TECH_REQ_EXAMPLE_TEMPLATE = """
+Context: TransGlobal Industries is automating its procurement process using AI Agents. An earlier tender had similar Business Requirements.
+Role: You are a technical requirements analyst.
+Task: Convert the new Business Requirements into a detailed Technical Requirements Document, using the document written for the earlier tender as the example.
+Action: Follow the structure and level of detail of the example. Keep the requirements that still apply, and change, add or remove requirements wherever the new Business Requirements differ from the earlier ones. Every requirement must follow from the new Business Requirements. Provide the output in plain text, without any Markdown formatting.
+
+Earlier Business Requirements:
+{example_business_req}
+
+Earlier Technical Requirements Document:
+{example_tech_req}
+
+New Business Requirements:
+{business_req}
+"""
+
+# Step 3 with an earlier, similar tender as the example
+TENDER_DOC_EXAMPLE_TEMPLATE = """
+Context: TransGlobal Industries is automating its procurement process. An earlier tender had similar requirements.
+Role: You are a procurement document specialist.
+Task: Prepare a comprehensive Tender Document and Request for Proposal (RFP), using the Tender Document of the earlier tender as the example.
+Action: Follow the structure and wording of the example where it still applies, and make every detail (quantities, dates, specifications, terms) match the provided technical and business requirements. Provide the output in plain text, without any Markdown formatting.
+
+Earlier Tender Document:
+{example_tender_doc}
+
+Technical Requirements:
+{tech_req}
+
+Business Requirements:
+{business_req}
+"""
+
+# Prompt name -> (input variables, template)
+PROMPTS = {
+    "tech_req": (["business_req"], TECH_REQ_TEMPLATE),
+    "vendor_shortlist": (["tech_req", "vendor_history"], VENDOR_SHORTLIST_TEMPLATE),
+    "tender_doc": (["tech_req", "business_req"], TENDER_DOC_TEMPLATE),
+    "tender_email": (["tender_summary"], TENDER_EMAIL_TEMPLATE),
+    "bid_evaluation": (["bids_data"], BID_EVALUATION_TEMPLATE),
+    "bid_justification": (["ranked_bids"], BID_JUSTIFICATION_TEMPLATE),
+    "extract_bids": (["shortlisted_vendors", "bids_data"], EXTRACT_BIDS_TEMPLATE),
+    "negotiation_strategy": (["top_two_bids"], NEGOTIATION_STRATEGY_TEMPLATE),
+    "risk_assessment": (["negotiation_strategy", "bid_data"], RISK_ASSESSMENT_TEMPLATE),
+    "contract_doc": (["risk_assessment"], CONTRACT_DOC_TEMPLATE),
+    "tech_req_map": (["business_req_section", "part_number", "part_count"], TECH_REQ_MAP_TEMPLATE),
+    "tech_req_reduce": (["partial_requirements"], TECH_REQ_REDUCE_TEMPLATE),
+    "tech_req_example": (["example_business_req", "example_tech_req", "business_req"], TECH_REQ_EXAMPLE_TEMPLATE),
+    "tender_doc_example": (["example_tender_doc", "tech_req", "business_req"], TENDER_DOC_EXAMPLE_TEMPLATE),
+    "negotiation_risk_contract": (["bid_evaluation", "bid_data"], NEGOTIATION_RISK_CONTRACT_TEMPLATE),
+}
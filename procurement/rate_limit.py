@@ -0,0 +1,344 @@
+"""Process-wide throttling and retries of the LLM calls.
+
+Every chain shares one chat model wrapped in RateLimitedChatModel, and every wrapped
+call goes through one RateLimiter:
+
+- two token buckets, on requests per minute and on tokens per minute, delay calls that
+  would exceed the Gemini quota instead of letting them fail;
+- an adaptive concurrency limit halves the calls allowed in flight whenever the server
+  answers 429 and grows back by one per limit's worth of successful calls (AIMD);
+- throttled and transient failures are retried with jittered exponential backoff, so a
+  single failure no longer aborts the step.
+
+Token usage is estimated from the prompt before the call and corrected with the usage
+reported in the response.
+"""
+
+import asyncio
+import functools
+import os
+import random
+import threading
+import time
+
+from .context import estimate_tokens as estimate_text_tokens
+
+# Quota of the Gemini project; the defaults leave headroom under the free-tier limits
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_RATE_LIMIT_RPM", "60"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_RATE_LIMIT_TPM", "1000000"))
+
+# Upper bound of the adaptive number of LLM calls in flight across the process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+# Retries of a throttled or transiently failed call, and the backoff bounds in seconds
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_BACKOFF_BASE = 1.0
+LLM_BACKOFF_CAP = 30.0
+
+# Tokens reserved for the completion of a call until its actual usage is known
+COMPLETION_TOKENS_ESTIMATE = 1024
+
+# How often a coroutine waiting for a concurrency slot checks again
+ACQUIRE_POLL_SECONDS = 0.05
+
+TRANSIENT_STATUS_CODES = {408, 500, 502, 503, 504}
+TRANSIENT_ERROR_NAMES = {"ServiceUnavailable", "DeadlineExceeded", "InternalServerError", "Aborted"}
+
+
+def is_throttling_error(error):
+    """Whether error is a 429 / quota-exceeded answer."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code == 429 or type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "RateLimitError")
+
+
+def is_transient_error(error):
+    """Whether error is a server or network failure worth retrying."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return (
+        code in TRANSIENT_STATUS_CODES
+        or type(error).__name__ in TRANSIENT_ERROR_NAMES
+        or isinstance(error, (ConnectionError, TimeoutError))
+    )
+
+
+def backoff_delay(attempt, base=LLM_BACKOFF_BASE, cap=LLM_BACKOFF_CAP, error=None):
+    """Full-jitter exponential backoff before retry number attempt + 1.
+
+    A retry delay suggested by the server (retry_after) is used as the lower bound.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    suggested = getattr(error, "retry_after", None)
+    return max(delay, min(float(suggested), cap)) if suggested else delay
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at per_minute / 60 per second."""
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.available = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take amount from the bucket and return the seconds to wait before using it.
+
+        The bucket may go negative, so concurrent callers queue up behind each other
+        instead of racing for the refill. A single amount is capped at the capacity.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+            self.updated = now
+            self.available -= min(amount, self.capacity)
+            return 0.0 if self.available >= 0 else -self.available / self.rate
+
+    def refund(self, amount):
+        """Give back amount that was reserved but not used."""
+        with self._lock:
+            self.available = min(self.capacity, self.available + amount)
+
+
+class AdaptiveConcurrency:
+    """Limit on calls in flight that halves on throttling and grows back additively."""
+
+    def __init__(self, max_limit, min_limit=1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def try_acquire(self):
+        with self._condition:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    async def aacquire(self):
+        # The limit is shared with threads running their own event loops, so poll instead of awaiting a condition
+        while not self.try_acquire():
+            await asyncio.sleep(ACQUIRE_POLL_SECONDS)
+
+    def release(self, throttled=False):
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.min_limit, self.limit / 2)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+def _reported_tokens(result):
+    """Total tokens reported in a ChatResult, or None when the model reported no usage."""
+    total = 0
+    for generation in getattr(result, "generations", None) or []:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if usage:
+            total += usage.get("total_tokens", 0)
+    return total or None
+
+
+class RateLimiter:
+    """Request and token buckets, adaptive concurrency and a retry policy shared by all LLM calls."""
+
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE,
+                 max_concurrency=LLM_MAX_CONCURRENCY, max_retries=LLM_MAX_RETRIES,
+                 backoff_base=LLM_BACKOFF_BASE, backoff_cap=LLM_BACKOFF_CAP):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.calls = 0
+        self.throttled = 0
+        self.retries = 0
+        self._counters_lock = threading.Lock()
+
+    def _count(self, counter):
+        """Increment one of the calls, throttled and retries counters; they are shared by every thread."""
+        with self._counters_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _reserve(self, estimated_tokens):
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def _settle(self, result, estimated_tokens):
+        """Correct the token bucket with the usage the response reported."""
+        actual = _reported_tokens(result)
+        if actual is None:
+            return
+        if actual > estimated_tokens:
+            self.tokens.reserve(actual - estimated_tokens)
+        else:
+            self.tokens.refund(estimated_tokens - actual)
+
+    def _should_retry(self, error, attempt):
+        throttled = is_throttling_error(error)
+        if throttled:
+            self._count("throttled")
+        return throttled, attempt < self.max_retries and (throttled or is_transient_error(error))
+
+    def call(self, function, estimated_tokens, on_retry=None):
+        """Call function() within the limits, retrying throttled and transient failures.
+
+        on_retry, if given, is called with the error before every retry.
+        """
+        for attempt in range(self.max_retries + 1):
+            time.sleep(self._reserve(estimated_tokens))
+            self.concurrency.acquire()
+            self._count("calls")
+            throttled = False
+            try:
+                result = function()
+            except Exception as e:
+                throttled, retry = self._should_retry(e, attempt)
+                if not retry:
+                    raise
+                error = e
+            else:
+                self._settle(result, estimated_tokens)
+                return result
+            finally:
+                self.concurrency.release(throttled)
+            self._count("retries")
+            if on_retry:
+                on_retry(error)
+            time.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap, error))
+
+    async def acall(self, function, estimated_tokens, on_retry=None):
+        """Async counterpart of call; function() returns an awaitable."""
+        for attempt in range(self.max_retries + 1):
+            await asyncio.sleep(self._reserve(estimated_tokens))
+            await self.concurrency.aacquire()
+            self._count("calls")
+            throttled = False
+            try:
+                result = await function()
+            except Exception as e:
+                throttled, retry = self._should_retry(e, attempt)
+                if not retry:
+                    raise
+                error = e
+            else:
+                self._settle(result, estimated_tokens)
+                return result
+            finally:
+                self.concurrency.release(throttled)
+            self._count("retries")
+            if on_retry:
+                await on_retry(error)
+            await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_cap, error))
+
+    def stats(self):
+        """Return the call, throttling and retry counts and the current concurrency limit."""
+        return {
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "retries": self.retries,
+            "concurrency_limit": int(self.concurrency.limit),
+            "in_flight": self.concurrency.in_flight,
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def shared_rate_limiter():
+    """Return the RateLimiter shared by every LLM call of the process."""
+    return RateLimiter()
+
+
+def estimate_tokens(messages):
+    """Tokens reserved for a call: the estimated prompt tokens plus the completion estimate."""
+    return sum(estimate_text_tokens(str(message.content)) for message in messages) + COMPLETION_TOKENS_ESTIMATE
+
+
+class _RetryState:
+    """Minimal stand-in for the tenacity state passed to on_retry callbacks."""
+
+    def __init__(self, attempt_number, error):
+        self.attempt_number = attempt_number
+        self.outcome = error
+
+
+@functools.lru_cache(maxsize=None)
+def _rate_limited_model_class():
+    """Define RateLimitedChatModel on first use, importing LangChain lazily."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+    class RateLimitedChatModel(BaseChatModel):
+        """Chat model delegating to llm with every call going through limiter."""
+
+        llm: BaseChatModel
+        limiter: RateLimiter
+
+        @property
+        def _llm_type(self):
+            return self.llm._llm_type
+
+        @property
+        def _identifying_params(self):
+            return self.llm._identifying_params
+
+        @property
+        def model(self):
+            # Read by the response cache key and the telemetry
+            return getattr(self.llm, "model", None)
+
+        @property
+        def temperature(self):
+            return getattr(self.llm, "temperature", None)
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            retries = []
+
+            def on_retry(error):
+                retries.append(error)
+                if run_manager:
+                    run_manager.on_retry(_RetryState(len(retries), error))
+
+            return self.limiter.call(
+                lambda: self.llm._generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+                estimate_tokens(messages), on_retry
+            )
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            retries = []
+
+            async def on_retry(error):
+                retries.append(error)
+                if run_manager:
+                    await run_manager.on_retry(_RetryState(len(retries), error))
+
+            return await self.limiter.acall(
+                lambda: self.llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs),
+                estimate_tokens(messages), on_retry
+            )
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            # Only the request up to its first chunk is throttled and retried; a stream that
+            # fails halfway is not restarted because its tokens were already shown
+            def start():
+                chunks = self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+                return next(chunks, None), chunks
+
+            first, chunks = self.limiter.call(start, estimate_tokens(messages))
+            if first is not None:
+                yield first
+                yield from chunks
+
+    return RateLimitedChatModel
+
+
+def rate_limited(llm, limiter=None):
+    """Wrap llm so its calls share limiter, by default the process-wide one."""
+    return _rate_limited_model_class()(llm=llm, limiter=limiter or shared_rate_limiter())
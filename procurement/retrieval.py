@@ -0,0 +1,81 @@
+"""Offline lexical retrieval over the vendor history for Step 2.
+
+Instead of pasting the whole vendor history into the vendor shortlist prompt, a BM25
+index over each vendor's capability rows picks the vendors most relevant to the
+technical requirements, and only their rows are sent to the LLM. The index is built
+once per uploaded history file and reused for every tender.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+
+# Number of candidate vendors and history rows per vendor sent to vendor_shortlist_chain
+VENDOR_RETRIEVAL_TOP_K = 20
+VENDOR_CONTEXT_ROWS_PER_VENDOR = 5
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it", "of",
+    "on", "or", "should", "that", "the", "this", "to", "will", "with"
+}
+
+
+def tokenize(text):
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOPWORDS]
+
+
+class VendorRetrievalIndex:
+    """BM25 index with one document per vendor, made of the text columns of its history rows."""
+
+    def __init__(self, df, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        text_columns = df.select_dtypes(exclude="number").columns
+        rows = df['Vendor_name'].astype(str)
+        for column in text_columns.drop('Vendor_name', errors="ignore"):
+            rows = rows + " " + df[column].astype(str)
+        documents = rows.groupby(df['Vendor_name'], sort=False, observed=True).agg(" ".join)
+
+        self.vendors = documents.index.tolist()
+        self.doc_lengths = []
+        self.postings = defaultdict(list)  # term -> [(vendor position, term frequency)]
+        for position, document in enumerate(documents):
+            term_counts = Counter(tokenize(document))
+            self.doc_lengths.append(sum(term_counts.values()))
+            for term, frequency in term_counts.items():
+                self.postings[term].append((position, frequency))
+        self.avg_length = sum(self.doc_lengths) / max(len(self.doc_lengths), 1)
+
+    def search(self, query, top_k=VENDOR_RETRIEVAL_TOP_K):
+        """Return the top_k vendor names for the query, best match first.
+
+        When fewer than top_k vendors share a term with the query, the remaining slots are
+        filled with the other vendors in file order so small histories are sent in full.
+        """
+        scores = defaultdict(float)
+        vendor_count = len(self.vendors)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (vendor_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for position, frequency in postings:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[position] / self.avg_length
+                scores[position] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+        best = [position for position, _ in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])]
+        if len(best) < top_k:
+            matched = set(best)
+            best += [position for position in range(vendor_count) if position not in matched][:top_k - len(best)]
+        return [self.vendors[position] for position in best]
+
+
+def retrieve_vendor_history(df, retrieval_index, tech_req):
+    """Return the history rows of the vendors most relevant to tech_req as CSV text."""
+    candidates = retrieval_index.search(tech_req)
+    rows = df[df['Vendor_name'].isin(candidates)].groupby('Vendor_name', sort=False, observed=True).head(
+        VENDOR_CONTEXT_ROWS_PER_VENDOR
+    )
+    return rows.to_csv(index=False)
@@ -0,0 +1,211 @@
+"""Per-step model routing with latency budgets.
+
+Every prompt is routed to a model tier with its own latency budget and output token
+limit: the short structured answers (the vendor name list, the extracted bids, the email
+template, the bid justification, the map step of Step 1) go to the fast tier, and the
+long-form drafting to the standard tier. A call still running when its budget runs out
+is abandoned and made again on the faster fallback tier. A fallback answer is not written
+to the response cache, whose key names the routed model.
+
+An abandoned async call is cancelled. A synchronous call cannot be interrupted: one that
+has not started yet is cancelled, otherwise it runs to completion in its worker thread,
+holding its rate limiter slot, and its tokens are still billed. It is recorded with the
+outcome "abandoned" once it finishes.
+
+Every call is recorded in the telemetry log as a "routing:<prompt>" record with its tier,
+model, latency, budget, tokens and outcome ("ok", "over_budget", "timeout", "fallback"
+or "abandoned"), so summarize() shows the latency and cost of each route for tuning.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import os
+import time
+from typing import Optional
+
+from .cache import mark_response_uncacheable
+from .llm import MODEL_NAME, create_llm
+from .prompts import PROMPTS
+from .telemetry import estimate_cost, record
+
+# Tier name -> Gemini model
+MODEL_TIERS = {
+    "fast": os.getenv("LLM_MODEL_FAST", "gemini-2.5-flash-lite"),
+    "standard": os.getenv("LLM_MODEL_STANDARD", MODEL_NAME),
+}
+
+# Tier a call moves to when it exceeds its latency budget; the fast tier has none
+FALLBACK_TIERS = {"standard": "fast"}
+
+# Prompt name -> (tier, latency budget in seconds, maximum output tokens)
+MODEL_ROUTES = {
+    "tech_req": ("standard", 90, 4096),
+    "tech_req_map": ("fast", 45, 2048),
+    "tech_req_reduce": ("standard", 90, 4096),
+    "vendor_shortlist": ("fast", 20, 1024),
+    "tech_req_example": ("standard", 90, 4096),
+    "tender_doc": ("standard", 120, 8192),
+    "tender_doc_example": ("standard", 120, 8192),
+    "tender_email": ("fast", 30, 1024),
+    "extract_bids": ("fast", 30, 2048),
+    "bid_evaluation": ("standard", 60, 4096),
+    "bid_justification": ("fast", 30, 1024),
+    "negotiation_strategy": ("standard", 90, 4096),
+    "risk_assessment": ("standard", 90, 4096),
+    "contract_doc": ("standard", 120, 8192),
+    "negotiation_risk_contract": ("standard", 240, 16384),
+}
+
+# Route of a prompt missing from MODEL_ROUTES
+DEFAULT_ROUTE = ("standard", 120, None)
+
+# Threads running the synchronous calls whose latency budget is enforced
+ROUTING_MAX_THREADS = 64
+
+
+@functools.lru_cache(maxsize=None)
+def _timeout_pool():
+    return concurrent.futures.ThreadPoolExecutor(max_workers=ROUTING_MAX_THREADS, thread_name_prefix="llm-routing")
+
+
+def _usage(result):
+    """Prompt and completion tokens reported in a ChatResult."""
+    prompt_tokens, completion_tokens = 0, 0
+    for generation in getattr(result, "generations", None) or []:
+        usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+        prompt_tokens += usage.get("input_tokens", 0)
+        completion_tokens += usage.get("output_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+def log_route(route, tier, model, budget, started_at, outcome, result=None):
+    """Record one routed call in the telemetry log."""
+    prompt_tokens, completion_tokens = _usage(result)
+    record(
+        f"routing:{route}",
+        wall_time=time.perf_counter() - started_at,
+        tier=tier,
+        model=model,
+        budget_s=budget,
+        outcome=outcome,
+        fallback=outcome == "fallback",
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        cost=estimate_cost(model, prompt_tokens, completion_tokens),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _routed_model_class():
+    """Define RoutedChatModel on first use, importing LangChain lazily."""
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+    class RoutedChatModel(BaseChatModel):
+        """Chat model calling llm within timeout seconds, and fallback once that budget is exceeded."""
+
+        route: str
+        tier: str
+        llm: BaseChatModel
+        timeout: float
+        fallback_tier: Optional[str] = None
+        fallback: Optional[BaseChatModel] = None
+
+        @property
+        def _llm_type(self):
+            return self.llm._llm_type
+
+        @property
+        def _identifying_params(self):
+            return self.llm._identifying_params
+
+        @property
+        def model(self):
+            # Read by the response cache key and the telemetry
+            return getattr(self.llm, "model", None)
+
+        @property
+        def temperature(self):
+            return getattr(self.llm, "temperature", None)
+
+        def _log(self, started_at, outcome, result=None, fallback=False):
+            llm, tier = (self.fallback, self.fallback_tier) if fallback else (self.llm, self.tier)
+            log_route(self.route, tier, getattr(llm, "model", None), self.timeout, started_at, outcome, result)
+
+        def _log_abandoned(self, started_at, future):
+            """Record the tokens of an abandoned call once it finishes."""
+            result = None if future.cancelled() or future.exception() else future.result()
+            self._log(started_at, "abandoned", result)
+
+        def _outcome(self, started_at):
+            return "ok" if time.perf_counter() - started_at <= self.timeout else "over_budget"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            started_at = time.perf_counter()
+            call = functools.partial(self.llm._generate, messages, stop=stop, run_manager=run_manager, **kwargs)
+            if self.fallback is None:
+                result = call()
+                self._log(started_at, self._outcome(started_at), result)
+                return result
+            future = _timeout_pool().submit(contextvars.copy_context().run, call)
+            try:
+                result = future.result(timeout=self.timeout)
+            except concurrent.futures.TimeoutError:
+                self._log(started_at, "timeout")
+                if not future.cancel():
+                    # Already running: it completes in its thread and its answer is discarded
+                    future.add_done_callback(functools.partial(self._log_abandoned, started_at))
+                mark_response_uncacheable()
+                started_at = time.perf_counter()
+                result = self.fallback._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                self._log(started_at, "fallback", result, fallback=True)
+                return result
+            self._log(started_at, "ok", result)
+            return result
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            started_at = time.perf_counter()
+            call = self.llm._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            if self.fallback is None:
+                result = await call
+                self._log(started_at, self._outcome(started_at), result)
+                return result
+            try:
+                result = await asyncio.wait_for(call, self.timeout)
+            except asyncio.TimeoutError:
+                self._log(started_at, "timeout")
+                mark_response_uncacheable()
+                started_at = time.perf_counter()
+                result = await self.fallback._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+                self._log(started_at, "fallback", result, fallback=True)
+                return result
+            self._log(started_at, "ok", result)
+            return result
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            # Streamed tokens are already on screen, so a slow stream is not restarted on the fallback
+            started_at = time.perf_counter()
+            yield from self.llm._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+            self._log(started_at, self._outcome(started_at))
+
+    return RoutedChatModel
+
+
+def create_routed_llms(api_key, routes=MODEL_ROUTES, tiers=MODEL_TIERS):
+    """Return prompt name -> chat model routed to the prompt's tier, for chains.build_chains."""
+    routed_model = _routed_model_class()
+    llms = {}
+    for name in PROMPTS:
+        tier, timeout, max_output_tokens = routes.get(name, DEFAULT_ROUTE)
+        fallback_tier = FALLBACK_TIERS.get(tier)
+        llms[name] = routed_model(
+            route=name,
+            tier=tier,
+            llm=create_llm(api_key, tiers[tier], max_output_tokens=max_output_tokens),
+            timeout=timeout,
+            fallback_tier=fallback_tier,
+            fallback=create_llm(api_key, tiers[fallback_tier], max_output_tokens=max_output_tokens)
+            if fallback_tier else None,
+        )
+    return llms
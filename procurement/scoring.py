@@ -0,0 +1,59 @@
+"""Vendor scoring for Step 2.
+
+The vendor history is aggregated once into a per-vendor score index; shortlisting the
+vendors returned by the LLM is then a lookup plus a partial top-k selection.
+"""
+
+
+def parse_vendor_names(vendor_names):
+    """Split the comma-separated vendor names returned by the LLM into a list."""
+    return [name.strip() for name in vendor_names.split(',')]
+
+
+# Weight of each history column in the composite vendor score (equal weights give the plain average)
+VENDOR_SCORE_WEIGHTS = {
+    "Delivery_punctuality": 1.0,
+    "Quality_of_goods": 1.0,
+    "Contract_term_compliance": 1.0,
+}
+
+# Error of a vendor history missing a column Step 2 needs, formatted with the KeyError
+VENDOR_HISTORY_COLUMNS_ERROR = (
+    "The Vendor History has no column {}. It needs the columns 'Vendor_name', "
+    "'Delivery_punctuality', 'Quality_of_goods' and 'Contract_term_compliance'."
+)
+
+# Columns the shortlist is ranked on, in tie-breaking order
+VENDOR_RANKING_COLUMNS = ["composite", "contract", "quality", "delivery"]
+
+
+def build_vendor_score_index(df, weights=VENDOR_SCORE_WEIGHTS):
+    """Aggregate the whole vendor history in one groupby into a per-vendor score table.
+
+    Raises KeyError when the vendor history lacks 'Vendor_name' or one of the score columns.
+    """
+    averages = df.groupby('Vendor_name', sort=False, observed=True)[list(weights)].mean()
+    return score_table(averages, weights)
+
+
+def score_table(averages, weights=VENDOR_SCORE_WEIGHTS):
+    """Turn per-vendor averages of the history columns into the score table shortlist_vendors ranks."""
+    import pandas as pd
+
+    composite = sum(averages[column] * weight for column, weight in weights.items()) / sum(weights.values())
+    return pd.DataFrame({
+        "composite": composite,
+        "contract": averages['Contract_term_compliance'],
+        "quality": averages['Quality_of_goods'],
+        "delivery": averages['Delivery_punctuality']
+    })
+
+
+def shortlist_vendors(vendor_names_list, score_index, top_n=2):
+    """Return the top_n of the given vendors ranked on composite score, then contract, quality and delivery.
+
+    Vendors without history are skipped; complete ties keep the order the LLM returned them in.
+    """
+    candidates = [vendor for vendor in dict.fromkeys(vendor_names_list) if vendor in score_index.index]
+    ranked = score_index.loc[candidates].nlargest(top_n, VENDOR_RANKING_COLUMNS, keep="first")
+    return ranked.index.tolist()
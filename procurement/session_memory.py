@@ -0,0 +1,176 @@
+"""Compact per-session storage of the generated documents, with idle-session offload.
+
+Every Streamlit session keeps the documents generated by the eight steps, which grow
+with the number of concurrent sessions. SessionArtifacts holds them zlib-compressed
+(plain text compresses about 3-4x) and decompresses a document when it is read. The
+SessionRegistry, one per server process, tracks every session's SessionArtifacts (its
+documents and its pasted inputs) and last activity: those of a session idle for
+SESSION_IDLE_SECONDS are written to SESSION_SPOOL_DIR and dropped from memory, and read
+back on the session's next rerun. Sessions Streamlit has discarded drop out of the
+registry, and their spool files are deleted.
+
+The parsed tables of the uploads are not offloaded: they are shared by every session
+using the same file (cached per file by the app, up to its max_entries), not held per
+session. The raw bytes of an uploaded file are held by Streamlit's file uploader.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+import weakref
+import zlib
+from collections.abc import MutableMapping
+
+# zlib level of the stored documents; 6 is within a few percent of 9 at a fraction of the time
+ARTIFACT_COMPRESSION_LEVEL = 6
+
+# Seconds without a rerun after which a session's documents are offloaded to disk
+SESSION_IDLE_SECONDS = int(os.getenv("PROCUREMENT_SESSION_IDLE_SECONDS", "900"))
+
+# Directory the documents of idle sessions are offloaded to
+SESSION_SPOOL_DIR = os.getenv("PROCUREMENT_SESSION_SPOOL_DIR", ".session_spool")
+
+# Interval of the registry's idle-session sweep
+SESSION_SWEEP_SECONDS = 60
+
+
+class SessionArtifacts(MutableMapping):
+    """Mapping of output key -> document text, stored compressed and offloadable to disk."""
+
+    def __init__(self, blobs=None, sizes=None):
+        self._blobs = dict(blobs or {})
+        self._sizes = dict(sizes or {})
+        self._spool_path = None
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            self._restore()
+            blob = self._blobs[key]
+        return zlib.decompress(blob).decode("utf-8")
+
+    def __setitem__(self, key, value):
+        data = value.encode("utf-8")
+        blob = zlib.compress(data, ARTIFACT_COMPRESSION_LEVEL)
+        with self._lock:
+            self._restore()
+            self._blobs[key] = blob
+            self._sizes[key] = len(data)
+
+    def __delitem__(self, key):
+        with self._lock:
+            self._restore()
+            del self._blobs[key]
+            del self._sizes[key]
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._sizes))
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def snapshot(self):
+        """Return a copy sharing the compressed documents, for the submission snapshot of a job."""
+        with self._lock:
+            self._restore()
+            return SessionArtifacts(self._blobs, self._sizes)
+
+    @property
+    def offloaded(self):
+        return self._spool_path is not None
+
+    def memory_usage(self):
+        """Return the compressed bytes held in memory and the uncompressed size of the documents."""
+        with self._lock:
+            return sum(len(blob) for blob in self._blobs.values()), sum(self._sizes.values())
+
+    def offload(self, path):
+        """Write the documents to path and drop them from memory; a no-op when already offloaded."""
+        with self._lock:
+            if self._spool_path is not None or not self._blobs:
+                return
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path + ".tmp", "w", encoding="utf-8") as spool_file:
+                json.dump({key: base64.b64encode(blob).decode("ascii") for key, blob in self._blobs.items()}, spool_file)
+            os.replace(path + ".tmp", path)
+            self._spool_path = path
+            self._blobs = {}
+
+    def _restore(self):
+        """Read the offloaded documents back into memory."""
+        if self._spool_path is None:
+            return
+        with open(self._spool_path, encoding="utf-8") as spool_file:
+            self._blobs = {key: base64.b64decode(blob) for key, blob in json.load(spool_file).items()}
+        os.remove(self._spool_path)
+        self._spool_path = None
+
+
+class SessionRegistry:
+    """Last activity of every live session, offloading the artifacts of idle sessions."""
+
+    def __init__(self, idle_seconds=SESSION_IDLE_SECONDS, spool_dir=SESSION_SPOOL_DIR,
+                 sweep_seconds=SESSION_SWEEP_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.spool_dir = spool_dir
+        self.offloads = 0
+        self._lock = threading.Lock()
+        # Session id -> (name -> weak reference to its SessionArtifacts, time of its last rerun)
+        self._sessions = {}
+        if sweep_seconds:
+            threading.Thread(target=self._sweep_loop, args=(sweep_seconds,), daemon=True,
+                             name="session-sweep").start()
+
+    def _spool_path(self, session_id, name):
+        return os.path.join(self.spool_dir, f"{session_id}.{name}.json")
+
+    def touch(self, session_id, **stores):
+        """Record a rerun of the session owning stores, name -> SessionArtifacts."""
+        with self._lock:
+            self._sessions[session_id] = ({name: weakref.ref(store) for name, store in stores.items()}, time.time())
+
+    def sweep(self, now=None):
+        """Offload the stores of idle sessions and forget the sessions Streamlit discarded."""
+        now = time.time() if now is None else now
+        with self._lock:
+            sessions = list(self._sessions.items())
+        for session_id, (store_refs, last_seen) in sessions:
+            stores = {name: store_ref() for name, store_ref in store_refs.items()}
+            if all(store is None for store in stores.values()):
+                with self._lock:
+                    self._sessions.pop(session_id, None)
+                for name in stores:
+                    if os.path.exists(self._spool_path(session_id, name)):
+                        os.remove(self._spool_path(session_id, name))
+            elif now - last_seen >= self.idle_seconds:
+                idle = [
+                    (name, store) for name, store in stores.items()
+                    if store is not None and not store.offloaded and len(store)
+                ]
+                for name, store in idle:
+                    store.offload(self._spool_path(session_id, name))
+                if idle:
+                    self.offloads += 1
+
+    def _sweep_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            self.sweep()
+
+    def stats(self):
+        """Return the live and offloaded sessions and the bytes all sessions' stores hold in memory."""
+        with self._lock:
+            sessions = [
+                [store_ref() for store_ref in store_refs.values()] for store_refs, _ in self._sessions.values()
+            ]
+        sessions = [[store for store in stores if store is not None] for stores in sessions]
+        sessions = [stores for stores in sessions if stores]
+        return {
+            "sessions": len(sessions),
+            "offloaded": sum(any(store.offloaded for store in stores) for stores in sessions),
+            "bytes": sum(store.memory_usage()[0] for stores in sessions for store in stores),
+            "offloads": self.offloads,
+        }
@@ -0,0 +1,42 @@
+"""Token streaming of chain outputs into a UI placeholder."""
+
+from langchain.callbacks.base import BaseCallbackHandler
+
+from .cache import collect_uncacheable_flags, fit_chain_inputs
+
+
+class TokenStreamHandler(BaseCallbackHandler):
+    """Callback handler that renders the tokens received so far into a placeholder.
+
+    container is anything with a text(str) method, such as a Streamlit st.empty() slot.
+    """
+
+    def __init__(self, container):
+        self.container = container
+        self.text = ""
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.text += token
+        self.container.text(self.text)
+
+
+def stream_chain(chain, inputs, container, cache=None):
+    """Run an LLMChain through the model's streaming interface, rendering tokens into container.
+
+    A cached response is rendered at once; pass cache=None to always call the model. A
+    response written by a fallback model is not cached, as in cache.run_chain.
+    """
+    inputs = fit_chain_inputs(chain, inputs)
+    key = None if cache is None else cache.make_key(chain, inputs)
+    response = None if key is None else cache.get(key)
+    if response is not None:
+        container.text(response)
+        return response
+    handler = TokenStreamHandler(container)
+    with collect_uncacheable_flags() as flags:
+        for _ in chain.llm.stream(chain.prompt.format_prompt(**inputs), config={"callbacks": [handler]}):
+            pass
+    response = handler.text
+    if key is not None and not flags:
+        cache.put(key, response)
+    return response
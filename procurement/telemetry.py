@@ -0,0 +1,236 @@
+"""Per-step latency, token and cost telemetry.
+
+Wrap a step in track(step) to record its wall time, the time before its first LLM request
+(queue time), the prompt and completion tokens of its LLM calls, their estimated cost and
+the retries. LLM calls are observed through a LangChain configure hook, so every chain run
+inside the block reports to the step's callback handler without passing callbacks around.
+Steps without LLM calls, such as parsing or vendor scoring, are timed the same way. The
+tokens the context budgets removed from the step's prompts are recorded as tokens_saved, and
+the bid table rows they left out as rows_omitted.
+
+Records are appended as JSON lines to a size-rotated log file by a background thread;
+summarize() turns them into p50/p95 latencies per step.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import logging.handlers
+import math
+import os
+import queue
+import time
+from contextlib import contextmanager
+
+TELEMETRY_PATH = os.getenv("PROCUREMENT_TELEMETRY_PATH", "telemetry/steps.jsonl")
+TELEMETRY_MAX_BYTES = 5 * 1024 * 1024
+TELEMETRY_BACKUP_COUNT = 5
+
+# USD per million (prompt, completion) tokens; update when the price list changes
+MODEL_PRICES = {
+    "gemini-3-flash-preview": (0.50, 3.00),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+
+# Callback handler of the step currently being tracked in this thread or task
+_active_handler = contextvars.ContextVar("procurement_step_telemetry", default=None)
+
+
+@functools.lru_cache(maxsize=None)
+def _telemetry_logger():
+    logger = logging.getLogger("procurement.telemetry")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    directory = os.path.dirname(TELEMETRY_PATH)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        TELEMETRY_PATH, maxBytes=TELEMETRY_MAX_BYTES, backupCount=TELEMETRY_BACKUP_COUNT
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    # The file is written by a listener thread, so recording never blocks a step or the API event loop
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    return logger
+
+
+def record(step, **fields):
+    """Append one telemetry record for step."""
+    _telemetry_logger().info(json.dumps({"step": step, "timestamp": time.time(), **fields}, default=str))
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """Return the estimated USD cost of the tokens, or None for a model without a known price."""
+    prices = MODEL_PRICES.get((model or "").split("/")[-1])
+    if prices is None:
+        return None
+    return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1e6
+
+
+@functools.lru_cache(maxsize=None)
+def _handler_class():
+    """Define the callback handler and register its configure hook on first use, importing LangChain lazily."""
+    from langchain_core.callbacks import BaseCallbackHandler
+    from langchain_core.tracers.context import register_configure_hook
+
+    class StepTelemetryHandler(BaseCallbackHandler):
+        """Accumulates the LLM calls made while one step is tracked."""
+
+        def __init__(self):
+            self.first_request_at = None
+            self.model = None
+            self.llm_calls = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+            self.retries = 0
+            self.errors = 0
+            self.tokens_saved = 0
+            self.rows_omitted = 0
+
+        def on_llm_start(self, serialized, prompts, **kwargs):
+            self._start(kwargs)
+
+        def on_chat_model_start(self, serialized, messages, **kwargs):
+            self._start(kwargs)
+
+        def _start(self, kwargs):
+            if self.first_request_at is None:
+                self.first_request_at = time.perf_counter()
+            self.llm_calls += 1
+            invocation_params = kwargs.get("invocation_params") or {}
+            self.model = invocation_params.get("model") or invocation_params.get("model_name") or self.model
+
+        def on_llm_end(self, response, **kwargs):
+            prompt_tokens, completion_tokens = 0, 0
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                    if usage:
+                        prompt_tokens += usage.get("input_tokens", 0)
+                        completion_tokens += usage.get("output_tokens", 0)
+            if not prompt_tokens and not completion_tokens:
+                usage = (response.llm_output or {}).get("token_usage") or {}
+                prompt_tokens = usage.get("prompt_tokens", 0)
+                completion_tokens = usage.get("completion_tokens", 0)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+        def on_llm_error(self, error, **kwargs):
+            self.errors += 1
+
+        def on_retry(self, retry_state, **kwargs):
+            self.retries += 1
+
+    register_configure_hook(_active_handler, inheritable=True)
+    return StepTelemetryHandler
+
+
+def add_tokens_saved(tokens, rows_omitted=0):
+    """Add tokens, and table rows, removed from a prompt by the context budgets to the step being tracked."""
+    handler = _active_handler.get()
+    if handler is not None:
+        handler.tokens_saved += tokens
+        handler.rows_omitted += rows_omitted
+
+
+@contextmanager
+def track(step, **fields):
+    """Record the wall time, queue time, tokens, cost and retries of the work done in the block.
+
+    Extra fields are added to the record as they are.
+    """
+    handler = _handler_class()()
+    token = _active_handler.set(handler)
+    started_at = time.perf_counter()
+    status = "error"
+    try:
+        yield handler
+        status = "ok"
+    finally:
+        _active_handler.reset(token)
+        finished_at = time.perf_counter()
+        queue_time = None if handler.first_request_at is None else handler.first_request_at - started_at
+        record(
+            step,
+            status=status,
+            wall_time=finished_at - started_at,
+            queue_time=queue_time,
+            llm_calls=handler.llm_calls,
+            model=handler.model,
+            prompt_tokens=handler.prompt_tokens,
+            completion_tokens=handler.completion_tokens,
+            cost=estimate_cost(handler.model, handler.prompt_tokens, handler.completion_tokens),
+            retries=handler.retries,
+            errors=handler.errors,
+            tokens_saved=handler.tokens_saved,
+            rows_omitted=handler.rows_omitted,
+            **fields
+        )
+
+
+def _log_files(path):
+    """The current and rotated telemetry files, oldest first."""
+    return [f"{path}.{index}" if index else path for index in range(TELEMETRY_BACKUP_COUNT, -1, -1)]
+
+
+def log_state(path=TELEMETRY_PATH):
+    """Return the modification time and size of every telemetry file, which change with any new record."""
+    state = []
+    for file_path in _log_files(path):
+        if os.path.exists(file_path):
+            stat = os.stat(file_path)
+            state.append((file_path, stat.st_mtime_ns, stat.st_size))
+    return tuple(state)
+
+
+def load_records(path=TELEMETRY_PATH):
+    """Read the records of the current and the rotated telemetry files, oldest first."""
+    records = []
+    for file_path in _log_files(path):
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding="utf-8") as telemetry_file:
+            for line in telemetry_file:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return records
+
+
+def _percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return sorted_values[max(1, math.ceil(fraction * len(sorted_values))) - 1]
+
+
+def summarize(records):
+    """Return one row per step with its run count, p50/p95 wall time, mean tokens, mean tokens saved, bid rows omitted, fallbacks and total cost.
+
+    The routing:<prompt> records of routing.py summarize each model route the same way.
+    """
+    steps = {}
+    for entry in records:
+        steps.setdefault(entry["step"], []).append(entry)
+    rows = []
+    for step, entries in steps.items():
+        wall_times = sorted(entry["wall_time"] for entry in entries)
+        rows.append({
+            "step": step,
+            "runs": len(entries),
+            "p50_s": round(_percentile(wall_times, 0.50), 3),
+            "p95_s": round(_percentile(wall_times, 0.95), 3),
+            "mean_tokens": round(sum(
+                entry.get("prompt_tokens", 0) + entry.get("completion_tokens", 0) for entry in entries
+            ) / len(entries)),
+            "mean_tokens_saved": round(sum(entry.get("tokens_saved", 0) for entry in entries) / len(entries)),
+            "rows_omitted": sum(entry.get("rows_omitted", 0) for entry in entries),
+            "retries": sum(entry.get("retries", 0) for entry in entries),
+            "fallbacks": sum(bool(entry.get("fallback")) for entry in entries),
+            "cost_usd": round(sum(entry.get("cost") or 0 for entry in entries), 4),
+        })
+    return rows
@@ -0,0 +1,101 @@
+"""Resolution of the vendor names returned by the LLM to the names of the vendor history.
+
+The LLM does not always copy vendor names verbatim ("ACME Corporation" for "Acme Corp"),
+and an exact comparison silently drops such vendors from the shortlist. Names are
+normalized (case, punctuation, spacing and legal-form suffixes) and looked up in a dict;
+the names still unmatched are compared with a character trigram index, built once per
+vendor history, against the few vendors sharing the name's rarest trigrams. Names that
+match no vendor closely enough are reported instead of dropped.
+"""
+
+import re
+from collections import Counter, defaultdict
+
+# Legal-form words ignored at the end of a vendor name
+LEGAL_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "llc",
+    "llp", "plc", "gmbh", "ag", "sa", "bv", "nv", "pty", "pvt", "srl", "spa",
+}
+
+# Minimum Dice similarity of the trigrams of a fuzzy match
+FUZZY_MATCH_THRESHOLD = 0.7
+
+# Rarest trigrams of a name whose vendors are candidates, and candidates compared in full
+FUZZY_CANDIDATE_GRAMS = 4
+FUZZY_MAX_CANDIDATES = 20
+
+# Trigrams shared by more vendors than this (e.g. " ve" in "Vendor 00012") do not tell
+# vendors apart and are not used to find candidates, which bounds the lookup time
+FUZZY_MAX_POSTINGS = 1000
+
+
+def normalize_vendor_name(name):
+    """Lower-case a vendor name, reduce punctuation and spacing to single spaces and drop legal-form suffixes."""
+    tokens = re.findall(r"[a-z0-9]+", str(name).lower())
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def _trigrams(key):
+    padded = f" {key} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+
+class VendorNameIndex:
+    """Normalized-name dict and trigram index over the canonical vendor names."""
+
+    def __init__(self, vendor_names):
+        self.canonical = {}
+        for name in vendor_names:
+            self.canonical.setdefault(normalize_vendor_name(name), str(name))
+        self._keys = list(self.canonical)
+        postings = defaultdict(list)
+        for key_id, key in enumerate(self._keys):
+            for gram in _trigrams(key):
+                postings[gram].append(key_id)
+        self._postings = dict(postings)
+
+    def resolve(self, name):
+        """Return the canonical vendor name matching name, or None when no vendor is close enough."""
+        key = normalize_vendor_name(name)
+        if not key:
+            return None
+        if key in self.canonical:
+            return self.canonical[key]
+        grams = _trigrams(key)
+        rarest = sorted((
+            self._postings[gram] for gram in grams
+            if gram in self._postings and len(self._postings[gram]) <= FUZZY_MAX_POSTINGS
+        ), key=len)
+        candidates = Counter()
+        for posting in rarest[:FUZZY_CANDIDATE_GRAMS]:
+            candidates.update(posting)
+        # Names differing in a number ("Vendor 12" and "Vendor 13") are different vendors
+        numbers = re.findall(r"\d+", key)
+        best, best_score = None, 0.0
+        for key_id, _ in candidates.most_common(FUZZY_MAX_CANDIDATES):
+            candidate = self._keys[key_id]
+            if re.findall(r"\d+", candidate) != numbers:
+                continue
+            candidate_grams = _trigrams(candidate)
+            score = 2 * len(grams & candidate_grams) / (len(grams) + len(candidate_grams))
+            if score >= FUZZY_MATCH_THRESHOLD and score > best_score:
+                best, best_score = candidate, score
+        return self.canonical[best] if best is not None else None
+
+    def resolve_all(self, vendor_names):
+        """Resolve vendor_names; return the canonical names, without duplicates, and the unresolved names."""
+        resolved = []
+        unresolved = []
+        for name in vendor_names:
+            if not str(name).strip():
+                continue
+            canonical = self.resolve(name)
+            if canonical is None:
+                unresolved.append(name)
+            elif canonical not in resolved:
+                resolved.append(canonical)
+        return resolved, unresolved
@@ -0,0 +1,178 @@
+"""Persistent vendor performance store for Step 2.
+
+New performance records arrive daily, and re-aggregating the whole history on every
+shortlist grows with its size. The store keeps, per vendor and per history column, the
+running sum and count of the records ingested so far in SQLite:
+
+- ingesting a CSV adds its per-vendor sums and counts to the stored ones (append-only),
+  in time proportional to the new records; a file that was already ingested is skipped;
+- looking up the scores of the vendors returned by the LLM reads only their rows by
+  primary key, and the averages and composite score come from sum / count;
+- the names of the stored vendors resolve the LLM's spelling of the names, so Step 2
+  runs from the store alone, without an uploaded history.
+
+The scores are the same as build_vendor_score_index on the concatenation of every
+ingested file.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from .scoring import VENDOR_SCORE_WEIGHTS, score_table
+from .vendor_names import VendorNameIndex
+
+# History column -> prefix of its running sum and count columns in the store
+VENDOR_STORE_COLUMNS = {
+    "Delivery_punctuality": "delivery",
+    "Quality_of_goods": "quality",
+    "Contract_term_compliance": "contract",
+}
+
+# SQLite's default limit on the parameters of one statement is 999
+LOOKUP_BATCH_SIZE = 500
+
+
+class VendorStore:
+    """SQLite store of per-vendor running sums and counts of the performance history."""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        # (version, VendorNameIndex) of the stored vendor names, rebuilt after an ingest
+        self._name_index = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vendor_scores (vendor_name TEXT PRIMARY KEY, "
+            + ", ".join(
+                f"{prefix}_sum REAL NOT NULL, {prefix}_count INTEGER NOT NULL"
+                for prefix in VENDOR_STORE_COLUMNS.values()
+            )
+            + ", records INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vendor_sources ("
+            "fingerprint TEXT PRIMARY KEY, records INTEGER NOT NULL, ingested_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def ingest(self, df, source_fingerprint):
+        """Add the performance records of df to the store; return the number of records added.
+
+        source_fingerprint identifies the file (see inputs.fingerprint); a file that was
+        already ingested adds nothing and returns 0. Raises KeyError when df lacks
+        'Vendor_name' or one of the history columns.
+        """
+        import pandas as pd
+
+        grouped = df.groupby('Vendor_name', sort=False, observed=True)
+        sums = grouped[list(VENDOR_STORE_COLUMNS)].sum(min_count=1).fillna(0.0)
+        counts = grouped[list(VENDOR_STORE_COLUMNS)].count()
+        columns = [f"{prefix}_{kind}" for prefix in VENDOR_STORE_COLUMNS.values() for kind in ("sum", "count")]
+        totals = pd.DataFrame({
+            f"{prefix}_{kind}": (sums if kind == "sum" else counts)[column]
+            for column, prefix in VENDOR_STORE_COLUMNS.items() for kind in ("sum", "count")
+        })
+        totals["records"] = grouped.size()
+        totals["updated_at"] = now = time.time()
+        rows = list(zip(
+            totals.index.astype(str),
+            *(totals[column].tolist() for column in [*columns, "records", "updated_at"])
+        ))
+        with self._lock:
+            if self._conn.execute(
+                "SELECT 1 FROM vendor_sources WHERE fingerprint = ?", (source_fingerprint,)
+            ).fetchone():
+                return 0
+            self._conn.executemany(
+                f"INSERT INTO vendor_scores (vendor_name, {', '.join(columns)}, records, updated_at) "
+                f"VALUES ({', '.join('?' * (len(columns) + 3))}) "
+                "ON CONFLICT (vendor_name) DO UPDATE SET "
+                + ", ".join(f"{column} = {column} + excluded.{column}" for column in columns)
+                + ", records = records + excluded.records, updated_at = excluded.updated_at",
+                rows
+            )
+            self._conn.execute(
+                "INSERT INTO vendor_sources (fingerprint, records, ingested_at) VALUES (?, ?, ?)",
+                (source_fingerprint, len(df), now)
+            )
+            self._conn.commit()
+        return len(df)
+
+    def _averages(self, vendor_names=None):
+        """Return the per-vendor averages of the history columns, of every stored vendor by default."""
+        import pandas as pd
+
+        columns = [f"{prefix}_{kind}" for prefix in VENDOR_STORE_COLUMNS.values() for kind in ("sum", "count")]
+        rows = []
+        with self._lock:
+            if vendor_names is None:
+                rows.extend(self._conn.execute(
+                    f"SELECT vendor_name, {', '.join(columns)} FROM vendor_scores ORDER BY vendor_name"
+                ))
+            else:
+                vendor_names = list(dict.fromkeys(vendor_names))
+                for start in range(0, len(vendor_names), LOOKUP_BATCH_SIZE):
+                    batch = vendor_names[start:start + LOOKUP_BATCH_SIZE]
+                    rows.extend(self._conn.execute(
+                        f"SELECT vendor_name, {', '.join(columns)} FROM vendor_scores "
+                        f"WHERE vendor_name IN ({', '.join('?' * len(batch))})",
+                        batch
+                    ))
+        totals = pd.DataFrame(rows, columns=["Vendor_name", *columns]).set_index("Vendor_name").astype(float)
+        # A column without any value averages to NaN, as the mean of an empty group does
+        return pd.DataFrame({
+            column: totals[f"{prefix}_sum"] / totals[f"{prefix}_count"].where(totals[f"{prefix}_count"] > 0)
+            for column, prefix in VENDOR_STORE_COLUMNS.items()
+        }, index=totals.index)
+
+    def score_index(self, vendor_names, weights=VENDOR_SCORE_WEIGHTS):
+        """Return the score table of the given vendors, in the format of build_vendor_score_index.
+
+        Vendors the store has no records of are left out.
+        """
+        return score_table(self._averages(vendor_names), weights)
+
+    def history_csv(self):
+        """Return the per-vendor averages of every stored vendor as CSV text.
+
+        Stands in for the history rows in the Step 2 prompt when no history was uploaded.
+        """
+        return self._averages().reset_index().to_csv(index=False)
+
+    def name_index(self):
+        """Return the VendorNameIndex of the stored vendor names, rebuilt only after an ingest."""
+        version = self.version()
+        cached = self._name_index
+        if cached is None or cached[0] != version:
+            with self._lock:
+                names = [name for name, in self._conn.execute("SELECT vendor_name FROM vendor_scores")]
+            cached = self._name_index = (version, VendorNameIndex(names))
+        return cached[1]
+
+    def version(self):
+        """Return a string that changes whenever records are ingested, for staleness tracking."""
+        with self._lock:
+            count, last = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(ingested_at), 0) FROM vendor_sources"
+            ).fetchone()
+        return f"{count}:{last}"
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM vendor_scores")
+            self._conn.execute("DELETE FROM vendor_sources")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            vendors, = self._conn.execute("SELECT COUNT(*) FROM vendor_scores").fetchone()
+            sources, records = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(records), 0) FROM vendor_sources"
+            ).fetchone()
+        return {"vendors": vendors, "records": records, "sources": sources}
+
+
+def create_vendor_store():
+    """Create the vendor store at the VENDOR_STORE_PATH environment variable."""
+    return VendorStore(os.getenv("VENDOR_STORE_PATH", ".vendor_store.sqlite3"))
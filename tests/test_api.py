@@ -0,0 +1,80 @@
+"""Tests of the headless API against the simulated LLM."""
+
+import asyncio
+import io
+import os
+import tempfile
+import threading
+import time
+
+_tmp = tempfile.mkdtemp()
+os.environ["PROCUREMENT_FAKE_LLM"] = "1"
+os.environ["LLM_CACHE_BYPASS"] = "1"
+os.environ["LLM_CACHE_PATH"] = os.path.join(_tmp, "llm_cache.sqlite3")
+os.environ["PRIOR_RUNS_PATH"] = os.path.join(_tmp, "prior_runs.sqlite3")
+os.environ["PROCUREMENT_TELEMETRY_PATH"] = os.path.join(_tmp, "steps.jsonl")
+os.environ["VENDOR_STORE_PATH"] = os.path.join(_tmp, "vendor_store.sqlite3")
+
+import httpx  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from procurement import api, pipeline  # noqa: E402
+
+VENDOR_HISTORY = (
+    "Vendor_name,Delivery_punctuality,Quality_of_goods,Contract_term_compliance\n"
+    "Vendor A,8,9,7\nVendor B,6,7,9\n"
+)
+
+
+def test_slow_step_does_not_block_health(monkeypatch):
+    """A step's blocking local work runs in a worker thread while /health answers."""
+    retrieve_vendor_history = pipeline.retrieve_vendor_history
+    retrieving, retrieved = threading.Event(), threading.Event()
+
+    def slow_retrieve_vendor_history(*args):
+        retrieving.set()
+        time.sleep(1.0)
+        retrieved.set()
+        return retrieve_vendor_history(*args)
+
+    monkeypatch.setattr(pipeline, "retrieve_vendor_history", slow_retrieve_vendor_history)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            shortlist = asyncio.create_task(client.post(
+                "/steps/vendor-shortlist",
+                data={"tech_req_doc": "Industrial pumps"},
+                files={"vendor_history": ("vendor_history.csv", VENDOR_HISTORY.encode("utf-8"))},
+            ))
+            await asyncio.wait_for(asyncio.to_thread(retrieving.wait), 30)
+            health = await client.get("/health")
+            # /health answered while the step was still in its slow local work
+            answered_during_step = not retrieved.is_set()
+            return await shortlist, health, answered_during_step
+
+    shortlist, health, answered_during_step = asyncio.run(scenario())
+    assert health.status_code == 200
+    assert shortlist.status_code == 200
+    assert answered_during_step
+
+
+def test_vendor_shortlist_from_store_without_upload():
+    """With use_vendor_store the history upload is optional and names resolve against the store."""
+    store = api.get_vendor_store()
+    store.ingest(pd.read_csv(io.StringIO(VENDOR_HISTORY)), "vendor-history-fingerprint")
+    assert store.name_index().resolve("vendor a") == "Vendor A"
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            from_store = await client.post(
+                "/steps/vendor-shortlist", data={"tech_req_doc": "Industrial pumps", "use_vendor_store": "true"}
+            )
+            without_history = await client.post("/steps/vendor-shortlist", data={"tech_req_doc": "Industrial pumps"})
+            return from_store, without_history
+
+    from_store, without_history = asyncio.run(scenario())
+    assert from_store.status_code == 200
+    assert "shortlisted_vendors" in from_store.json()
+    assert without_history.status_code == 422
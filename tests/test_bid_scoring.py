@@ -0,0 +1,83 @@
+"""Tests of the local bid scoring of Step 5 on small hand-computed tables."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from procurement.bid_scoring import _normalize, find_criteria_columns, pareto_front, rank_bids, score_bids
+
+# Vendor C is dominated by A and B; A and D tie on every criterion, so neither dominates the other
+BIDS = pd.DataFrame({
+    "Vendor_name": ["Vendor A", "Vendor B", "Vendor C", "Vendor D"],
+    "Bid_price": [100, 200, 200, 100],
+    "Quality_rating": [8, 9, 7, 8],
+    "Delivery_days": [10, 5, 10, 10],
+})
+
+
+def test_criteria_columns_are_found_by_keyword():
+    bids = pd.DataFrame({
+        "Vendor_name": ["Vendor A"],
+        "Price_currency": ["USD"],
+        "Total_cost": [100],
+        "Quality_rating": [8],
+        "Delivery_rating": [4],
+        "Technical_capability": [3],
+        "Notes": ["fast"],
+    })
+
+    assert find_criteria_columns(bids) == {
+        # The text column matching "price" is skipped for the first numeric one
+        "price": ("Total_cost", False),
+        "quality": ("Quality_rating", True),
+        "delivery": ("Delivery_rating", True),
+        "technology": ("Technical_capability", True),
+    }
+    assert find_criteria_columns(BIDS)["delivery"] == ("Delivery_days", False)
+    assert find_criteria_columns(pd.DataFrame({"Vendor_name": ["Vendor A"], "Notes": ["fast"]})) == {}
+
+
+def test_normalization():
+    # Price: lowest price / price
+    assert _normalize(pd.Series([100.0, 200.0, 400.0]), "price", False).tolist() == [1.0, 0.5, 0.25]
+    # Min-max, inverted when lower is better, and missing values scoring 0
+    assert _normalize(pd.Series([7.0, 8.0, 9.0]), "quality", True).tolist() == [0.0, 0.5, 1.0]
+    assert _normalize(pd.Series([5.0, 10.0, np.nan]), "delivery", False).tolist() == [1.0, 0.0, 0.0]
+    # A column where every bid is equal gives every bid the full score instead of dividing by zero
+    assert _normalize(pd.Series([3.0, 3.0, 3.0]), "technology", True).tolist() == [1.0, 1.0, 1.0]
+    assert _normalize(pd.Series([50.0, 50.0]), "price", False).tolist() == [1.0, 1.0]
+
+
+def test_pareto_front_keeps_ties_and_drops_dominated_rows():
+    values = [[1.0, 0.5, 0.0], [0.5, 1.0, 1.0], [0.5, 0.0, 0.0], [1.0, 0.5, 0.0]]
+
+    assert pareto_front(values).tolist() == [True, True, False, True]
+    # Chunks smaller than the table compare each row against all rows all the same
+    assert pareto_front(values, chunk_rows=1).tolist() == [True, True, False, True]
+
+
+def test_chunked_pareto_front_matches_a_single_chunk():
+    values = np.random.default_rng(0).integers(0, 5, size=(300, 3)).astype(float)
+
+    assert (pareto_front(values, chunk_rows=7) == pareto_front(values, chunk_rows=len(values))).all()
+
+
+def test_score_bids_ranks_pareto_front_first_then_score():
+    ranked = score_bids(BIDS)
+
+    assert ranked.attrs["criteria"] == ["price", "quality", "delivery"]
+    # Ties keep the file order: Vendor A before Vendor D
+    assert ranked["Vendor_name"].tolist() == ["Vendor B", "Vendor A", "Vendor D", "Vendor C"]
+    assert ranked["pareto_optimal"].tolist() == [True, True, True, False]
+    # Weights 0.40, 0.25 and 0.20 of the three criteria found, renormalized by their sum 0.85
+    assert ranked["score"].tolist() == pytest.approx([0.65 / 0.85, 0.525 / 0.85, 0.525 / 0.85, 0.2 / 0.85])
+
+
+def test_rank_bids_lists_the_top_bids_in_order():
+    ranking = rank_bids(BIDS.to_csv(index=False))
+
+    assert "4 bids scored, 3 on the Pareto front" in ranking
+    assert ranking.index("1. Vendor B - score 0.765 (Pareto-optimal)") < ranking.index("2. Vendor A - score 0.618")
+    assert "Vendor D" not in ranking
+    assert rank_bids("Vendor_name,Notes\nVendor A,fast\n") is None
+    assert rank_bids("Vendor_name,Bid_price\n") is None
@@ -0,0 +1,51 @@
+"""Tests of the context budgets."""
+
+from procurement.context import (
+    CHARS_PER_TOKEN, CONTEXT_BUDGETS, estimate_tokens, fit_inputs, fit_table_to_budget, fit_to_budget
+)
+
+
+def test_keyword_section_kept_whole_before_compacted_sections():
+    """With many sections, the stubs of the others are dropped before a keyword section is cut."""
+    sections = [
+        f"SECTION {number}\n" + f"Requirement {number} of the tender, described at length. " * 80 + "\n"
+        for number in range(1, 30)
+    ]
+    document = "".join(sections)
+    section_5 = sections[4]
+    assert len(section_5) < 2000 * CHARS_PER_TOKEN < len(document)
+
+    fitted = fit_to_budget(document, 2000, keywords=["section 5"])
+
+    assert section_5 in fitted
+    assert len(fitted) <= 2000 * CHARS_PER_TOKEN
+
+
+def test_bid_table_cut_by_whole_rows():
+    """A CSV of bids is not split at its all-caps rows; the rows left out are noted."""
+    rows = [f"ACME {number},{100 + number},{number % 30} days\n" for number in range(2000)]
+    table = "Vendor_name,Price,Delivery\n" + "".join(rows)
+
+    fitted, _, rows_omitted = fit_inputs("bid_evaluation", {"bids_data": table})
+    kept = fitted["bids_data"].split("\n\n")[0].splitlines()
+
+    assert kept[0] == "Vendor_name,Price,Delivery"
+    assert kept[1:] == [row.rstrip("\n") for row in rows[:len(kept) - 1]]
+    assert rows_omitted == len(rows) - (len(kept) - 1) > 0
+    assert fitted["bids_data"].endswith(f"[{rows_omitted} row(s) omitted to fit the context budget]")
+    assert estimate_tokens(fitted["bids_data"]) <= CONTEXT_BUDGETS["bid_evaluation"]["bids_data"]
+
+
+def test_table_without_room_for_rows_is_cut_without_a_zero_row_note():
+    """A one-line table is cut like text, and a header longer than the budget is cut before the note."""
+    header = ",".join(f"Criterion_{number}" for number in range(2000))
+
+    fitted, omitted = fit_table_to_budget(header, 100)
+    assert omitted == 0
+    assert "omitted" not in fitted
+    assert estimate_tokens(fitted) <= 100
+
+    fitted, omitted = fit_table_to_budget(header + "\nACME,1\nGLOBEX,2\n", 100)
+    assert omitted == 2
+    assert fitted.endswith("[2 row(s) omitted to fit the context budget]")
+    assert estimate_tokens(fitted) <= 100
@@ -0,0 +1,102 @@
+"""Tests of the splitting of the fused Steps 6-8 response and of its fallback."""
+
+from procurement.fused_steps import FUSED_SECTIONS, run_fused_steps, split_fused_output
+
+
+def fused_response(*sections):
+    """A response with one "===== <title> =====" marker line and body per (title, body) pair."""
+    return "\n".join(f"===== {title} =====\n{body}" for title, body in sections)
+
+
+COMPLETE = fused_response(
+    ("NEGOTIATION STRATEGY", "Open at 90% of the bid price."),
+    ("RISK ASSESSMENT", "Delivery delays are the main risk."),
+    ("CONTRACT DOCUMENT", "1. Parties. 2. Scope."),
+)
+
+
+def test_complete_response_is_split_into_the_three_steps():
+    assert split_fused_output("Here are the documents.\n" + COMPLETE) == {
+        "negotiation_strategy": "Open at 90% of the bid price.",
+        "risk_assessment": "Delivery delays are the main risk.",
+        "contract_doc": "1. Parties. 2. Scope.",
+    }
+    # Markdown emphasis, other case and another number of '=' around the titles
+    assert split_fused_output(COMPLETE.replace("===== RISK ASSESSMENT =====", "**== Risk Assessment ===**")) == \
+        split_fused_output(COMPLETE)
+
+
+def test_missing_markers_keep_only_the_leading_sections():
+    assert split_fused_output("No markers at all.") == {}
+    assert split_fused_output(fused_response(
+        ("NEGOTIATION STRATEGY", "Open at 90%."),
+        ("CONTRACT DOCUMENT", "1. Parties."),
+    )) == {}
+    # The last section runs to the end of the response
+    assert split_fused_output(fused_response(
+        ("NEGOTIATION STRATEGY", "Open at 90%."),
+        ("RISK ASSESSMENT", "Delays."),
+    )) == {"negotiation_strategy": "Open at 90%.", "risk_assessment": "Delays."}
+    # A marker without text counts as missing
+    assert split_fused_output(fused_response(
+        ("NEGOTIATION STRATEGY", "Open at 90%."),
+        ("RISK ASSESSMENT", ""),
+        ("CONTRACT DOCUMENT", "1. Parties."),
+    )) == {"negotiation_strategy": "Open at 90%."}
+
+
+def test_duplicated_markers_drop_the_sections_they_may_cut_short():
+    # The model restarted the negotiation strategy: the first one may be incomplete
+    assert split_fused_output(fused_response(
+        ("NEGOTIATION STRATEGY", "Open at"),
+        ("NEGOTIATION STRATEGY", "Open at 90%."),
+        ("RISK ASSESSMENT", "Delays."),
+        ("CONTRACT DOCUMENT", "1. Parties."),
+    )) == {}
+    assert split_fused_output(fused_response(
+        ("NEGOTIATION STRATEGY", "Open at 90%."),
+        ("RISK ASSESSMENT", "Delays."),
+        ("CONTRACT DOCUMENT", "1. Part"),
+        ("CONTRACT DOCUMENT", "1. Parties."),
+    )) == {"negotiation_strategy": "Open at 90%.", "risk_assessment": "Delays."}
+
+
+def test_reordered_markers_fall_back_from_the_first_one_out_of_order():
+    assert split_fused_output(fused_response(
+        ("RISK ASSESSMENT", "Delays."),
+        ("NEGOTIATION STRATEGY", "Open at 90%."),
+        ("CONTRACT DOCUMENT", "1. Parties."),
+    )) == {}
+    assert split_fused_output(fused_response(
+        ("NEGOTIATION STRATEGY", "Open at 90%."),
+        ("RISK ASSESSMENT", "Delays."),
+        ("NEGOTIATION STRATEGY", "Revised: open at 85%."),
+        ("CONTRACT DOCUMENT", "1. Parties."),
+    )) == {"negotiation_strategy": "Open at 90%."}
+
+
+def test_run_fused_steps_generates_the_dropped_sections_with_their_chains():
+    calls = []
+
+    def generate(chain, inputs):
+        calls.append((chain, inputs))
+        if chain == "negotiation_risk_contract":
+            return fused_response(
+                ("NEGOTIATION STRATEGY", "Open at 90%."),
+                ("RISK ASSESSMENT", "Del"),
+                ("RISK ASSESSMENT", "Delays."),
+                ("CONTRACT DOCUMENT", "1. Parties."),
+            )
+        return f"{chain} from its own chain"
+
+    chains = {key: key for key in [*FUSED_SECTIONS, "negotiation_risk_contract"]}
+    outputs = run_fused_steps(chains, "Bid A is best", "Bid A, Bid B", generate)
+
+    assert outputs == {
+        "negotiation_strategy": "Open at 90%.",
+        "risk_assessment": "risk_assessment from its own chain",
+        "contract_doc": "contract_doc from its own chain",
+    }
+    # Each fallback step is based on the sections kept or generated before it
+    assert calls[1] == ("risk_assessment", {"negotiation_strategy": "Open at 90%.", "bid_data": "Bid A, Bid B"})
+    assert calls[2] == ("contract_doc", {"risk_assessment": "risk_assessment from its own chain"})
@@ -0,0 +1,96 @@
+"""Tests of the similarity index of earlier runs."""
+
+from procurement import prior_runs
+from procurement.prior_runs import VECTOR_CACHE_ENTRIES, PriorRunIndex
+
+PUMPS = (
+    "Supply of twelve industrial centrifugal pumps for the cooling water circuit of plant 3, "
+    "with stainless steel impellers, installation, commissioning and a two year maintenance contract."
+)
+PUMPS_RETENDER = PUMPS.replace("twelve", "fourteen").replace("two year", "three year")
+LAPTOPS = (
+    "Purchase of 300 business laptops with docking stations, three year on-site warranty "
+    "and disk encryption for the finance and sales departments."
+)
+CATERING = "Catering services for the head office canteen, five days a week, including vegetarian options."
+
+
+def create_index(tmp_path, **kwargs):
+    return PriorRunIndex(str(tmp_path / "prior_runs.sqlite3"), **kwargs)
+
+
+def test_near_duplicate_tender_ranks_first(tmp_path):
+    index = create_index(tmp_path)
+    index.record(LAPTOPS, tech_req_doc="laptop specs")
+    index.record(PUMPS, tech_req_doc="pump specs", tender_doc="pump tender")
+    index.record(CATERING, tech_req_doc="catering specs")
+
+    run = index.find_similar(PUMPS_RETENDER)
+
+    assert run["business_req"] == PUMPS
+    assert run["tech_req_doc"] == "pump specs" and run["tender_doc"] == "pump tender"
+    assert run["similarity"] >= prior_runs.SIMILAR_RUN_THRESHOLD
+    # The same document is answered by the response cache, and unrelated ones are not offered
+    assert index.find_similar(PUMPS) is None
+    assert index.find_similar("Annual audit of the pension fund accounts.") is None
+
+
+def test_new_run_is_found_and_bumps_the_version(tmp_path):
+    index = create_index(tmp_path)
+    index.record(LAPTOPS, tech_req_doc="laptop specs")
+    version = index.version
+    # A lookup made before the run is stored, as the app memoizes it on the version
+    assert index.find_similar(PUMPS_RETENDER) is None
+
+    index.record(PUMPS, tech_req_doc="pump specs")
+
+    assert index.version > version
+    assert index.find_similar(PUMPS_RETENDER)["business_req"] == PUMPS
+    # Recording Step 3 of the same run updates it in place
+    version = index.version
+    index.record(PUMPS, tender_doc="pump tender")
+    assert index.version > version
+    assert index.stats()["runs"] == 2
+    assert index.find_similar(PUMPS_RETENDER)["tender_doc"] == "pump tender"
+
+    version = index.version
+    index.clear()
+    assert index.version > version
+    assert index.find_similar(PUMPS_RETENDER) is None
+
+
+def test_evicted_runs_leave_the_matrix(tmp_path):
+    index = create_index(tmp_path, max_entries=2)
+    index.record(PUMPS, tech_req_doc="pump specs")
+    index.record(LAPTOPS, tech_req_doc="laptop specs")
+    index.record(CATERING, tech_req_doc="catering specs")
+
+    assert index.stats()["runs"] == 2
+    assert index.find_similar(PUMPS_RETENDER) is None
+    # The matrix rebuilt from the store holds the same runs
+    assert create_index(tmp_path).stats() == index.stats()
+
+
+def test_vector_cache_reuses_and_bounds_the_vectors(tmp_path, monkeypatch):
+    calls = []
+    hashed_ngram_vector = prior_runs.hashed_ngram_vector
+
+    def counting_hashed_ngram_vector(text):
+        calls.append(text)
+        return hashed_ngram_vector(text)
+
+    monkeypatch.setattr(prior_runs, "hashed_ngram_vector", counting_hashed_ngram_vector)
+    index = create_index(tmp_path)
+
+    # The lookup and the records of Steps 1 and 3 of one document vectorize it once
+    index.find_similar(PUMPS)
+    index.record(PUMPS, tech_req_doc="pump specs")
+    index.record(PUMPS, tender_doc="pump tender")
+    assert calls == [PUMPS]
+
+    for number in range(VECTOR_CACHE_ENTRIES):
+        index.find_similar(f"{CATERING} Lot {number}.")
+    assert len(index._vectors) == VECTOR_CACHE_ENTRIES
+    # The least recently used vector was evicted and is computed again
+    index.find_similar(PUMPS)
+    assert calls.count(PUMPS) == 2
@@ -0,0 +1,91 @@
+"""Tests of the rate limiter against the simulated LLM and its request quota."""
+
+import asyncio
+import time
+
+from procurement.fake_llm import SimulatedChatModel, SimulatedRateLimitError
+from procurement.rate_limit import AdaptiveConcurrency, RateLimiter, TokenBucket, backoff_delay, rate_limited
+
+
+def create_limiter(max_concurrency=4):
+    # Quota and token limits well above the test's calls, and short backoffs
+    return RateLimiter(requests_per_minute=60000, tokens_per_minute=1e9, max_concurrency=max_concurrency,
+                       max_retries=20, backoff_base=0.01, backoff_cap=0.05)
+
+
+def throttled_llm(limiter):
+    """A model answering 429 beyond 2 requests per 0.2 seconds, wrapped in limiter."""
+    return rate_limited(SimulatedChatModel(default_response="ok", quota_requests=2, quota_window=0.2), limiter)
+
+
+def test_throttled_calls_are_retried_until_they_succeed():
+    limiter = create_limiter()
+    llm = throttled_llm(limiter)
+
+    answers = [llm.invoke("Shortlist the vendors").content for _ in range(5)]
+
+    assert answers == ["ok"] * 5
+    assert limiter.throttled > 0
+    assert limiter.retries == limiter.throttled
+    assert limiter.calls == 5 + limiter.retries
+
+
+def test_async_throttled_calls_are_retried_until_they_succeed():
+    limiter = create_limiter()
+    llm = throttled_llm(limiter)
+
+    async def run():
+        return await asyncio.gather(*(llm.ainvoke(f"Bid {number}") for number in range(6)))
+
+    assert [answer.content for answer in asyncio.run(run())] == ["ok"] * 6
+    assert limiter.throttled > 0
+    assert limiter.concurrency.in_flight == 0
+
+
+def test_concurrency_shrinks_on_throttling_and_grows_back():
+    concurrency = AdaptiveConcurrency(max_limit=8)
+    concurrency.acquire()
+    concurrency.release(throttled=True)
+    assert concurrency.limit == 4
+
+    limits = []
+    for _ in range(40):
+        concurrency.acquire()
+        concurrency.release()
+        limits.append(concurrency.limit)
+
+    # Additive growth: about one more slot per limit's worth of successful calls, capped at the maximum
+    assert limits == sorted(limits)
+    assert 5 <= limits[4] < 6
+    assert limits[-1] == 8
+
+
+def test_throttled_limiter_shrinks_its_concurrency():
+    limiter = create_limiter(max_concurrency=8)
+    llm = throttled_llm(limiter)
+
+    for _ in range(4):
+        llm.invoke("Evaluate the bids")
+
+    assert limiter.throttled > 0
+    assert limiter.concurrency.limit < 8
+
+
+def test_bucket_never_exceeds_its_rate():
+    bucket = TokenBucket(per_minute=600, capacity=3)
+    started_at = time.monotonic()
+    # Time at which each of 30 back-to-back requests is allowed to proceed
+    allowed_at = [time.monotonic() + bucket.reserve(1) - started_at for _ in range(30)]
+
+    for count, elapsed in enumerate(allowed_at, start=1):
+        assert count <= bucket.capacity + bucket.rate * elapsed + 1e-6
+    assert allowed_at[-1] >= (30 - bucket.capacity) / bucket.rate - 0.01
+
+
+def test_backoff_is_jittered_within_its_bounds():
+    delays = [backoff_delay(3, base=0.5, cap=10.0) for _ in range(200)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+    # A retry delay suggested by the server is the lower bound, within the cap
+    assert all(backoff_delay(0, cap=10.0, error=SimulatedRateLimitError(2.5)) >= 2.5 for _ in range(20))
+    assert backoff_delay(0, cap=10.0, error=SimulatedRateLimitError(60)) == 10.0
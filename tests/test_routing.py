@@ -0,0 +1,71 @@
+"""Tests of the model routing against the simulated LLM."""
+
+import asyncio
+import os
+import tempfile
+
+from procurement.cache import LLMResponseCache, arun_chain, mark_response_uncacheable, run_chain
+from procurement.chains import build_chains
+from procurement.fake_llm import SimulatedChatModel
+from procurement.routing import _routed_model_class
+from procurement.streaming import stream_chain
+
+
+def routed_chain(standard_latency):
+    routed_model = _routed_model_class()
+    llm = routed_model(
+        route="tender_email",
+        tier="standard",
+        llm=SimulatedChatModel(model="standard", default_response="standard answer",
+                               first_token_latency=standard_latency),
+        timeout=0.2,
+        fallback_tier="fast",
+        fallback=SimulatedChatModel(model="fast", default_response="fast answer"),
+    )
+    return build_chains(llm)["tender_email"]
+
+
+def test_fallback_answer_is_not_cached():
+    cache = LLMResponseCache(os.path.join(tempfile.mkdtemp(), "cache.sqlite3"))
+    chain = routed_chain(standard_latency=1.0)
+    inputs = {"tender_summary": "Industrial pumps"}
+
+    assert run_chain(chain, inputs, cache) == "fast answer"
+    assert asyncio.run(arun_chain(chain, inputs, cache)) == "fast answer"
+    assert cache.stats()["entries"] == 0
+
+
+def test_standard_answer_is_cached():
+    cache = LLMResponseCache(os.path.join(tempfile.mkdtemp(), "cache.sqlite3"))
+    chain = routed_chain(standard_latency=0.0)
+
+    assert run_chain(chain, {"tender_summary": "Industrial pumps"}, cache) == "standard answer"
+    assert cache.stats()["entries"] == 1
+
+
+class FallbackStreamModel(SimulatedChatModel):
+    """Streams its answer the way a fallback model would, marking it uncacheable."""
+
+    def _stream(self, *args, **kwargs):
+        mark_response_uncacheable()
+        yield from super()._stream(*args, **kwargs)
+
+
+class Placeholder:
+    def text(self, value):
+        self.value = value
+
+
+def test_streamed_fallback_answer_is_not_cached():
+    cache = LLMResponseCache(os.path.join(tempfile.mkdtemp(), "cache.sqlite3"))
+    inputs = {"tender_summary": "Industrial pumps"}
+    placeholder = Placeholder()
+
+    chain = build_chains(FallbackStreamModel(default_response="fast answer"))["tender_email"]
+    assert stream_chain(chain, inputs, placeholder, cache) == "fast answer"
+    assert placeholder.value == "fast answer"
+    assert cache.stats()["entries"] == 0
+
+    chain = build_chains(SimulatedChatModel(default_response="standard answer"))["tender_email"]
+    assert stream_chain(chain, inputs, placeholder, cache) == "standard answer"
+    assert cache.stats()["entries"] == 1
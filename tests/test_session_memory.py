@@ -0,0 +1,78 @@
+"""Tests of the compressed session storage and the idle-session offload."""
+
+import gc
+import os
+
+from procurement.session_memory import SessionArtifacts, SessionRegistry
+
+
+def create_registry(tmp_path):
+    # No background sweep: the tests call sweep with the time to sweep at
+    return SessionRegistry(idle_seconds=60, spool_dir=str(tmp_path), sweep_seconds=0)
+
+
+def test_artifacts_round_trip_compressed():
+    artifacts = SessionArtifacts()
+    artifacts["tender_doc"] = "Section 1: scope. " * 200
+
+    assert artifacts["tender_doc"] == "Section 1: scope. " * 200
+    compressed, size = artifacts.memory_usage()
+    assert size == len("Section 1: scope. " * 200) and compressed < size / 10
+    # A snapshot shares the documents but not later changes
+    snapshot = artifacts.snapshot()
+    artifacts["tender_doc"] = "changed"
+    assert snapshot["tender_doc"] == "Section 1: scope. " * 200
+
+
+def test_idle_session_is_offloaded_and_restored(tmp_path):
+    registry = create_registry(tmp_path)
+    artifacts, pasted_inputs = SessionArtifacts(), SessionArtifacts()
+    artifacts["tech_req_doc"] = "Pumps with stainless steel impellers."
+    pasted_inputs["business_req"] = "Supply of twelve industrial pumps."
+    registry.touch("session-1", artifacts=artifacts, pasted_inputs=pasted_inputs)
+
+    registry.sweep()
+    assert not artifacts.offloaded
+
+    registry.sweep(now=registry._sessions["session-1"][1] + 60)
+    assert artifacts.offloaded and pasted_inputs.offloaded
+    assert artifacts.memory_usage()[0] == 0 and pasted_inputs.memory_usage()[0] == 0
+    assert registry.stats()["offloaded"] == 1 and registry.stats()["offloads"] == 1
+    assert sorted(os.listdir(tmp_path)) == ["session-1.artifacts.json", "session-1.pasted_inputs.json"]
+
+    # The next read restores the documents and removes the spool file
+    assert artifacts["tech_req_doc"] == "Pumps with stainless steel impellers."
+    assert pasted_inputs["business_req"] == "Supply of twelve industrial pumps."
+    assert not artifacts.offloaded and not pasted_inputs.offloaded
+    assert os.listdir(tmp_path) == []
+
+
+def test_empty_stores_are_not_offloaded(tmp_path):
+    registry = create_registry(tmp_path)
+    artifacts = SessionArtifacts()
+    registry.touch("session-1", artifacts=artifacts, pasted_inputs=SessionArtifacts())
+
+    registry.sweep(now=registry._sessions["session-1"][1] + 60)
+
+    assert not artifacts.offloaded
+    assert registry.stats()["offloads"] == 0
+
+
+def test_discarded_sessions_are_swept_with_their_spool_files(tmp_path):
+    registry = create_registry(tmp_path)
+    artifacts = SessionArtifacts()
+    artifacts["tender_doc"] = "Tender"
+    registry.touch("session-1", artifacts=artifacts)
+    kept = SessionArtifacts()
+    registry.touch("session-2", artifacts=kept)
+    registry.sweep(now=registry._sessions["session-1"][1] + 60)
+    assert os.listdir(tmp_path) == ["session-1.artifacts.json"]
+
+    # Streamlit discarding the session drops the last reference to its artifacts
+    del artifacts
+    gc.collect()
+    registry.sweep()
+
+    assert list(registry._sessions) == ["session-2"]
+    assert os.listdir(tmp_path) == []
+    assert registry.stats()["sessions"] == 1
@@ -0,0 +1,55 @@
+"""Tests of the resolution of the LLM's vendor names to the vendors of the history."""
+
+from procurement import vendor_names
+from procurement.vendor_names import VendorNameIndex, normalize_vendor_name
+
+VENDORS = ["Acme Corp", "Globex Industries", "The Initech Company", "Vendor 12", "Vendor 13"]
+
+
+def test_normalization_strips_case_punctuation_and_legal_suffixes():
+    assert normalize_vendor_name("ACME Corporation") == "acme"
+    assert normalize_vendor_name("  Acme,  Corp. Ltd ") == "acme"
+    assert normalize_vendor_name("The Initech Company") == "initech"
+    # A name made only of a legal-form word keeps it
+    assert normalize_vendor_name("Limited") == "limited"
+
+
+def test_exact_and_suffix_variants_resolve_to_the_canonical_name():
+    index = VendorNameIndex(VENDORS)
+
+    assert index.resolve("Acme Corp") == "Acme Corp"
+    assert index.resolve("ACME Corporation") == "Acme Corp"
+    assert index.resolve("Initech Co.") == "The Initech Company"
+    assert index.resolve("") is None
+
+
+def test_names_differing_only_in_a_number_are_never_merged():
+    index = VendorNameIndex(VENDORS)
+
+    assert index.resolve("Vendor 12") == "Vendor 12"
+    assert index.resolve("Vendor 13 Ltd") == "Vendor 13"
+    # Above the similarity threshold with "vendor 12" (0.78), but a different vendor
+    assert index.resolve("Vendor 14") is None
+    assert index.resolve("Vendor 1") is None
+
+
+def test_fuzzy_matches_need_the_similarity_threshold(monkeypatch):
+    index = VendorNameIndex(VENDORS)
+
+    # Dice similarity of the trigrams: 0.91 and 0.80 match, 0.65 does not
+    assert index.resolve("Globex Industrie") == "Globex Industries"
+    assert index.resolve("Globex Indust") == "Globex Industries"
+    assert index.resolve("Globe Industry") is None
+
+    monkeypatch.setattr(vendor_names, "FUZZY_MATCH_THRESHOLD", 0.85)
+    assert index.resolve("Globex Industrie") == "Globex Industries"
+    assert index.resolve("Globex Indust") is None
+
+
+def test_resolve_all_returns_unique_resolved_names_and_the_unresolved_ones():
+    index = VendorNameIndex(VENDORS)
+
+    resolved, unresolved = index.resolve_all(["ACME Corporation", "Acme Corp", " ", "Umbrella Corp", "Vendor 12"])
+
+    assert resolved == ["Acme Corp", "Vendor 12"]
+    assert unresolved == ["Umbrella Corp"]